@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the `gh` CLI serving the canned PR written by synthetic.py.
+
+Reads its responses from $ACRE_BENCH_GH_DATA and sleeps $ACRE_BENCH_GH_LATENCY seconds
+per call to model the network round-trip. Supports what acre uses: `pr view`, `pr list`,
+`pr review` and `api` (the PR itself, with ETag/304 handling, and the paginated files).
+"""
+import json
+import os
+import re
+import sys
+import time
+
+ETAG = 'W/"synthetic"'
+
+
+def _load(name: str):
+    with open(os.path.join(os.environ["ACRE_BENCH_GH_DATA"], name)) as fh:
+        return json.load(fh)
+
+
+def _api(args: list[str]) -> int:
+    path = next(a for a in args if a.startswith("repos/"))
+    headers = [args[i + 1] for i, a in enumerate(args) if a == "-H" and i + 1 < len(args)]
+    include = "--include" in args or "-i" in args
+    files = re.search(r"/pulls/\d+/files\?per_page=(\d+)&page=(\d+)$", path)
+    if files:
+        per_page, page = int(files.group(1)), int(files.group(2))
+        body = json.dumps(_load("files.json")[(page - 1) * per_page : page * per_page])
+        status = "200 OK"
+    elif f"If-None-Match: {ETAG}" in headers:
+        body, status = "", "304 Not Modified"
+    else:
+        body, status = json.dumps(_load("pull.json")), "200 OK"
+    if include:
+        sys.stdout.write(f"HTTP/2.0 {status}\r\nEtag: {ETAG}\r\n\r\n")
+    sys.stdout.write(body)
+    return 0
+
+
+def main(args: list[str]) -> int:
+    time.sleep(float(os.environ.get("ACRE_BENCH_GH_LATENCY", "0")))
+    if args[:2] == ["pr", "view"]:
+        json.dump(_load("view.json"), sys.stdout)
+    elif args[:2] == ["pr", "list"]:
+        json.dump(_load("list.json"), sys.stdout)
+    elif args[:2] == ["pr", "review"]:
+        pass
+    elif args[:1] == ["api"]:
+        return _api(args[1:])
+    else:
+        print(f"fake gh: unsupported command: {' '.join(args)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Time acre commands on synthetic repositories of growing size.
+
+    python benchmarks/run.py                          # 10, 1k, 10k and 50k changed files
+    python benchmarks/run.py --sizes 10,1000 --output before.json
+    python benchmarks/run.py --sizes 10,1000 --compare before.json
+
+Every command runs as a fresh `codereview.py` process with an empty HOME (no user config)
+and a fake `gh` on PATH, so results depend only on acre and the machine. Results are
+written as JSON that `--compare` (or any other tool) can diff across commits.
+
+With `--replay`, the warm-up run of each benchmark records its git/gh calls (ACRE_RECORD)
+and the timed runs replay them (ACRE_REPLAY), so only acre's own Python time is measured.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import synthetic
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+ENTRY = os.path.join(ROOT, "src", "codereview.py")
+DEFAULT_SIZES = [10, 1_000, 10_000, 50_000]
+INTERACTIVE_ITERATIONS = 200
+
+
+@dataclass
+class Benchmark:
+    name: str
+    argv: list[str]
+    stdin: str = ""
+    setup: list[list[str]] = field(default_factory=list)  # Untimed commands before every run
+    iterations: int = 1  # Timed work units per run; times are reported per unit
+
+
+BENCHMARKS = [
+    # init comes first: the other commands need the review it creates.
+    Benchmark("init", ["init", "--force"]),
+    Benchmark("status", ["status"]),
+    Benchmark("ls", ["ls"]),
+    Benchmark("metadata", ["metadata"]),
+    Benchmark("review --skim", ["review", "--skim"], stdin="y\n", setup=[["reset"]]),
+    Benchmark("review --skim (cold diff cache)", ["review", "--skim"], stdin="y\n", setup=[["reset"], ["cache", "prune", "--all"]]),
+    Benchmark("interactive iteration", ["interactive"], stdin="status\n" * INTERACTIVE_ITERATIONS, iterations=INTERACTIVE_ITERATIONS),
+]
+
+
+@dataclass
+class Result:
+    size: int
+    benchmark: str
+    runs_ms: list[float]
+    min_ms: float
+    median_ms: float
+
+
+def _env(repo: synthetic.SyntheticRepo, workdir: str, gh_latency: float) -> dict:
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("GIT_", "ACRE_"))}
+    env["HOME"] = os.path.join(workdir, "home")
+    env["PATH"] = os.path.join(workdir, "bin") + os.pathsep + env.get("PATH", "")
+    env["ACRE_BENCH_GH_DATA"] = repo.gh_data
+    env["ACRE_BENCH_GH_LATENCY"] = str(gh_latency)
+    return env
+
+
+def _install_fake_gh(workdir: str) -> None:
+    bin_dir = os.path.join(workdir, "bin")
+    os.makedirs(bin_dir, exist_ok=True)
+    os.makedirs(os.path.join(workdir, "home"), exist_ok=True)
+    shim = os.path.join(bin_dir, "gh")
+    with open(shim, "w") as fh:
+        fh.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.join(HERE, "fake_gh.py")}" "$@"\n')
+    os.chmod(shim, 0o755)
+
+
+def _acre(argv: list[str], repo: synthetic.SyntheticRepo, env: dict, stdin: str = "") -> float:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, ENTRY, *argv],
+        cwd=repo.path,
+        env=env,
+        input=stdin,
+        text=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode:
+        raise RuntimeError(f"acre {' '.join(argv)} failed in {repo.path}:\n{result.stderr}")
+    return elapsed
+
+
+def _recorded(env: dict, recording: Optional[str]) -> tuple[dict, dict]:
+    """Environments of the warm-up and timed runs: recording, then replaying `recording`."""
+    if recording is None:
+        return env, env
+    if os.path.exists(recording):
+        os.remove(recording)
+    return {**env, "ACRE_RECORD": recording}, {**env, "ACRE_REPLAY": recording}
+
+
+def _time(
+    bench: Benchmark,
+    repo: synthetic.SyntheticRepo,
+    env: dict,
+    repeat: int,
+    baseline_ms: float,
+    recording: Optional[str],
+) -> Result:
+    warm_up_env, timed_env = _recorded(env, recording)
+    runs = []
+    for i in range(repeat + 1):  # The first run only warms caches (and records, with --replay).
+        for setup in bench.setup:
+            _acre(setup, repo, env)
+        elapsed = _acre(bench.argv, repo, timed_env if i else warm_up_env, bench.stdin)
+        runs.append(max(0.0, elapsed - baseline_ms) / bench.iterations if bench.iterations > 1 else elapsed)
+    runs = runs[1:]
+    return Result(
+        size=repo.files,
+        benchmark=bench.name,
+        runs_ms=[round(r, 2) for r in runs],
+        min_ms=round(min(runs), 2),
+        median_ms=round(statistics.median(runs), 2),
+    )
+
+
+def run(
+    sizes: list[int],
+    repeat: int,
+    workdir: str,
+    gh_latency: float,
+    only: Optional[list[str]],
+    replay: bool = False,
+) -> dict:
+    _install_fake_gh(workdir)
+    recordings = os.path.join(workdir, "recordings")
+    os.makedirs(recordings, exist_ok=True)
+    results = []
+    for size in sizes:
+        print(f"# {size} changed files: preparing repository", file=sys.stderr)
+        repo = synthetic.create(workdir, size)
+        env = _env(repo, workdir, gh_latency)
+        _acre(["init", "--force"], repo, env)
+        # An interactive session that exits right away: subtracted from the iteration runs.
+        record_env, replay_env = _recorded(env, os.path.join(recordings, f"{size}-baseline.jsonl") if replay else None)
+        _acre(["interactive"], repo, record_env)
+        baseline_ms = min(_acre(["interactive"], repo, replay_env) for _ in range(repeat))
+        for n, bench in enumerate(BENCHMARKS):
+            if only and bench.name not in only:
+                continue
+            recording = os.path.join(recordings, f"{size}-{n}.jsonl") if replay else None
+            result = _time(bench, repo, env, repeat, baseline_ms, recording)
+            print(f"{size:>7} {bench.name:34} min {result.min_ms:>10.1f} ms  median {result.median_ms:>10.1f} ms", file=sys.stderr)
+            results.append(result)
+    return {
+        "commit": _acre_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "gh_latency_s": gh_latency,
+        "replay": replay,
+        "results": [asdict(r) for r in results],
+    }
+
+
+def _acre_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+
+def compare(old: dict, new: dict) -> None:
+    """Median of each benchmark in `new` relative to `old`."""
+    before = {(r["size"], r["benchmark"]): r["median_ms"] for r in old["results"]}
+    print(f"{'size':>7} {'benchmark':34} {'before':>10} {'after':>10} {'change':>8}")
+    for r in new["results"]:
+        prev = before.get((r["size"], r["benchmark"]))
+        if prev is None:
+            continue
+        change = f"{(r['median_ms'] / prev - 1) * 100:+.0f}%" if prev else "n/a"
+        print(f"{r['size']:>7} {r['benchmark']:34} {prev:>10.1f} {r['median_ms']:>10.1f} {change:>8}")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma-separated numbers of changed files")
+    p.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark (after one warm-up run)")
+    p.add_argument("--only", help="Comma-separated benchmark names to run")
+    p.add_argument("--gh-latency", type=float, default=0.0, help="Seconds the fake gh sleeps per call")
+    p.add_argument("--replay", action="store_true", help="Replay recorded git/gh calls: time acre's own work only")
+    p.add_argument("--workdir", help="Where repositories are generated (kept and reused across runs)")
+    p.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    p.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = p.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="acre-bench-")
+    try:
+        results = run(
+            sizes=[int(s) for s in args.sizes.split(",") if s],
+            repeat=max(1, args.repeat),
+            workdir=os.path.abspath(workdir),
+            gh_latency=args.gh_latency,
+            only=args.only.split(",") if args.only else None,
+            replay=args.replay,
+        )
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as fh:
+            compare(json.load(fh), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Synthetic repositories with a PR-like branch changing a given number of files."""
+import json
+import os
+import subprocess
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+BRANCH = "feature"
+PR_NUMBER = 4242
+PR_URL = f"https://github.com/bench/synthetic/pull/{PR_NUMBER}"
+FILES_PER_DIR = 100
+# `gh pr view` lists at most this many files; the rest come from the files API (or git).
+VIEW_FILES_LIMIT = 100
+
+_ENV = {
+    "GIT_AUTHOR_NAME": "bench",
+    "GIT_AUTHOR_EMAIL": "bench@example.com",
+    "GIT_COMMITTER_NAME": "bench",
+    "GIT_COMMITTER_EMAIL": "bench@example.com",
+}
+
+
+@dataclass
+class SyntheticRepo:
+    path: str
+    gh_data: str  # Directory with the canned responses served by fake_gh.py
+    files: int
+    base: str
+    head: str
+
+
+def file_path(i: int) -> str:
+    return f"pkg{i // FILES_PER_DIR:04d}/module_{i:06d}.py"
+
+
+def _base_content(i: int) -> str:
+    return "".join(f"def function_{i}_{n}(value):\n    return value + {n}\n\n" for n in range(10))
+
+
+def _head_content(i: int) -> str:
+    # Two changed lines and three added ones per file: 7 changed lines in the diff.
+    lines = _base_content(i).splitlines(keepends=True)
+    lines[1] = "    return value * 2\n"
+    lines[4] = "    return value * 3\n"
+    lines += [f"\ndef added_{i}(value):\n", "    return -value\n"]
+    return "".join(lines)
+
+
+def _commit(out, ref: str, mark: int, message: str, contents, parent: Optional[int] = None) -> None:
+    data = message.encode()
+    out.write(f"commit {ref}\nmark :{mark}\ncommitter bench <bench@example.com> 1700000000 +0000\n".encode())
+    out.write(f"data {len(data)}\n".encode() + data + b"\n")
+    if parent:
+        out.write(f"from :{parent}\n".encode())
+    for path, content in contents:
+        blob = content.encode()
+        out.write(f"M 100644 inline {path}\ndata {len(blob)}\n".encode() + blob + b"\n")
+    out.write(b"\n")
+
+
+def _git(repo: str, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=repo, check=True, capture_output=True, text=True, env={**os.environ, **_ENV}
+    ).stdout.strip()
+
+
+def create(root: str, files: int) -> SyntheticRepo:
+    """
+    A repository under `root` whose `feature` branch (checked out) changes `files` files
+    relative to `main`, with origin refs and canned `gh` responses describing it as a PR.
+
+    Generation is deterministic, so the same size always yields the same commits. An
+    existing repository of that size is reused.
+    """
+    path = os.path.join(root, f"repo-{files}")
+    gh_data = os.path.join(root, f"gh-{files}")
+    marker = os.path.join(gh_data, "repo.json")
+    if os.path.exists(marker):
+        with open(marker) as fh:
+            return SyntheticRepo(**json.load(fh))
+
+    os.makedirs(path, exist_ok=True)
+    _git(path, "init", "-q", "-b", "main")
+    proc = subprocess.Popen(["git", "fast-import", "--quiet"], cwd=path, stdin=subprocess.PIPE)
+    assert proc.stdin is not None
+    _commit(proc.stdin, "refs/heads/main", 1, "base", ((file_path(i), _base_content(i)) for i in range(files)))
+    _commit(
+        proc.stdin,
+        f"refs/heads/{BRANCH}",
+        2,
+        "change every file",
+        ((file_path(i), _head_content(i)) for i in range(files)),
+        parent=1,
+    )
+    proc.stdin.close()
+    if proc.wait():
+        raise RuntimeError("git fast-import failed")
+    _git(path, "checkout", "-q", BRANCH)
+    base, head = _git(path, "rev-parse", "main"), _git(path, "rev-parse", BRANCH)
+    _git(path, "update-ref", "refs/remotes/origin/main", base)
+    _git(path, "symbolic-ref", "refs/remotes/origin/HEAD", "refs/remotes/origin/main")
+
+    repo = SyntheticRepo(path=path, gh_data=gh_data, files=files, base=base, head=head)
+    _write_gh_data(repo)
+    with open(marker, "w") as fh:
+        json.dump(asdict(repo), fh)
+    return repo
+
+
+def _write_gh_data(repo: SyntheticRepo) -> None:
+    os.makedirs(repo.gh_data, exist_ok=True)
+    files = [{"path": file_path(i), "additions": 5, "deletions": 2} for i in range(repo.files)]
+    pr = {
+        "number": PR_NUMBER,
+        "title": f"Synthetic change of {repo.files} files",
+        "body": "Generated by benchmarks/synthetic.py",
+        "url": PR_URL,
+        "headRefName": BRANCH,
+        "headRefOid": repo.head,
+        "baseRefName": "main",
+        "baseRefOid": repo.base,
+        "changedFiles": repo.files,
+    }
+    with open(os.path.join(repo.gh_data, "view.json"), "w") as fh:
+        json.dump({**pr, "files": files[:VIEW_FILES_LIMIT]}, fh)
+    with open(os.path.join(repo.gh_data, "list.json"), "w") as fh:
+        json.dump([pr], fh)
+    with open(os.path.join(repo.gh_data, "pull.json"), "w") as fh:
+        json.dump(
+            {
+                "number": PR_NUMBER,
+                "title": pr["title"],
+                "body": pr["body"],
+                "html_url": PR_URL,
+                "base": {"sha": repo.base},
+                "head": {"sha": repo.head},
+            },
+            fh,
+        )
+    with open(os.path.join(repo.gh_data, "files.json"), "w") as fh:
+        json.dump([{"filename": f["path"], "additions": 5, "deletions": 2} for f in files], fh)
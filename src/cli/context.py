@@ -1,10 +1,64 @@
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Optional
 
-from lib.state import StateManager
+if TYPE_CHECKING:
+    from lib.models import ReviewState
+    from lib.session import ReviewSession
+    from lib.state import StateManager
 
 
-@dataclass
 class Context:
-    key: str
-    state_manager: StateManager
-    config: dict
+    """
+    Per-invocation command context.
+
+    The review key and state manager can be given directly or as factories; factories run
+    on first access, so commands that never touch the review (`--help`, `cache`) don't pay
+    for resolving the repository or importing the state layer.
+    """
+
+    def __init__(
+        self,
+        key: Optional[str] = None,
+        state_manager: Optional["StateManager"] = None,
+        config: Optional[dict] = None,
+        *,
+        key_factory: Optional[Callable[[], str]] = None,
+        state_manager_factory: Optional[Callable[[], "StateManager"]] = None,
+    ):
+        self._key = key
+        self._state_manager = state_manager
+        self.config = config if config is not None else {}
+        self._key_factory = key_factory
+        self._state_manager_factory = state_manager_factory
+        self.session: Optional["ReviewSession"] = None  # Set by long-running modes (interactive)
+
+    @property
+    def key(self) -> str:
+        if self._key is None and self._key_factory is not None:
+            self._key = self._key_factory()
+        if self._key is None:
+            raise RuntimeError("Context has no review key and no key_factory")
+        return self._key
+
+    @key.setter
+    def key(self, value: str) -> None:
+        self._key = value
+
+    @property
+    def state_manager(self) -> "StateManager":
+        if self._state_manager is None and self._state_manager_factory is not None:
+            self._state_manager = self._state_manager_factory()
+        if self._state_manager is None:
+            raise RuntimeError("Context has no state manager and no state_manager_factory")
+        return self._state_manager
+
+    @state_manager.setter
+    def state_manager(self, value: "StateManager") -> None:
+        self._state_manager = value
+
+
+def load_review_state(context) -> Optional["ReviewState"]:
+    """The review state for a command: the session's, when one is running, else loaded from disk."""
+    session = getattr(context, "session", None)
+    if session is not None:
+        return session.state()
+    return context.state_manager.load_state(context.key)
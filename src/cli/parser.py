@@ -1,13 +1,11 @@
 import argparse
+import importlib
+import sys
 from enum import Enum
 from typing import List, Optional
 from dataclasses import dataclass, field
 
 from cli.context import Context
-from lib.commands.init import register as register_init
-from lib.commands.review import register as register_review
-from lib.commands.simple_commands import register as register_simple
-from lib.commands.interactive import register as register_interactive
 from lib.config.config import get_default_commands
 
 
@@ -32,22 +30,56 @@ class CommandInstruction:
     reviewId: str | None = None
 
 
-def _build_argparse():
+# Subcommand -> (module whose `register` defines it, its help: the only copy, see command_help).
+# Only the module of the command being run is imported, so `--help` and cheap commands
+# don't pay for readline, the diff engine, GitHub helpers, etc.
+COMMAND_MODULES: dict[str, tuple[str, str]] = {
+    "init": ("lib.commands.init", "Initialize a new code review session"),
+    "status": ("lib.commands.simple_commands", "Status of review"),
+    "ls": ("lib.commands.simple_commands", "List of files for this review, including their numbered indexes"),
+    "overview": ("lib.commands.simple_commands", "Print an overview of the request context, including status and list of files"),
+    "reset": ("lib.commands.simple_commands", "Reset the progress of the code review"),
+    "metadata": ("lib.commands.simple_commands", "Get metadata from review state, output as JSON"),
+    "approve": ("lib.commands.simple_commands", "Approve the current PR after confirmation"),
+    "peek": ("lib.commands.simple_commands", "Open a changed file in the GitHub PR diff view by path or index"),
+    "review": ("lib.commands.review", "Review one or more files"),
+    "refresh": ("lib.commands.refresh", "Move the review to the PR's new head, keeping approvals of unchanged code"),
+    "interactive": ("lib.commands.interactive", "Starts an interactive session"),
+    "cache": ("lib.commands.cache", "Inspect or prune the on-disk diff cache"),
+    "state": ("lib.commands.state", "Progress across reviews and state storage maintenance"),
+    "queue": ("lib.commands.queue", "Prepare reviews for every PR awaiting your review"),
+    "worktree": ("lib.commands.worktree", "Review PRs in pooled worktrees instead of checking them out"),
+    "stats": ("lib.commands.stats", "Where time went: git/gh calls of the last acre session"),
+}
+
+
+def command_help(name: str) -> str:
+    """Help of a subcommand, for its module's `register` (the table above is the one source)."""
+    return COMMAND_MODULES[name][1]
+
+
+def _build_argparse(command: Optional[str] = None):
     p = argparse.ArgumentParser()
     sub = p.add_subparsers(dest="cmd")
-    register_init(sub)
-    register_simple(sub)
-    register_review(sub)
-    register_interactive(sub)
+    if command in COMMAND_MODULES:
+        module = importlib.import_module(COMMAND_MODULES[command][0])
+        module.register(sub)
+    for name, (_module, help_text) in COMMAND_MODULES.items():
+        if name not in sub.choices:
+            sub.add_parser(name, help=help_text)
     return p
 
-_ArgParser = _build_argparse()
+
+def _requested_command(args: Optional[List[str]]) -> Optional[str]:
+    argv = sys.argv[1:] if args is None else args
+    return argv[0] if argv else None
 
 def print_usage():
-    _ArgParser.print_usage()
+    _build_argparse().print_usage()
 
 def parse_args_from_cli(context: Context, override_args=None) -> Optional[CommandInstruction]:
-    args: argparse.Namespace = _ArgParser.parse_args(args=override_args)
+    parser = _build_argparse(_requested_command(override_args))
+    args: argparse.Namespace = parser.parse_args(args=override_args)
     if args.cmd is None:
         default_commands = get_default_commands(context.config)
         if default_commands:
@@ -1,9 +1,9 @@
 import os
 import shlex
-import subprocess
-import webbrowser
 from collections.abc import Callable, Mapping
 
+from lib import runner
+
 
 def yn(prompt, default=False) -> bool:
     """Asks y/n with default on empty. Loops if unexpected input."""
@@ -22,7 +22,7 @@ def open_in_editor(
     path: str,
     *,
     env: Mapping[str, str] | None = None,
-    run: Callable[..., object] = subprocess.run,
+    run: Callable[..., object] = runner.run_interactive,
     print_fn: Callable[..., object] = print,
 ) -> bool:
     effective_env = os.environ if env is None else env
@@ -51,14 +51,17 @@ def open_in_editor(
 def open_url(
     url: str,
     *,
-    run: Callable[..., object] = subprocess.run,
-    browser_open: Callable[[str], bool] = webbrowser.open,
+    run: Callable[..., object] = runner.run_interactive,
+    browser_open: Callable[[str], bool] | None = None,
     print_fn: Callable[..., object] = print,
 ) -> bool:
     try:
         run(["open", url])
         return True
     except FileNotFoundError:
+        if browser_open is None:
+            import webbrowser
+            browser_open = webbrowser.open
         if browser_open(url):
             return True
         print_fn("Could not open URL in browser.")
@@ -73,7 +76,7 @@ def mark_reviewed_prompt(
     on_peek: Callable[[], bool] | None = None,
     input_fn: Callable[[str], str] = input,
     env: Mapping[str, str] | None = None,
-    run: Callable[..., object] = subprocess.run,
+    run: Callable[..., object] = runner.run_interactive,
     print_fn: Callable[..., object] = print,
 ) -> bool:
     """
@@ -4,9 +4,6 @@ import sys
 from cli.context import Context as CLI_Context
 from cli.parser import parse_args_from_cli
 from lib.config.config import load_config, resolve_cmd_from_config_aliases
-from lib.review_identifier import ReviewIdentifier
-from lib.sources.git import get_current_commit_sha, get_repo_root
-from lib.state import StateManager
 
 
 def _rewrite_args_via_aliases(config):
@@ -16,15 +13,33 @@ def _rewrite_args_via_aliases(config):
         sys.argv = [sys.argv[0]] + expanded + sys.argv[2:]
 
 
+def _determine_key() -> str:
+    from lib.review_identifier import ReviewIdentifier
+    return ReviewIdentifier.determine_review_id()
+
+
+def _create_state_manager(config):
+    from lib.sources.git import get_current_commit_sha, get_repo_root
+    from lib.state import create_state_manager
+    return create_state_manager(
+            repo_root=get_repo_root(),
+            current_sha=get_current_commit_sha(),
+            config=config,
+    )
+
+
 def main():
+    # Every git/gh call of this run is kept for `stats --last-session` (and ACRE_TRACE=1).
+    from lib import runner
+    runner.save_session_at_exit()
     config = load_config()
     _rewrite_args_via_aliases(config)
-    key = ReviewIdentifier.determine_review_id()
-    state_manager = StateManager(
-            repo_root=get_repo_root(),
-            current_sha=get_current_commit_sha(),
+    # Resolved on first use so `--help` and commands that don't touch the review stay cheap.
+    context = CLI_Context(
+        config=config,
+        key_factory=_determine_key,
+        state_manager_factory=lambda: _create_state_manager(config),
     )
-    context = CLI_Context(key=key, state_manager=state_manager, config=config)
     parse_args_from_cli(context=context)
 
 if __name__ == "__main__":
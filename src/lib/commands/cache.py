@@ -0,0 +1,47 @@
+import argparse
+
+from cli.context import Context
+from cli.parser import command_help
+from lib.config.config import get_diff_cache_max_bytes
+from lib.diff.cache import DiffCache, cache_dir_for
+
+
+def _mb(n: int) -> str:
+    return f"{n / (1024 * 1024):.1f} MB"
+
+
+def _cache(context: Context) -> DiffCache:
+    return DiffCache(
+        cache_dir_for(context.state_manager.acre_dir),
+        max_bytes=get_diff_cache_max_bytes(context.config),
+    )
+
+
+def impl_stats(context: Context, **_):
+    cache = _cache(context)
+    stats = cache.stats()
+    print(f"Diff cache: {cache.root}")
+    print(f"> {stats.entries} entries | {_mb(stats.total_bytes)} of {_mb(stats.max_bytes)}")
+
+
+def impl_prune(context: Context, args, **_):
+    cache = _cache(context)
+    if getattr(args, "all", False):
+        limit = 0
+    elif getattr(args, "max_mb", None) is not None:
+        limit = args.max_mb * 1024 * 1024
+    else:
+        limit = None
+    removed, freed = cache.prune(max_bytes=limit)
+    print(f"> Removed {removed} entries ({_mb(freed)})")
+
+
+def register(sub: argparse._SubParsersAction):
+    cache = sub.add_parser("cache", help=command_help("cache"))
+    cache_sub = cache.add_subparsers(dest="cache_cmd", required=True)
+    stats = cache_sub.add_parser("stats", help="Show number of cached diffs and disk usage")
+    stats.set_defaults(impl=impl_stats)
+    prune = cache_sub.add_parser("prune", help="Evict least-recently-used diffs down to the size limit")
+    prune.add_argument("--max-mb", type=int, help="Target size instead of config cache.max_mb")
+    prune.add_argument("--all", action="store_true", help="Remove every cached diff")
+    prune.set_defaults(impl=impl_prune)
@@ -1,6 +1,7 @@
 import argparse
 
 from cli.context import Context
+from cli.parser import command_help
 from lib.initialize import cmd_init
 
 
@@ -10,12 +11,19 @@ def impl(args: argparse.Namespace, context: Context):
         review_id=args.review_id,
         force=args.force,
         git_range=getattr(args, 'git_range', None),
+        refresh=getattr(args, 'refresh', False),
     )
 
 
 def register(sub: argparse._SubParsersAction):
-    cmd = sub.add_parser("init", help="Initialize a new code review session")
+    cmd = sub.add_parser("init", help=command_help("init"))
     cmd.add_argument("--review-id", help="Custom review identifier")
-    cmd.add_argument("--force", help="Overwrite existing state file", action="store_true")
+    mode = cmd.add_mutually_exclusive_group()
+    mode.add_argument("--force", help="Overwrite existing state file", action="store_true")
+    mode.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Update an existing review with new commits, keeping approvals of unchanged files",
+    )
     cmd.add_argument("--git-range", help="Git range to use for diff (e.g., main..HEAD, commit1..commit2)")
     cmd.set_defaults(impl=impl)
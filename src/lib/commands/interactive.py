@@ -4,6 +4,7 @@ import readline
 import shlex
 
 from cli.context import Context
+from cli.parser import command_help
 from cli.util import yn
 from lib.commands.review import register as register_review
 from lib.commands.simple_commands import impl_status, register as register_simple
@@ -12,6 +13,7 @@ from lib.config.config import (
     resolve_cmd_from_config_aliases,
 )
 from lib.initialize import cmd_init
+from lib.session import ReviewSession
 
 
 def _build_interactive_parser():
@@ -99,6 +101,11 @@ def impl_interactive(context: Context, args=None, **_):
             print("Cannot proceed without initialized review. Exiting.")
             return
     
+    # Keep the parsed review across prompts; it is only re-read when changed on disk.
+    context.session = ReviewSession(
+        state_manager=context.state_manager, key=context.key, config=context.config
+    )
+
     # Setup readline for interactive features
     history_file = _setup_readline()
     
@@ -126,12 +133,13 @@ def impl_interactive(context: Context, args=None, **_):
     finally:
         # Save command history when exiting
         _save_history(history_file)
+        context.session = None
         
     print("Exiting interactive mode.")
 
 
 def register(sub: argparse._SubParsersAction):
-    parser = sub.add_parser("interactive", help="Starts an interactive session")
+    parser = sub.add_parser("interactive", help=command_help("interactive"))
     parser.add_argument("-y", "--auto-yes", action="store_true", 
                        help="Automatically answer 'yes' to initialization prompts")
     parser.set_defaults(impl=impl_interactive)
@@ -0,0 +1,46 @@
+import argparse
+import subprocess
+import sys
+
+from cli.context import Context
+from cli.parser import command_help
+from lib.review_queue import DEFAULT_LIMIT, DEFAULT_SEARCH, sync_queue
+
+_MARKS = {"initialized": "+", "exists": "=", "failed": "!"}
+
+
+def impl_sync(context: Context, args, **_):
+    try:
+        queued = sync_queue(
+            context.state_manager,
+            search=args.search,
+            limit=args.limit,
+            force=args.force,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        print(f"Error: could not list pull requests: {e}", file=sys.stderr)
+        exit(1)
+    if not queued:
+        print("No pull requests awaiting review")
+        return
+    for q in queued:
+        line = f"{_MARKS[q.status]} #{q.number} {q.review_id}: {q.title}"
+        if q.status == "initialized":
+            line += f" ({q.files} files)"
+        elif q.detail:
+            line += f" ({q.detail})"
+        print(line)
+    initialized = sum(q.status == "initialized" for q in queued)
+    print(f"> Initialized {initialized} of {len(queued)} reviews")
+
+
+def register(sub: argparse._SubParsersAction):
+    queue = sub.add_parser("queue", help=command_help("queue"))
+    queue_sub = queue.add_subparsers(dest="queue_cmd", required=True)
+    sync = queue_sub.add_parser(
+        "sync", help="Fetch and initialize all PRs requesting your review, without checking them out"
+    )
+    sync.add_argument("--search", default=DEFAULT_SEARCH, help=f"gh search query (default: {DEFAULT_SEARCH})")
+    sync.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="Maximum number of PRs")
+    sync.add_argument("--force", action="store_true", help="Re-initialize reviews that already exist")
+    sync.set_defaults(impl=impl_sync)
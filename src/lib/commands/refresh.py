@@ -0,0 +1,41 @@
+import argparse
+import sys
+
+from cli.context import Context, load_review_state
+from cli.parser import command_help
+from lib.commands_v0 import CommandsV0
+from lib.refresh import print_results, refresh_review
+from lib.sources.git import data_from_git_range
+from lib.sources.pr_fetch import data_from_gh_concurrently
+
+
+def impl(args: argparse.Namespace, context: Context):
+    state = load_review_state(context)
+    if not state:
+        print("No state file found. Run 'init' first.")
+        return
+    pr = state.metadata.get("pr_number")
+    if not args.git_range and not pr:
+        print(f"Review '{state.review_id}' has no recorded PR; pass --git-range.", file=sys.stderr)
+        exit(1)
+    try:
+        # The review's own PR: it need not be the checked-out branch's (queued or --review-id reviews).
+        data = data_from_git_range(args.git_range) if args.git_range else data_from_gh_concurrently(pr=pr)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        exit(1)
+    if not data.head_commit:
+        print("Could not determine the PR's new head; review left unchanged.", file=sys.stderr)
+        exit(1)
+    if data.head_commit == state.metadata.get("head_commit") and data.base_commit == state.metadata.get("base_commit"):
+        print(f"Already at {data.head_commit[:12]}")
+        return
+
+    print_results(refresh_review(context.state_manager, state, data))
+    CommandsV0(key=context.key, state_manager=context.state_manager, config=context.config, state=state).cmd_status()
+
+
+def register(sub: argparse._SubParsersAction):
+    cmd = sub.add_parser("refresh", help=command_help("refresh"))
+    cmd.add_argument("--git-range", help="Git range to refresh to instead of the PR (e.g., main..HEAD)")
+    cmd.set_defaults(impl=impl)
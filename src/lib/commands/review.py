@@ -1,9 +1,15 @@
 import argparse
 
-from cli.context import Context
+from cli.context import Context, load_review_state
+from cli.parser import command_help
 from cli.util import yn
 from lib.commands_v0 import CommandsV0
-from lib.config.config import get_review_test_diff_first_default
+from lib.config.config import (
+    get_review_prefetch_depth,
+    get_review_prefetch_memory_bytes,
+    get_review_test_diff_first_default,
+)
+from lib.diff.prefetch import prefetcher_for
 
 
 def _select_paths_to_review(
@@ -42,7 +48,7 @@ def _select_paths_to_review(
 
 
 def impl(args: argparse.Namespace, context: Context):
-    state = context.state_manager.load_state(context.key)
+    state = load_review_state(context)
     if not state:
         print("No state file found. Run 'init' first.")
         return
@@ -59,35 +65,55 @@ def impl(args: argparse.Namespace, context: Context):
         key=context.key,
         state_manager=context.state_manager,
         config=context.config,
+        state=state,
     )
 
     skim_mode = bool(hasattr(args, 'skim') and args.skim)
+    hunk_mode = bool(getattr(args, "hunks", False))
     arg_test_diff_first = getattr(args, "test_diff_first", None)
     test_diff_first = (
         arg_test_diff_first
         if arg_test_diff_first is not None
         else get_review_test_diff_first_default(context.config)
     )
-    for path in paths_to_review:
-        cmdv0.cmd_review(
-            path=path,
-            ask_approve=(False if skim_mode else True),
-            test_diff_first=test_diff_first,
-        )
-    if skim_mode:
-        if yn("Approve all files?"):
-            for path in paths_to_review:
-                context.state_manager.mark_file_reviewed(state=state, path=path)
-            context.state_manager.save_state(state)
-            print(f"> Marked {len(paths_to_review)} files as reviewed (skim mode)")
+    # Approvals are written when the command ends (or periodically), not once per file.
+    with context.state_manager.unit_of_work(state):
+        # Diff the next files in the background while the current one is being read.
+        with prefetcher_for(
+            state.diff_target(),
+            depth=get_review_prefetch_depth(context.config),
+            memory_budget=get_review_prefetch_memory_bytes(context.config),
+        ) as prefetcher:
+            for idx, path in enumerate(paths_to_review):
+                prefetcher.schedule(
+                    paths_to_review[j]
+                    for j in range(idx + 1, len(paths_to_review))
+                    if not state.is_file_reviewed(paths_to_review[j])
+                )
+                if hunk_mode:
+                    cmdv0.cmd_review_hunks(path)
+                    continue
+                cmdv0.cmd_review(
+                    path=path,
+                    ask_approve=(False if skim_mode else True),
+                    test_diff_first=test_diff_first,
+                )
+        if skim_mode:
+            if yn("Approve all files?"):
+                for path in paths_to_review:
+                    context.state_manager.mark_file_reviewed(state=state, path=path)
+                context.state_manager.save_state(state)
+                print(f"> Marked {len(paths_to_review)} files as reviewed (skim mode)")
 
 
 def register(sub: argparse._SubParsersAction):
-    review = sub.add_parser("review", help="Review one or more files")
+    review = sub.add_parser("review", help=command_help("review"))
     review.add_argument("items", nargs="*", help="Items defined as either paths or indexes from `ls` command. "
         "If none provided, review all files.")
     review.add_argument("--todo", action="store_true", help="Only review unreviewed files")
-    review.add_argument("--skim", action="store_true", help="Show all diffs and ask for approval as a whole")
+    mode = review.add_mutually_exclusive_group()
+    mode.add_argument("--skim", action="store_true", help="Show all diffs and ask for approval as a whole")
+    mode.add_argument("--hunks", action="store_true", help="Show each file hunk by hunk, approving hunks one at a time")
     review.add_argument("--loc-lte", type=int, help="Only review files with lines changed <= this number")
     review.add_argument(
         "--test-diff-first",
@@ -1,24 +1,27 @@
 import argparse
 import json
 
-from cli.context import Context
-from lib.commands_v0 import CommandsV0
+from cli.context import Context, load_review_state
+from cli.parser import command_help
 
 
-def impl_overview(context: Context, **_):
-    cmdv0 = CommandsV0(
+def _commands_v0(context: Context):
+    # Imported here so `metadata` and `reset --destroy` don't load the diff and GitHub layers.
+    from lib.commands_v0 import CommandsV0
+    return CommandsV0(
         key=context.key,
         state_manager=context.state_manager,
         config=context.config,
+        state=load_review_state(context),
     )
-    cmdv0.cmd_overview()
+
+
+def impl_overview(context: Context, args=None, **_):
+    cmdv0 = _commands_v0(context)
+    cmdv0.cmd_overview(offline=getattr(args, "offline", False))
 
 def impl_status(context: Context, **_):
-    cmdv0 = CommandsV0(
-        key=context.key,
-        state_manager=context.state_manager,
-        config=context.config,
-    )
+    cmdv0 = _commands_v0(context)
     cmdv0.cmd_status()
 
 def impl_reset(context: Context, args=None, **_):
@@ -31,25 +34,17 @@ def impl_reset(context: Context, args=None, **_):
             print("Reset cancelled.")
         return
     
-    cmdv0 = CommandsV0(
-        key=context.key,
-        state_manager=context.state_manager,
-        config=context.config,
-    )
+    cmdv0 = _commands_v0(context)
     cmdv0.cmd_reset()
 
 def impl_ls(context: Context, args, **_):
     todo_only = True if args.todo else False
     raw = getattr(args, 'raw', False)
-    cmdv0 = CommandsV0(
-        key=context.key,
-        state_manager=context.state_manager,
-        config=context.config,
-    )
+    cmdv0 = _commands_v0(context)
     cmdv0.cmd_list_files(todo_only=todo_only, raw=raw)
 
 def impl_metadata(context: Context, **_):
-    state = context.state_manager.load_state(context.key)
+    state = load_review_state(context)
     if not state:
         print(f"No review state found for {context.key}")
         exit(1)
@@ -57,39 +52,33 @@ def impl_metadata(context: Context, **_):
 
 
 def impl_approve(context: Context, **_):
-    cmdv0 = CommandsV0(
-        key=context.key,
-        state_manager=context.state_manager,
-        config=context.config,
-    )
+    cmdv0 = _commands_v0(context)
     cmdv0.cmd_approve()
 
 
 def impl_peek(context: Context, args, **_):
-    cmdv0 = CommandsV0(
-        key=context.key,
-        state_manager=context.state_manager,
-        config=context.config,
-    )
-    cmdv0.cmd_peek(args.item)
+    cmdv0 = _commands_v0(context)
+    cmdv0.cmd_peek(args.item, offline=getattr(args, "offline", False))
 
 def register(sub: argparse._SubParsersAction):
-    status = sub.add_parser("status", help="Status of review")
+    status = sub.add_parser("status", help=command_help("status"))
     status.set_defaults(impl=impl_status)
-    ls = sub.add_parser("ls", help="List of files for this review, including their numbered indexes")
+    ls = sub.add_parser("ls", help=command_help("ls"))
     ls.add_argument("--todo", action="store_true", help="Only list unreviewed files (without changing their indices)")
     ls.add_argument("--raw", action="store_true", help="Output only raw filenames separated by linebreaks")
     ls.set_defaults(impl=impl_ls)
-    overview = sub.add_parser("overview" , help="Print an overview of the request context, including status and list of files")
+    overview = sub.add_parser("overview", help=command_help("overview"))
+    overview.add_argument("--offline", action="store_true", help="Only use cached PR metadata, never call gh")
     overview.set_defaults(impl=impl_overview)
-    reset = sub.add_parser("reset", help="Reset the progress of the code review")
+    reset = sub.add_parser("reset", help=command_help("reset"))
     reset.add_argument("--destroy", action="store_true",
                       help="Permanently delete the review file (requires confirmation)")
     reset.set_defaults(impl=impl_reset)
-    metadata = sub.add_parser("metadata", help="Get metadata from review state, output as JSON")
+    metadata = sub.add_parser("metadata", help=command_help("metadata"))
     metadata.set_defaults(impl=impl_metadata)
-    approve = sub.add_parser("approve", help="Approve the current PR after confirmation")
+    approve = sub.add_parser("approve", help=command_help("approve"))
     approve.set_defaults(impl=impl_approve)
-    peek = sub.add_parser("peek", help="Open a changed file in the GitHub PR diff view by path or index")
+    peek = sub.add_parser("peek", help=command_help("peek"))
     peek.add_argument("item", help="File path, basename (if unique), or numeric index from `ls`")
+    peek.add_argument("--offline", action="store_true", help="Only use cached PR metadata, never call gh")
     peek.set_defaults(impl=impl_peek)
@@ -0,0 +1,40 @@
+import argparse
+import sys
+
+from cli.context import Context
+from cli.parser import command_help
+
+
+def impl_progress(context: Context, **_):
+    progress = context.state_manager.review_progress()
+    if not progress:
+        print("No reviews found")
+        return
+    for p in progress:
+        percent = int(100 * p.reviewed_lines / p.lines) if p.lines else 0
+        print(
+            f"{p.review_id}: {p.lines - p.reviewed_lines} lines remaining | {percent}% reviewed"
+            f" | {p.reviewed_files}/{p.files} files"
+        )
+
+
+def impl_migrate(context: Context, **_):
+    from lib.state_sqlite import SqliteStateManager
+
+    state_manager = context.state_manager
+    if not isinstance(state_manager, SqliteStateManager):
+        print("Set `backend = \"sqlite\"` under [state] in the config to migrate reviews", file=sys.stderr)
+        exit(1)
+    imported = state_manager.migrate_json()
+    for review_id in imported:
+        print(f"Imported {review_id}")
+    print(f"> Migrated {len(imported)} reviews to {state_manager.db_path}")
+
+
+def register(sub: argparse._SubParsersAction):
+    state = sub.add_parser("state", help=command_help("state"))
+    state_sub = state.add_subparsers(dest="state_cmd", required=True)
+    progress = state_sub.add_parser("progress", help="Show progress of every review in this repository")
+    progress.set_defaults(impl=impl_progress)
+    migrate = state_sub.add_parser("migrate", help="Import JSON review files into the SQLite backend")
+    migrate.set_defaults(impl=impl_migrate)
@@ -0,0 +1,72 @@
+import argparse
+import shlex
+import sys
+import time
+
+from cli.context import Context
+from cli.parser import command_help
+from lib import runner
+from lib.runner import CommandRecord, format_size
+
+
+def _kind(argv: list[str]) -> str:
+    """`git diff`, `gh pr view`, ...: the program and its subcommand(s)."""
+    words = [argv[0]] if argv else ["?"]
+    depth = 3 if words[0] == "gh" and argv[1:2] != ["api"] else 2
+    for arg in argv[1:]:
+        if len(words) == depth or arg.startswith("-"):
+            break
+        words.append(arg)
+    return " ".join(words)
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.0f} ms" if seconds < 1 else f"{seconds:.1f} s"
+
+
+def impl_stats(context: Context, args, **_):
+    # Reporting must not replace the session being reported on.
+    runner.discard_session()
+    session = runner.load_session(context.state_manager.acre_dir)
+    if session is None:
+        print("No session recorded yet", file=sys.stderr)
+        exit(1)
+    started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(session.started_at))
+    print(f"Last session: acre {shlex.join(session.argv)} ({_ms(session.duration)}, started {started})")
+
+    calls = [c for c in session.calls if not c.interactive]
+    waiting = sum(c.duration for c in session.calls if c.interactive)
+    failed = sum(1 for c in calls if c.status != 0)
+    summary = f"> {len(calls)} commands | {_ms(sum(c.duration for c in calls))} running them"
+    if failed:
+        summary += f" | {failed} failed"
+    if waiting:
+        summary += f" | {_ms(waiting)} in pager/editor/browser"
+    print(summary)
+    if not calls:
+        return
+
+    groups: dict[str, list[CommandRecord]] = {}
+    for c in calls:
+        groups.setdefault(_kind(c.argv), []).append(c)
+    print(f"\n{'command':24} {'calls':>6} {'total':>9} {'max':>9} {'in':>9} {'out':>9}")
+    for kind, group in sorted(groups.items(), key=lambda kv: -sum(c.duration for c in kv[1])):
+        print(
+            f"{kind:24} {len(group):>6} {_ms(sum(c.duration for c in group)):>9}"
+            f" {_ms(max(c.duration for c in group)):>9}"
+            f" {format_size(sum(c.bytes_in for c in group)):>9}"
+            f" {format_size(sum(c.bytes_out for c in group)):>9}"
+        )
+
+    print("\nSlowest:")
+    for c in sorted(calls, key=lambda c: -c.duration)[: args.top]:
+        print(f"{_ms(c.duration):>9}  exit {c.status}  {shlex.join(c.argv)}")
+
+
+def register(sub: argparse._SubParsersAction):
+    stats = sub.add_parser("stats", help=command_help("stats"))
+    stats.add_argument(
+        "--last-session", action="store_true", help="Report on the previous acre invocation (the default)"
+    )
+    stats.add_argument("--top", type=int, default=10, help="Number of slowest calls to list")
+    stats.set_defaults(impl=impl_stats)
@@ -0,0 +1,79 @@
+import argparse
+import subprocess
+import sys
+from typing import Optional
+
+from cli.context import Context
+from cli.parser import command_help
+from lib.config.config import get_worktree_pool_size
+from lib.models import ReviewState
+from lib.review_identifier import ReviewIdentifier
+from lib.worktrees import WorktreePool
+
+
+def _pool(context: Context) -> WorktreePool:
+    state_manager = context.state_manager
+    return WorktreePool(
+        state_manager.acre_dir, state_manager.repo_root, size=get_worktree_pool_size(context.config)
+    )
+
+
+def _find_review(context: Context, item: str) -> Optional[ReviewState]:
+    """A review by id, or by the number of its PR."""
+    state_manager = context.state_manager
+    state = state_manager.load_state(item)
+    if state is not None or not item.isdigit():
+        return state
+    state = state_manager.load_state(ReviewIdentifier.for_pr(item))
+    if state is not None:
+        return state
+    for review_id in state_manager.review_ids():
+        state = state_manager.load_state(review_id)
+        if state is not None and state.metadata.get("pr_number") == item:
+            return state
+    return None
+
+
+def impl_open(context: Context, args, **_):
+    state = _find_review(context, args.review)
+    if state is None:
+        print(f"No review found for {args.review}; run `init` or `queue sync` first", file=sys.stderr)
+        exit(1)
+    head = state.metadata.get("head_commit") or state.init_commit_sha
+    try:
+        path = _pool(context).open(state.review_id, head)
+    except subprocess.CalledProcessError as e:
+        print(f"Error: could not check out {head}: {(e.stderr or '').strip()}", file=sys.stderr)
+        exit(1)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        exit(1)
+    # Only the path goes to stdout, for `cd "$(acre worktree open 123)"`.
+    print(path)
+
+
+def impl_ls(context: Context, **_):
+    pool = _pool(context)
+    slots = pool.slots()
+    if not slots:
+        print("No worktrees")
+        return
+    for slot in slots:
+        print(f"{slot.name}: {slot.review_id} @ {(slot.head or '')[:12]} ({pool.path(slot)})")
+
+
+def impl_prune(context: Context, **_):
+    removed = _pool(context).remove_all()
+    print(f"> Removed {removed} worktrees")
+
+
+def register(sub: argparse._SubParsersAction):
+    worktree = sub.add_parser("worktree", help=command_help("worktree"))
+    worktree_sub = worktree.add_subparsers(dest="worktree_cmd", required=True)
+    open_ = worktree_sub.add_parser("open", help="Check out a review's head in a pooled worktree and print its path")
+    open_.add_argument("review", help="Review id or PR number")
+    open_.set_defaults(impl=impl_open)
+    ls = worktree_sub.add_parser("ls", help="List the pooled worktrees and their reviews")
+    ls.set_defaults(impl=impl_ls)
+    prune = worktree_sub.add_parser("prune", help="Remove every pooled worktree")
+    prune.set_defaults(impl=impl_prune)
@@ -1,14 +1,21 @@
 import os
 import re
 import subprocess
-from hashlib import sha256
+from typing import Optional
 
 from cli.pretty import print_whimsically
 from cli.util import mark_reviewed_prompt, open_url, yn
-from lib.config.config import get_review_test_diff_patterns, get_review_test_file_patterns
-from lib.sources.git import diff, diff_filtered
-from lib.sources.github import approve_pr, data_from_gh
+from lib.config.config import (
+    get_github_cache_ttl,
+    get_review_test_diff_patterns,
+    get_review_test_file_patterns,
+)
+from lib.diff.service import attach_state, diff, diff_filtered, file_diff, show_hunk
+from lib.hunks import approve_hunk, is_hunk_approved
+from lib.sources.github import GHData, approve_pr
+from lib.sources.github_cache import PRMetadataCache, gh_cache_dir_for, pr_cache_key
 from lib.sources.jira import find_jira_tag
+from lib.models import ReviewState
 from lib.state import StateManager
 
 
@@ -16,18 +23,31 @@ from lib.state import StateManager
 class CommandsV0:
     """Simple earlier versions of some commands."""
 
-    def __init__(self, state_manager: StateManager, key: str, config={}):
+    def __init__(self, state_manager: StateManager, key: str, config={}, state: Optional[ReviewState] = None):
         self.key = key
         self.config = config
         self.state_manager = state_manager
-        _state = self.state_manager.load_state(key)
+        _state = state or self.state_manager.load_state(key)
         if not _state:
             print("No state file: run init first")
             exit(1)
         self.state = _state
-
-    def cmd_overview(self):
-        data = data_from_gh()
+        attach_state(self.state, self.config)
+
+    def pr_data(self, offline: bool = False) -> Optional[GHData]:
+        """PR metadata for this review, from the metadata cache when it is fresh (or offline)."""
+        cache = PRMetadataCache(
+            gh_cache_dir_for(self.state_manager.acre_dir), ttl=get_github_cache_ttl(self.config)
+        )
+        return cache.get(
+            pr_cache_key(self.key, self.state.metadata), offline=offline, pr=self.state.metadata.get("pr_number")
+        )
+
+    def cmd_overview(self, offline: bool = False):
+        data = self.pr_data(offline=offline)
+        if data is None:
+            print("No cached PR metadata (offline)")
+            data = GHData()
         title = data.title or ""
         body = data.body or ""
         print(f"\U0001F4CC PR Summary: {title}")
@@ -65,7 +85,7 @@ class CommandsV0:
         remaining = total - reviewed
         pct = int((reviewed / total) * 100) if total else (100 if reviewed else 0)
         num_files = len(self.state.files)
-        num_files_reviewed = len(self.state.reviewed_files())
+        num_files_reviewed = self.state.reviewed_file_count()
         files_left = num_files - num_files_reviewed
         text = f"> {remaining} lines remaining | {pct}% reviewed | {files_left} files touched"
         if files_left == 0 and num_files > 0:
@@ -89,25 +109,26 @@ class CommandsV0:
             return matches[0]
         return None
 
-    def github_file_url(self, path: str) -> str | None:
+    def github_file_url(self, path: str, offline: bool = False) -> str | None:
         pr_url = self.state.metadata.get("pr_url")
         if not pr_url:
-            data = data_from_gh()
-            pr_url = data.url
+            data = self.pr_data(offline=offline)
+            pr_url = data.url if data else None
             if pr_url:
-                self.state.metadata["pr_url"] = pr_url
+                self.state_manager.set_metadata(self.state, "pr_url", pr_url)
                 self.state_manager.save_state(self.state)
         if not pr_url:
             return None
+        from hashlib import sha256
         return f"{pr_url}/files#diff-{sha256(path.encode('utf-8')).hexdigest()}"
 
-    def cmd_peek(self, item: str) -> bool:
+    def cmd_peek(self, item: str, offline: bool = False) -> bool:
         path = self.resolve_review_path(item)
         if not path:
             print(f"Could not resolve file: {item}")
             return False
 
-        url = self.github_file_url(path)
+        url = self.github_file_url(path, offline=offline)
         if not url:
             print("No GitHub PR URL found in review metadata. Run 'init' on a branch with a GitHub PR.")
             return False
@@ -165,6 +186,44 @@ class CommandsV0:
         lines = self.state.lines_of_file(path)
         print(f"> Marked {lines} lines as reviewed ({mode} mode)")
 
+    def cmd_review_hunks(self, path) -> bool:
+        """
+        Reviews a single file one hunk at a time, saving each approval as it is given.
+
+        Approved hunks are kept as line blocks of the file's head blob, so an interrupted
+        review resumes at the first hunk not yet approved. Files without an in-process diff
+        (binary, or blobs unavailable) are reviewed whole.
+        """
+        if self.state.is_file_reviewed(path):
+            print(f"{path} already reviewed")
+            return False
+        fd = file_diff(path, diff_target=self.state.diff_target())
+        if fd is None or fd.binary or not fd.hunks:
+            return bool(self.cmd_review(path))
+        file_state = self.state.files[path]
+        sha = fd.new_sha or fd.old_sha
+        blocks = file_state.preapproved_blocks if file_state.preapproved_sha == sha else []
+        todo = [(n, hunk) for n, hunk in enumerate(fd.hunks, 1) if not is_hunk_approved(blocks, hunk)]
+        for i, (n, hunk) in enumerate(todo):
+            show_hunk(fd, hunk, file_header=(i == 0))
+            if not mark_reviewed_prompt(
+                path=path,
+                prompt=f"Approve hunk {n}/{len(fd.hunks)}?",
+                on_peek=lambda: self.cmd_peek(path),
+            ):
+                continue
+            blocks = approve_hunk(blocks, hunk)
+            self.state_manager.set_preapproved_blocks(self.state, path, sha, blocks)
+            # Written right away, even in a batched `review`: a hunk may take minutes to read.
+            self.state_manager.flush(self.state)
+            print(f"> Marked {hunk.changed_lines} lines as reviewed (hunk mode)")
+        if not all(is_hunk_approved(blocks, hunk) for hunk in fd.hunks):
+            return False
+        self.state_manager.mark_file_reviewed(self.state, path)
+        self.state_manager.save_state(self.state)
+        print(f"> Marked {path} as reviewed")
+        return True
+
     def cmd_reset(self):
         self.state_manager.do_reset(self.state)
         self.state_manager.save_state(self.state)
@@ -1,12 +1,12 @@
 import os
 import shlex
-import tomllib
 from typing import Dict, List, Optional
 
 def load_config() -> Dict:
     # TODO: accept an override, either from script and os envs or for tests
     config_path = os.path.expanduser("~/.config/acre.toml")
     if os.path.exists(config_path):
+        import tomllib  # Only paid for when there is a config file to parse.
         with open(config_path, "rb") as fh:
             try:
                 return tomllib.load(fh)
@@ -41,6 +41,50 @@ def get_review_test_diff_first_default(config: Dict) -> bool:
     value = review.get("test_diff_first_default")
     return value is True
 
+def get_review_prefetch_depth(config: Dict) -> int:
+    """Number of upcoming diffs to compute in the background during `review` (0 disables)."""
+    review = config.get("review")
+    if not isinstance(review, dict):
+        return 4
+    value = review.get("prefetch")
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        return 4
+    return value
+
+
+def get_review_prefetch_memory_bytes(config: Dict) -> Optional[int]:
+    review = config.get("review")
+    if not isinstance(review, dict):
+        return None
+    value = review.get("prefetch_memory_mb")
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        return None
+    return value * 1024 * 1024
+
+def get_diff_cache_max_bytes(config: Dict) -> int:
+    """Size bound for the on-disk diff cache under .git/acre/cache (default 256 MB)."""
+    cache = config.get("cache")
+    value = cache.get("max_mb") if isinstance(cache, dict) else None
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        return 256 * 1024 * 1024
+    return value * 1024 * 1024
+
+def get_github_cache_ttl(config: Dict) -> float:
+    """Seconds PR metadata is served from .git/acre/gh before asking GitHub again (default 300)."""
+    github = config.get("github")
+    value = github.get("cache_ttl_seconds") if isinstance(github, dict) else None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        return 300.0
+    return float(value)
+
+def get_worktree_pool_size(config: Dict) -> int:
+    """Number of worktrees `worktree open` keeps under .git/acre/worktrees (default 4)."""
+    worktrees = config.get("worktrees")
+    value = worktrees.get("pool_size") if isinstance(worktrees, dict) else None
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        return 4
+    return value
+
 def resolve_cmd_from_config_aliases(cmd: str, config: Dict) -> List[str]:
     aliases = config.get("aliases")
     if aliases:
@@ -71,3 +115,12 @@ def get_default_interact_command_for_args(config: Dict) -> Optional[List[str]]:
     if isinstance(raw, list):
         return raw if raw else None
     return None
+
+
+def get_state_backend(config: Dict) -> str:
+    """Review state storage: "json" (files per review, the default) or "sqlite" (one indexed database)."""
+    state = config.get("state")
+    if not isinstance(state, dict):
+        return "json"
+    backend = state.get("backend")
+    return backend if backend in ("json", "sqlite") else "json"
@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from lib.diff.engine import FileDiff, Hunk
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Part of every key: bump when engine output changes so stale entries are never served.
+ENGINE_VERSION = "myers-2"
+
+
+@dataclass
+class CacheStats:
+    entries: int
+    total_bytes: int
+    max_bytes: int
+
+
+def cache_dir_for(acre_dir: str) -> str:
+    return os.path.join(acre_dir, "cache")
+
+
+def _to_json(fd: FileDiff) -> dict:
+    return {
+        "binary": fd.binary,
+        "modes": [fd.old_mode, fd.new_mode],
+        "hunks": [
+            [h.old_start, h.old_count, h.new_start, h.new_count, h.section, h.lines]
+            for h in fd.hunks
+        ],
+    }
+
+
+def _from_json(data: dict, path: str, old_sha: Optional[str], new_sha: Optional[str]) -> FileDiff:
+    old_mode, new_mode = data.get("modes") or (None, None)
+    return FileDiff(
+        path=path,
+        old_sha=old_sha,
+        new_sha=new_sha,
+        old_mode=old_mode,
+        new_mode=new_mode,
+        binary=bool(data.get("binary")),
+        hunks=[
+            Hunk(old_start=a, old_count=b, new_start=c, new_count=d, section=section, lines=lines)
+            for a, b, c, d, section, lines in data.get("hunks", [])
+        ],
+    )
+
+
+class DiffCache:
+    """
+    Structured diffs on disk, addressed by (old blob SHA, new blob SHA, file modes, diff
+    options).
+
+    Blob SHAs identify content, so an entry stays valid across `reset`, re-inits and
+    sessions. Entries are evicted least-recently-used (by mtime, refreshed on every hit)
+    whenever the directory grows past `max_bytes`: its size is scanned on the first write
+    and kept as a running total from then on.
+    """
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._total: Optional[int] = None  # Bytes on disk, once scanned
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        old_sha: Optional[str],
+        new_sha: Optional[str],
+        options: str,
+        old_mode: Optional[str] = None,
+        new_mode: Optional[str] = None,
+    ) -> str:
+        import hashlib  # Deferred: costly to import and only needed once a diff is looked up.
+        raw = f"{old_sha or ''}\0{new_sha or ''}\0{old_mode or ''}\0{new_mode or ''}\0{options}\0{ENGINE_VERSION}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key[2:]}.json")
+
+    def get(
+        self,
+        path: str,
+        old_sha: Optional[str],
+        new_sha: Optional[str],
+        options: str,
+        old_mode: Optional[str] = None,
+        new_mode: Optional[str] = None,
+    ) -> Optional[FileDiff]:
+        entry = self._entry_path(self.key(old_sha, new_sha, options, old_mode, new_mode))
+        try:
+            with open(entry) as f:
+                data = json.load(f)
+            os.utime(entry)
+        except (OSError, ValueError):
+            return None
+        return _from_json(data, path, old_sha, new_sha)
+
+    def put(self, fd: FileDiff, options: str) -> None:
+        entry = self._entry_path(self.key(fd.old_sha, fd.new_sha, options, fd.old_mode, fd.new_mode))
+        data = json.dumps(_to_json(fd), separators=(",", ":"))
+        try:
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+            try:
+                replaced = os.stat(entry).st_size
+            except FileNotFoundError:
+                replaced = 0
+            tmp = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w") as f:
+                f.write(data)
+            written = os.stat(tmp).st_size
+            os.replace(tmp, entry)
+        except OSError:
+            return
+        with self._lock:
+            if self._total is None:
+                self._total = self.stats().total_bytes
+            else:
+                self._total += written - replaced
+            over = self._total > self.max_bytes
+        if over:
+            self.prune()
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        out: list[tuple[float, int, str]] = []
+        if not os.path.isdir(self.root):
+            return out
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                out.append((st.st_mtime, st.st_size, entry.path))
+        return out
+
+    def stats(self) -> CacheStats:
+        entries = self._entries()
+        return CacheStats(
+            entries=len(entries),
+            total_bytes=sum(size for _, size, _ in entries),
+            max_bytes=self.max_bytes,
+        )
+
+    def prune(self, max_bytes: Optional[int] = None) -> tuple[int, int]:
+        """Evict least-recently-used entries until the cache fits; returns (entries removed, bytes freed)."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = freed = 0
+        for _, size, entry in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(entry)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+            freed += size
+        with self._lock:
+            self._total = total
+        return removed, freed
@@ -0,0 +1,314 @@
+import re
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+# Opcodes are (tag, a_start, a_end, b_start, b_end) with tag in {"equal", "delete", "insert"},
+# using 0-based half-open line ranges like difflib.
+Opcode = tuple[str, int, int, int, int]
+
+DEFAULT_CONTEXT = 3
+# Same heuristic as git: a NUL byte in the first 8000 bytes marks a blob as binary.
+_BINARY_SNIFF_BYTES = 8000
+# Like git, only "\n" ends a line: "\r", form feeds and Unicode separators are content.
+_LINE_END = re.compile(r"(?<=\n)")
+
+
+@dataclass
+class Hunk:
+    old_start: int  # 1-based; for an empty range, the line before it (as in unified headers)
+    old_count: int
+    new_start: int
+    new_count: int
+    lines: list[str] = field(default_factory=list)  # Prefixed with " ", "-" or "+"; line endings kept
+    section: str = ""  # Function context shown after the header, like git
+
+    @property
+    def header(self) -> str:
+        def _range(start: int, count: int) -> str:
+            return str(start) if count == 1 else f"{start},{count}"
+        text = f"@@ -{_range(self.old_start, self.old_count)} +{_range(self.new_start, self.new_count)} @@"
+        return f"{text} {self.section}" if self.section else text
+
+    @property
+    def changed_lines(self) -> int:
+        return sum(1 for ln in self.lines if ln[:1] in {"+", "-"})
+
+
+@dataclass
+class FileDiff:
+    path: str
+    old_sha: Optional[str] = None
+    new_sha: Optional[str] = None
+    old_mode: Optional[str] = None
+    new_mode: Optional[str] = None
+    hunks: list[Hunk] = field(default_factory=list)
+    binary: bool = False
+
+    @property
+    def changed_lines(self) -> int:
+        return sum(h.changed_lines for h in self.hunks)
+
+
+def is_binary(data: bytes) -> bool:
+    return b"\0" in data[:_BINARY_SNIFF_BYTES]
+
+
+def split_lines(data: bytes) -> list[str]:
+    """Decode a blob into lines, keeping line endings so a missing final newline is a change."""
+    lines = _LINE_END.split(data.decode("utf-8", errors="replace"))
+    if lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def myers_opcodes(a: Sequence[str], b: Sequence[str]) -> list[Opcode]:
+    """
+    Line diff using Myers' O(ND) algorithm with the linear-space middle-snake refinement.
+
+    Lines are interned to integers first so the inner loops only compare ints. Within a
+    changed region deletions are reported before insertions, like git.
+    """
+    ids: dict[str, int] = {}
+    a_ids = [ids.setdefault(line, len(ids)) for line in a]
+    b_ids = [ids.setdefault(line, len(ids)) for line in b]
+
+    raw: list[Opcode] = []
+    # Explicit stack instead of recursion; items are ranges to diff or opcodes to emit.
+    stack: list[tuple] = [("range", 0, len(a_ids), 0, len(b_ids))]
+    while stack:
+        item = stack.pop()
+        if item[0] != "range":
+            raw.append(item)
+            continue
+        _, a0, a1, b0, b1 = item
+        while a0 < a1 and b0 < b1 and a_ids[a0] == b_ids[b0]:
+            raw.append(("equal", a0, a0 + 1, b0, b0 + 1))
+            a0 += 1
+            b0 += 1
+        suffix = 0
+        while a1 - suffix > a0 and b1 - suffix > b0 and a_ids[a1 - suffix - 1] == b_ids[b1 - suffix - 1]:
+            suffix += 1
+        if suffix:
+            stack.append(("equal", a1 - suffix, a1, b1 - suffix, b1))
+            a1 -= suffix
+            b1 -= suffix
+        if a0 == a1 and b0 == b1:
+            continue
+        if a0 == a1:
+            raw.append(("insert", a0, a0, b0, b1))
+            continue
+        if b0 == b1:
+            raw.append(("delete", a0, a1, b0, b0))
+            continue
+        x, y = _middle_snake(a_ids, b_ids, a0, a1, b0, b1)
+        if (x, y) in {(a0, b0), (a1, b1)}:
+            # No common subsequence at all: the whole region is a replacement.
+            raw.append(("delete", a0, a1, b0, b0))
+            raw.append(("insert", a1, a1, b0, b1))
+            continue
+        stack.append(("range", x, a1, y, b1))
+        stack.append(("range", a0, x, b0, y))
+    return _normalize(_slide_down(_normalize(raw), a_ids, b_ids))
+
+
+def _middle_snake(a: list[int], b: list[int], a0: int, a1: int, b0: int, b1: int) -> tuple[int, int]:
+    """Find the split point of an optimal edit path by walking it from both ends at once."""
+    n = a1 - a0
+    m = b1 - b0
+    max_d = (n + m + 1) // 2
+    offset = max_d
+    size = 2 * max_d + 2
+    forward = [-1] * size
+    backward = [-1] * size
+    forward[offset + 1] = 0
+    backward[offset + 1] = 0
+    delta = n - m
+    front = delta % 2 != 0
+    k1start = k1end = k2start = k2end = 0
+    for d in range(max_d):
+        for k1 in range(-d + k1start, d + 1 - k1end, 2):
+            k1_off = offset + k1
+            if k1 == -d or (k1 != d and forward[k1_off - 1] < forward[k1_off + 1]):
+                x1 = forward[k1_off + 1]
+            else:
+                x1 = forward[k1_off - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[a0 + x1] == b[b0 + y1]:
+                x1 += 1
+                y1 += 1
+            forward[k1_off] = x1
+            if x1 > n:
+                k1end += 2
+            elif y1 > m:
+                k1start += 2
+            elif front:
+                k2_off = offset + delta - k1
+                if 0 <= k2_off < size and backward[k2_off] != -1 and x1 >= n - backward[k2_off]:
+                    return a0 + x1, b0 + y1
+        for k2 in range(-d + k2start, d + 1 - k2end, 2):
+            k2_off = offset + k2
+            if k2 == -d or (k2 != d and backward[k2_off - 1] < backward[k2_off + 1]):
+                x2 = backward[k2_off + 1]
+            else:
+                x2 = backward[k2_off - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[a1 - x2 - 1] == b[b1 - y2 - 1]:
+                x2 += 1
+                y2 += 1
+            backward[k2_off] = x2
+            if x2 > n:
+                k2end += 2
+            elif y2 > m:
+                k2start += 2
+            elif not front:
+                k1_off = offset + delta - k2
+                if 0 <= k1_off < size and forward[k1_off] != -1:
+                    x1 = forward[k1_off]
+                    y1 = offset + x1 - k1_off
+                    if x1 >= n - x2:
+                        return a0 + x1, b0 + y1
+    return a0, b0
+
+
+def _slide_down(ops: list[Opcode], a: list[int], b: list[int]) -> list[Opcode]:
+    """
+    Shift pure insertions/deletions as far down as possible, like xdiff's change compaction.
+
+    When a block could sit at several positions (e.g. an added function next to a blank
+    line), git reports it at the last one; doing the same keeps hunks familiar.
+    """
+    # A leading empty equal lets every group extend the equal run before it.
+    ops = [("equal", 0, 0, 0, 0)] + list(ops)
+    for idx in range(1, len(ops) - 1):
+        tag, i1, i2, j1, j2 = ops[idx]
+        if tag == "equal" or ops[idx - 1][0] != "equal" or ops[idx + 1][0] != "equal":
+            continue  # Equal run, or part of a replacement region
+        _, e1, e2, f1, f2 = ops[idx + 1]
+        shift = 0
+        if tag == "insert":
+            while f1 + shift < f2 and b[j1 + shift] == b[f1 + shift]:
+                shift += 1
+        else:
+            while e1 + shift < e2 and a[i1 + shift] == a[e1 + shift]:
+                shift += 1
+        if not shift:
+            continue
+        p_tag, p1, p2, q1, q2 = ops[idx - 1]
+        ops[idx - 1] = (p_tag, p1, p2 + shift, q1, q2 + shift)
+        ops[idx] = (tag, i1 + shift, i2 + shift, j1 + shift, j2 + shift)
+        ops[idx + 1] = ("equal", e1 + shift, e2, f1 + shift, f2)
+    return [op for op in ops if op[0] != "equal" or op[2] > op[1]]
+
+
+def _normalize(raw: list[Opcode]) -> list[Opcode]:
+    """Merge adjacent opcodes and order each changed region as one delete then one insert."""
+    out: list[Opcode] = []
+    pending: Optional[list[int]] = None  # [a_start, a_end, b_start, b_end] of a changed region
+
+    def _flush():
+        if pending is None:
+            return
+        pa0, pa1, pb0, pb1 = pending
+        if pa1 > pa0:
+            out.append(("delete", pa0, pa1, pb0, pb0))
+        if pb1 > pb0:
+            out.append(("insert", pa1, pa1, pb0, pb1))
+
+    for tag, i1, i2, j1, j2 in raw:
+        if tag == "equal":
+            _flush()
+            pending = None
+            if out and out[-1][0] == "equal" and out[-1][2] == i1:
+                prev = out[-1]
+                out[-1] = ("equal", prev[1], i2, prev[3], j2)
+            else:
+                out.append((tag, i1, i2, j1, j2))
+            continue
+        if pending is None:
+            pending = [i1, i2, j1, j2]
+        else:
+            pending[0] = min(pending[0], i1)
+            pending[1] = max(pending[1], i2)
+            pending[2] = min(pending[2], j1)
+            pending[3] = max(pending[3], j2)
+    _flush()
+    return out
+
+
+def _section_for(a: Sequence[str], before: int) -> str:
+    """git's default funcname heuristic: nearest earlier line starting with a letter, '_' or '$'."""
+    for idx in range(min(before, len(a)) - 1, -1, -1):
+        line = a[idx]
+        if line[:1].isalpha() or line[:1] in {"_", "$"}:
+            return line.rstrip("\r\n")[:80].rstrip()
+    return ""
+
+
+def build_hunks(a: Sequence[str], b: Sequence[str], context: int = DEFAULT_CONTEXT) -> list[Hunk]:
+    """Group opcodes into unified-diff hunks with `context` lines around each change."""
+    opcodes = myers_opcodes(a, b)
+    if not any(op[0] != "equal" for op in opcodes):
+        return []
+
+    groups: list[list[Opcode]] = []
+    group: list[Opcode] = []
+    for idx, (tag, i1, i2, j1, j2) in enumerate(opcodes):
+        if tag != "equal":
+            group.append((tag, i1, i2, j1, j2))
+            continue
+        first = idx == 0
+        last = idx == len(opcodes) - 1
+        if first:
+            group.append((tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2))
+        elif last:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+        elif i2 - i1 > 2 * context:
+            group.append((tag, i1, i1 + context, j1, j1 + context))
+            groups.append(group)
+            group = [(tag, i2 - context, i2, j2 - context, j2)]
+        else:
+            group.append((tag, i1, i2, j1, j2))
+    if any(op[0] != "equal" for op in group):
+        groups.append(group)
+
+    hunks: list[Hunk] = []
+    for group in groups:
+        a_start, b_start = group[0][1], group[0][3]
+        a_end, b_end = group[-1][2], group[-1][4]
+        lines: list[str] = []
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                lines.extend(" " + ln for ln in a[i1:i2])
+            elif tag == "delete":
+                lines.extend("-" + ln for ln in a[i1:i2])
+            else:
+                lines.extend("+" + ln for ln in b[j1:j2])
+        old_count = a_end - a_start
+        new_count = b_end - b_start
+        hunks.append(Hunk(
+            old_start=a_start + 1 if old_count else a_start,
+            old_count=old_count,
+            new_start=b_start + 1 if new_count else b_start,
+            new_count=new_count,
+            lines=lines,
+            section=_section_for(a, a_start),
+        ))
+    return hunks
+
+
+def diff_blobs(
+    path: str,
+    old: Optional[bytes],
+    new: Optional[bytes],
+    *,
+    old_sha: Optional[str] = None,
+    new_sha: Optional[str] = None,
+    context: int = DEFAULT_CONTEXT,
+) -> FileDiff:
+    """Structured diff between two blob contents (None for a missing side: added or deleted file)."""
+    result = FileDiff(path=path, old_sha=old_sha, new_sha=new_sha)
+    if (old is not None and is_binary(old)) or (new is not None and is_binary(new)):
+        result.binary = True
+        return result
+    result.hunks = build_hunks(split_lines(old or b""), split_lines(new or b""), context=context)
+    return result
@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from lib.diff.service import DiffService, service_for
+
+DEFAULT_PREFETCH_DEPTH = 4
+
+
+class DiffPrefetcher:
+    """
+    Computes the next few diffs of a review on background threads.
+
+    While the reviewer reads one file and answers the prompt, the following files in the
+    selection order are diffed into the service's bounded memo, so showing them is
+    immediate. A no-op when the diff target can't be served in-process.
+    """
+
+    def __init__(self, service: Optional[DiffService], *, depth: int = DEFAULT_PREFETCH_DEPTH, workers: int = 2):
+        self.service = service if depth > 0 else None
+        self.depth = depth
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="acre-prefetch") if self.service else None
+
+    def __enter__(self) -> "DiffPrefetcher":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def schedule(self, upcoming: Iterable[str]) -> None:
+        """Queue the first `depth` of the upcoming paths that aren't cached or in flight yet."""
+        if self.service is None or self._pool is None:
+            return
+        for idx, path in enumerate(upcoming):
+            if idx >= self.depth:
+                break
+            if self.service.cached(path):
+                continue
+            self.service.track(path, self._pool.submit(self.service.warm, path))
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def prefetcher_for(diff_target: str, *, depth: int = DEFAULT_PREFETCH_DEPTH, memory_budget: Optional[int] = None) -> DiffPrefetcher:
+    service = service_for(diff_target)
+    if service is not None and memory_budget is not None:
+        service.set_memory_budget(memory_budget)
+    return DiffPrefetcher(service, depth=depth)
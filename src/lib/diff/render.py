@@ -0,0 +1,70 @@
+from lib.diff.engine import FileDiff, Hunk
+
+# Same palette as git's default diff colors.
+_META = "\033[1m"
+_FRAG = "\033[36m"
+_OLD = "\033[31m"
+_NEW = "\033[32m"
+_RESET = "\033[0m"
+
+_NO_NEWLINE = "\\ No newline at end of file"
+
+
+def _short(sha: str | None) -> str:
+    return (sha or "0" * 40)[:7]
+
+
+def _painter(color: bool):
+    def paint(code: str, text: str) -> str:
+        return f"{code}{text}{_RESET}" if color else text
+    return paint
+
+
+def _hunk_lines(hunk: Hunk, paint) -> list[str]:
+    out = [paint(_FRAG, hunk.header)]
+    for line in hunk.lines:
+        text = line[:-1] if line.endswith("\n") else line
+        if line[0] == "-":
+            out.append(paint(_OLD, text))
+        elif line[0] == "+":
+            out.append(paint(_NEW, text))
+        else:
+            out.append(text)
+        if not line.endswith("\n"):
+            out.append(_NO_NEWLINE)
+    return out
+
+
+def render_hunk(hunk: Hunk, *, color: bool = False) -> str:
+    """Render one hunk, header included, as it appears in `git diff` output."""
+    return "\n".join(_hunk_lines(hunk, _painter(color))) + "\n"
+
+
+def render_file_diff(fd: FileDiff, *, color: bool = False, hunks: bool = True) -> str:
+    """Render a structured diff in `git diff` unified format (only its file header without `hunks`)."""
+    paint = _painter(color)
+
+    out: list[str] = [paint(_META, f"diff --git a/{fd.path} b/{fd.path}")]
+    if fd.old_sha is None and fd.new_sha is not None:
+        out.append(paint(_META, f"new file mode {fd.new_mode or '100644'}"))
+    elif fd.new_sha is None and fd.old_sha is not None:
+        out.append(paint(_META, f"deleted file mode {fd.old_mode or '100644'}"))
+    elif fd.old_mode and fd.new_mode and fd.old_mode != fd.new_mode:
+        out.append(paint(_META, f"old mode {fd.old_mode}"))
+        out.append(paint(_META, f"new mode {fd.new_mode}"))
+    mode = fd.new_mode if fd.old_mode == fd.new_mode and fd.new_mode else ""
+    index = f"index {_short(fd.old_sha)}..{_short(fd.new_sha)}"
+    out.append(paint(_META, f"{index} {mode}" if mode else index))
+    old_name = f"a/{fd.path}" if fd.old_sha else "/dev/null"
+    new_name = f"b/{fd.path}" if fd.new_sha else "/dev/null"
+    if fd.binary:
+        out.append(f"Binary files {old_name} and {new_name} differ")
+        return "\n".join(out) + "\n"
+    if not fd.hunks:
+        return "\n".join(out) + "\n"
+    out.append(paint(_META, f"--- {old_name}"))
+    out.append(paint(_META, f"+++ {new_name}"))
+    if hunks:
+        for hunk in fd.hunks:
+            out.extend(_hunk_lines(hunk, paint))
+    return "\n".join(out) + "\n"
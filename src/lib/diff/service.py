@@ -0,0 +1,267 @@
+import os
+import shlex
+import shutil
+import sys
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Mapping, Optional
+
+from lib import runner
+from lib.config.config import get_diff_cache_max_bytes
+from lib.diff.cache import DiffCache, cache_dir_for
+from lib.diff.engine import DEFAULT_CONTEXT, FileDiff, Hunk, diff_blobs
+from lib.diff.render import render_file_diff, render_hunk
+from lib.models import FileState, ReviewState
+from lib.sources.blobs import BlobReader, blob_name, shared_blob_reader
+from lib.sources.git import diff as git_diff
+from lib.sources.git import diff_filtered as git_diff_filtered
+from lib.sources.git import get_acre_dir, print_matching_lines
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+
+def _split_target(diff_target: str) -> Optional[tuple[str, str]]:
+    """Only explicit `base..head` targets can be diffed from blobs; anything else involves the worktree."""
+    base, sep, head = diff_target.partition("..")
+    if not sep or not base or not head or head.startswith("."):
+        return None
+    return base, head
+
+
+def _approx_size(fd: FileDiff) -> int:
+    return 256 + sum(len(line) + 64 for hunk in fd.hunks for line in hunk.lines)
+
+
+class _DiffMemo:
+    """Least-recently-used FileDiffs, bounded by an approximate byte budget."""
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.used = 0
+        self._items: OrderedDict[str, tuple[FileDiff, int]] = OrderedDict()
+
+    def get(self, path: str) -> Optional[FileDiff]:
+        item = self._items.get(path)
+        if item is None:
+            return None
+        self._items.move_to_end(path)
+        return item[0]
+
+    def put(self, path: str, fd: FileDiff) -> None:
+        size = _approx_size(fd)
+        if size > self.budget:
+            return
+        old = self._items.pop(path, None)
+        if old is not None:
+            self.used -= old[1]
+        self._items[path] = (fd, size)
+        self.used += size
+        while self.used > self.budget:
+            _, (_, evicted) = self._items.popitem(last=False)
+            self.used -= evicted
+
+
+class DiffService:
+    """
+    Computes per-file diffs in-process from blobs served by a shared `git cat-file` reader.
+
+    Blob SHAs recorded in the review state are used when available; otherwise they are
+    resolved as `<rev>:<path>`. Returns None whenever the engine cannot handle a file, so
+    callers fall back to `git diff`. Results are kept in a bounded in-memory memo, which
+    the prefetcher fills ahead of the reviewer, and in the on-disk DiffCache so later
+    sessions don't read blobs again for unchanged files.
+    """
+
+    def __init__(
+        self,
+        base: str,
+        head: str,
+        *,
+        blobs: BlobReader,
+        context: int = DEFAULT_CONTEXT,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        disk_cache: Optional[DiffCache] = None,
+    ):
+        self.base = base
+        self.head = head
+        self.blobs = blobs
+        self.context = context
+        self.files: Mapping[str, FileState] = {}
+        self._lock = threading.Lock()
+        self._memo = _DiffMemo(memory_budget)
+        self._pending: dict[str, "Future"] = {}
+        self.disk_cache = disk_cache
+
+    @property
+    def options(self) -> str:
+        return f"context={self.context}"
+
+    def set_memory_budget(self, budget: int) -> None:
+        with self._lock:
+            self._memo.budget = budget
+
+    def cached(self, path: str) -> bool:
+        with self._lock:
+            return path in self._pending or self._memo.get(path) is not None
+
+    def track(self, path: str, future: "Future") -> None:
+        """Register an in-flight background computation so callers wait for it instead of redoing it."""
+        with self._lock:
+            self._pending[path] = future
+        future.add_done_callback(lambda _f: self._untrack(path, future))
+
+    def _untrack(self, path: str, future: "Future") -> None:
+        with self._lock:
+            if self._pending.get(path) is future:
+                del self._pending[path]
+
+    def blob_shas(self, path: str) -> tuple[Optional[str], Optional[str]]:
+        file_state = self.files.get(path)
+        if file_state is not None and (file_state.base_blob or file_state.head_blob):
+            return file_state.base_blob, file_state.head_blob
+        base_name = blob_name(self.base, path)
+        head_name = blob_name(self.head, path)
+        infos = self.blobs.info_many([base_name, head_name])
+        base_info, head_info = infos.get(base_name), infos.get(head_name)
+        return (
+            base_info.sha if base_info and base_info.type == "blob" else None,
+            head_info.sha if head_info and head_info.type == "blob" else None,
+        )
+
+    def file_diff(self, path: str) -> Optional[FileDiff]:
+        with self._lock:
+            fd = self._memo.get(path)
+            pending = self._pending.get(path)
+        if fd is not None:
+            return fd
+        if pending is not None:
+            try:
+                return pending.result()
+            except Exception:
+                pass
+        return self.warm(path)
+
+    def warm(self, path: str) -> Optional[FileDiff]:
+        """Compute a diff and remember it; used directly by background prefetching."""
+        fd = self.compute(path)
+        if fd is not None:
+            with self._lock:
+                self._memo.put(path, fd)
+        return fd
+
+    def compute(self, path: str) -> Optional[FileDiff]:
+        old_sha, new_sha = self.blob_shas(path)
+        if old_sha is None and new_sha is None:
+            return None
+        file_state = self.files.get(path)
+        old_mode = file_state.base_mode if file_state is not None and old_sha else None
+        new_mode = file_state.head_mode if file_state is not None and new_sha else None
+        if self.disk_cache is not None:
+            cached = self.disk_cache.get(path, old_sha, new_sha, self.options, old_mode, new_mode)
+            if cached is not None:
+                return cached
+        old = self.blobs.read(old_sha) if old_sha else None
+        new = self.blobs.read(new_sha) if new_sha else None
+        if (old_sha and old is None) or (new_sha and new is None):
+            return None
+        fd = diff_blobs(path, old, new, old_sha=old_sha, new_sha=new_sha, context=self.context)
+        fd.old_mode, fd.new_mode = old_mode, new_mode
+        if self.disk_cache is not None:
+            self.disk_cache.put(fd, self.options)
+        return fd
+
+    def render(self, path: str, *, color: bool = False) -> Optional[str]:
+        fd = self.file_diff(path)
+        if fd is None or fd.binary:
+            return None
+        return render_file_diff(fd, color=color)
+
+
+_services: dict[str, DiffService] = {}
+
+
+def service_for(diff_target: str) -> Optional[DiffService]:
+    """Shared service for a diff target, or None if the target can't be diffed from blobs."""
+    if diff_target in _services:
+        return _services[diff_target]
+    ends = _split_target(diff_target)
+    if ends is None:
+        return None
+    service = _services[diff_target] = DiffService(*ends, blobs=shared_blob_reader())
+    try:
+        service.disk_cache = DiffCache(cache_dir_for(get_acre_dir()))
+    except (ValueError, FileNotFoundError):
+        pass
+    return service
+
+
+def attach_state(state: ReviewState, config: Optional[dict] = None) -> None:
+    """Let the service for this review's diff target use the blob SHAs recorded at init."""
+    service = service_for(state.diff_target())
+    if service is None:
+        return
+    service.files = state.files
+    if config and service.disk_cache is not None:
+        service.disk_cache.max_bytes = get_diff_cache_max_bytes(config)
+
+
+def _use_color() -> bool:
+    return sys.stdout.isatty() and not os.environ.get("NO_COLOR")
+
+
+def _show(text: str) -> None:
+    """Print a rendered diff, paging it (like git does) when it doesn't fit the terminal."""
+    if sys.stdout.isatty():
+        rows = shutil.get_terminal_size().lines
+        if text.count("\n") >= rows:
+            pager = os.environ.get("GIT_PAGER") or os.environ.get("PAGER") or "less -FRX"
+            try:
+                runner.run_interactive(shlex.split(pager), input=text, text=True)
+                return
+            except (FileNotFoundError, ValueError):
+                pass
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def diff(path: str, diff_target: str = "main") -> None:
+    """Show the diff of one file, in-process when possible and through `git diff` otherwise."""
+    service = service_for(diff_target)
+    text = service.render(path, color=_use_color()) if service else None
+    if text is None:
+        git_diff(path, diff_target=diff_target)
+        return
+    _show(text)
+
+
+def file_diff(path: str, diff_target: str = "main") -> Optional[FileDiff]:
+    """Structured diff of one file, or None if it can't be computed in-process."""
+    service = service_for(diff_target)
+    return service.file_diff(path) if service else None
+
+
+def show_hunk(fd: FileDiff, hunk: Hunk, *, file_header: bool = False) -> None:
+    """Show one hunk of a file's diff, after the file's header lines if `file_header`."""
+    color = _use_color()
+    text = render_hunk(hunk, color=color)
+    if file_header:
+        text = render_file_diff(fd, color=color, hunks=False) + text
+    _show(text)
+
+
+def diff_filtered(path: str, *, diff_target: str = "main", line_patterns: list[str]) -> int:
+    """Like lib.sources.git.diff_filtered, but over the in-process diff when possible."""
+    service = service_for(diff_target)
+    fd = service.file_diff(path) if service else None
+    if fd is None or fd.binary:
+        return git_diff_filtered(path, diff_target=diff_target, line_patterns=line_patterns)
+    candidates = [
+        line.rstrip("\r\n")
+        for hunk in fd.hunks
+        for line in hunk.lines
+        if line[:1] in {"+", "-"}
+    ]
+    return print_matching_lines(candidates, line_patterns)
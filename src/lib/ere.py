@@ -0,0 +1,137 @@
+import re
+import string
+from functools import lru_cache
+from typing import Iterable, Optional
+
+_PUNCT = "".join(re.escape(c) for c in string.punctuation)
+
+# Contents of a Python character class for each POSIX class (ASCII, as in the C locale).
+_CLASSES = {
+    "alpha": "a-zA-Z",
+    "digit": "0-9",
+    "alnum": "a-zA-Z0-9",
+    "upper": "A-Z",
+    "lower": "a-z",
+    "space": r" \t\n\r\f\v",
+    "blank": r" \t",
+    "punct": _PUNCT,
+    "print": r"\x20-\x7e",
+    "graph": r"\x21-\x7e",
+    "cntrl": r"\x00-\x1f\x7f",
+    "xdigit": "0-9A-Fa-f",
+}
+
+# GNU escapes that grep -E supports outside brackets.
+_ESCAPES = {
+    "w": r"\w",
+    "W": r"\W",
+    "s": r"\s",
+    "S": r"\S",
+    "b": r"\b",
+    "B": r"\B",
+    "<": r"\b(?=\w)",
+    ">": r"\b(?<=\w)",
+    "`": r"\A",
+    "'": r"\Z",
+}
+
+
+def _translate_bracket(pattern: str, i: int) -> tuple[str, int]:
+    """Translate a bracket expression starting after '['; returns (python class, index after ']')."""
+    out = ["["]
+    if i < len(pattern) and pattern[i] == "^":
+        out.append("^")
+        i += 1
+    first = True
+    while True:
+        if i >= len(pattern):
+            raise ValueError("unterminated bracket expression")
+        c = pattern[i]
+        if c == "]" and not first:
+            return "".join(out) + "]", i + 1
+        first = False
+        if c == "[" and i + 1 < len(pattern) and pattern[i + 1] in ":=.":
+            kind = pattern[i + 1]
+            end = pattern.find(kind + "]", i + 2)
+            if end < 0:
+                raise ValueError("unterminated character class")
+            name = pattern[i + 2:end]
+            if kind == ":":
+                if name not in _CLASSES:
+                    raise ValueError(f"invalid character class: {name}")
+                out.append(_CLASSES[name])
+            else:
+                # Equivalence classes and collating symbols: single characters in the C locale.
+                out.append("".join(re.escape(ch) for ch in name))
+            i = end + 2
+            continue
+        if i + 2 < len(pattern) and pattern[i + 1] == "-" and pattern[i + 2] != "]":
+            out.append(f"{re.escape(c)}-{re.escape(pattern[i + 2])}")
+            i += 3
+            continue
+        # Backslash is an ordinary character inside POSIX brackets.
+        out.append(re.escape(c))
+        i += 1
+
+
+def translate_ere(pattern: str) -> str:
+    """
+    Translate one POSIX extended regular expression (as used by `grep -E`) to Python `re`.
+
+    Covers bracket expressions with POSIX classes (`[[:space:]]`), backslash being literal
+    inside brackets, and GNU escapes such as `\\<`, `\\>` and `\\b`. Only whether a line
+    matches is preserved, not POSIX leftmost-longest match extents.
+    """
+    out: list[str] = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "[":
+            translated, i = _translate_bracket(pattern, i + 1)
+            out.append(translated)
+            continue
+        if c == "\\":
+            if i + 1 >= len(pattern):
+                raise ValueError("trailing backslash")
+            nxt = pattern[i + 1]
+            if nxt in _ESCAPES:
+                out.append(_ESCAPES[nxt])
+            elif nxt.isdigit() and nxt != "0":
+                out.append("\\" + nxt)
+            else:
+                out.append(re.escape(nxt))
+            i += 2
+            continue
+        if c == "(" and pattern[i + 1:i + 2] == "?":
+            # "(?" has no meaning in ERE; keep Python from reading it as an extension.
+            out.append(r"(\?")
+            i += 2
+            continue
+        out.append(c)
+        i += 1
+    return "".join(out)
+
+
+@lru_cache(maxsize=32)
+def _compile_all(patterns: tuple[str, ...]) -> tuple[re.Pattern, ...]:
+    compiled = []
+    for p in patterns:
+        try:
+            compiled.append(re.compile(translate_ere(p)))
+        except (ValueError, re.error):
+            # grep -E would reject the pattern; it simply never matches.
+            continue
+    return tuple(compiled)
+
+
+def compile_ere_patterns(patterns: Iterable[str]) -> tuple[re.Pattern, ...]:
+    """Compile ERE patterns once per distinct pattern list; invalid patterns are dropped."""
+    return _compile_all(tuple(patterns))
+
+
+def matches_any(line: str, compiled: tuple[re.Pattern, ...]) -> Optional[re.Match]:
+    for r in compiled:
+        m = r.search(line)
+        if m:
+            return m
+    return None
@@ -0,0 +1,42 @@
+from typing import List, Sequence
+
+from lib.diff.engine import Hunk
+from lib.models import PreApprovalBlock
+
+# Hunk approvals are kept per file as an interval set over the lines of the file at its head
+# blob (FileState.preapproved_blocks at preapproved_sha): sorted, non-overlapping blocks,
+# merged as they touch, each counting the changed lines approved within it.
+
+
+def hunk_span(hunk: Hunk) -> tuple[int, int]:
+    """Lines of the new file a hunk covers, context included (1-based, inclusive)."""
+    if hunk.new_count == 0:
+        # Nothing left on the new side: the hunk sits after line `new_start`.
+        return hunk.new_start, hunk.new_start
+    return hunk.new_start, hunk.new_start + hunk.new_count - 1
+
+
+def is_hunk_approved(blocks: Sequence[PreApprovalBlock], hunk: Hunk) -> bool:
+    start, end = hunk_span(hunk)
+    return any(b.start_line <= start and end <= b.end_line for b in blocks)
+
+
+def approve_hunk(blocks: Sequence[PreApprovalBlock], hunk: Hunk) -> List[PreApprovalBlock]:
+    """A new interval set: `blocks` plus the hunk's span, merged with the blocks it touches."""
+    if is_hunk_approved(blocks, hunk):
+        return list(blocks)
+    start, end = hunk_span(hunk)
+    merged = PreApprovalBlock(start_line=start, end_line=end, lines=hunk.changed_lines)
+    out: list[PreApprovalBlock] = []
+    for block in sorted(blocks, key=lambda b: b.start_line):
+        if block.end_line + 1 < merged.start_line or merged.end_line + 1 < block.start_line:
+            out.append(block)
+            continue
+        merged = PreApprovalBlock(
+            start_line=min(block.start_line, merged.start_line),
+            end_line=max(block.end_line, merged.end_line),
+            notes=block.notes or merged.notes,
+            lines=block.lines + merged.lines,
+        )
+    out.append(merged)
+    return sorted(out, key=lambda b: b.start_line)
@@ -1,24 +1,94 @@
+import subprocess
 import sys
 from typing import Optional
 
+from lib.models import ReviewState
 from lib.review_identifier import ReviewIdentifier
-from lib.sources.git import data_from_git_range
-from lib.sources.github import data_from_gh
+from lib.sources.git import data_from_git_range, resolve_range_commits
+from lib.sources.pr_fetch import data_from_gh_concurrently
 from lib.state import StateManager
 
 
-def cmd_init(state_manager: StateManager, review_id: Optional[str] = None, force: bool = False, git_range: Optional[str] = None) -> None:
-    """Initialize a new code review session"""
+def _new_heads(state: ReviewState, git_range: Optional[str]) -> tuple[str, str]:
+    """Base and head the review should move to: the range's, the review's PR's, or else the checkout's."""
+    if git_range:
+        base, head = resolve_range_commits(git_range)
+        if base is None:
+            raise ValueError(f"Git range '{git_range}' has no base")
+        return base, head
+    from lib.sources.github import pr_heads
+    pr = state.metadata.get("pr_number")
+    try:
+        return pr_heads(pr)
+    except (subprocess.CalledProcessError, FileNotFoundError, ValueError, KeyError):
+        if pr:
+            # Not necessarily the checked-out branch's PR (queued and pool reviews).
+            raise ValueError(f"Could not look up PR #{pr}")
+        base = state.metadata.get("base_commit")
+        if not base:
+            raise ValueError("No PR found and the review has no recorded base commit")
+        _, head = resolve_range_commits("HEAD")
+        print(f"No PR found; refreshing to the checked-out commit {head[:12]}")
+        return base, head
+
+
+def refresh_init(state_manager: StateManager, state: ReviewState, git_range: Optional[str] = None) -> None:
+    """
+    Bring an existing review up to date with new commits without discarding it.
+
+    Only files that differ between the recorded head and the new one (one `git diff --raw`)
+    are looked at again; their entries and line counts are updated and approvals of
+    unchanged lines carried over (see lib.refresh). Every other file is left as it is. If
+    the recorded commits are not available locally, the whole PR is fetched and remapped.
+    """
+    from lib.refresh import incremental_data, print_results, refresh_review
+
+    base, head = _new_heads(state, git_range)
+    if (base, head) == (state.metadata.get("base_commit"), state.metadata.get("head_commit")):
+        print(f"Review '{state.review_id}' is up to date at {head[:12]}")
+        return
+    try:
+        data, touched = incremental_data(state, base, head)
+    except ValueError as e:
+        print(f"Cannot diff against the recorded commits ({e}); refreshing from the whole PR")
+        if git_range:
+            data = data_from_git_range(git_range)
+        else:
+            data = data_from_gh_concurrently(pr=state.metadata.get("pr_number"))
+        touched = None
+        if not data.head_commit:
+            print("Could not determine the PR's new head; review left unchanged.", file=sys.stderr)
+            sys.exit(1)
+    print_results(refresh_review(state_manager, state, data, only=touched))
+    print(f"Refreshed review: {state.review_id}")
+    print(f"Head: {head}")
+
+
+def cmd_init(
+    state_manager: StateManager,
+    review_id: Optional[str] = None,
+    force: bool = False,
+    git_range: Optional[str] = None,
+    refresh: bool = False,
+) -> None:
+    """Initialize a new code review session (or, with `refresh`, update an existing one)"""
     try:
         if not review_id:
             review_id = ReviewIdentifier.determine_review_id()
-        
+
+        if refresh:
+            existing_state = state_manager.load_state(review_id)
+            if existing_state:
+                refresh_init(state_manager, existing_state, git_range)
+                return
+
         if not force:
             # Check if review already exists
             existing_state = state_manager.load_state(review_id)
             if existing_state:
                 print(f"Review '{review_id}' already exists")
                 print(f"Initialized at commit: {existing_state.init_commit_sha}")
+                print("Use --refresh to pick up new commits, or --force to start over")
                 return
         
         # Get data for initial files and line counts
@@ -26,7 +96,7 @@ def cmd_init(state_manager: StateManager, review_id: Optional[str] = None, force
             gh_data = data_from_git_range(git_range)
             print(f"Using git range: {git_range}")
         else:
-            gh_data = data_from_gh()
+            gh_data = data_from_gh_concurrently()
         
         # Initialize new review with data
         state = state_manager.initialize_review(review_id, gh_data)
@@ -1,20 +1,31 @@
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
-@dataclass
+@dataclass(slots=True)
 class PreApprovalBlock:
-    start_line: int
+    start_line: int  # 1-based, inclusive, in the file at `preapproved_sha`
     end_line: int
     notes: Optional[str] = None
+    lines: int = 0  # Changed lines of the diff approved within the block
 
 
-@dataclass
+@dataclass(slots=True)
 class FileState:
     approved_sha: Optional[str] = None
     preapproved_sha: Optional[str] = None
     preapproved_blocks: List[PreApprovalBlock] = field(default_factory=list)
     notes: Optional[str] = None
     lines: int = 0  # Number of changed lines (additions + deletions)
+    base_blob: Optional[str] = None  # Blob SHA at the base of the diff, when known
+    head_blob: Optional[str] = None  # Blob SHA at the head of the diff, when known
+    base_mode: Optional[str] = None  # File mode (e.g. "100755") at the base of the diff, when known
+    head_mode: Optional[str] = None  # File mode at the head of the diff, when known
+
+    def reviewed_lines(self) -> int:
+        """All lines once approved; until then, those of the hunks approved so far."""
+        if self.approved_sha:
+            return self.lines
+        return min(self.lines, sum(b.lines for b in self.preapproved_blocks))
 
     def do_reset(self):
         self.approved_sha = None
@@ -25,17 +36,63 @@ class FileState:
 
 @dataclass
 class ReviewState:
+    """
+    A review and its running totals, which keep status O(1) instead of a pass over every
+    file. The totals are counted when the state is built (so on every load) and kept in
+    step by update_file and reset_files, which the StateManager mutators go through.
+    Changing `files` or a FileState in place is unsupported: call recount() afterwards.
+    """
+
     review_id: str
     init_commit_sha: str
     files: Dict[str, FileState] = field(default_factory=dict)
     notes: Optional[str] = None
     metadata: Dict[str, str] = field(default_factory=dict)
+    _lines: int = field(default=0, init=False, repr=False, compare=False)
+    _reviewed_lines: int = field(default=0, init=False, repr=False, compare=False)
+    _reviewed_count: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.recount()
+
+    def recount(self) -> None:
+        """Recompute the running totals from `files`."""
+        lines = reviewed_lines = reviewed_count = 0
+        for f in self.files.values():
+            lines += f.lines
+            reviewed_lines += f.reviewed_lines()
+            if f.approved_sha:
+                reviewed_count += 1
+        self._lines, self._reviewed_lines, self._reviewed_count = lines, reviewed_lines, reviewed_count
+
+    def update_file(self, path: str, **changes) -> None:
+        """Set fields of a file's state, keeping the running totals in step."""
+        f = self.files[path]
+        self._tally(f, -1)
+        for name, value in changes.items():
+            setattr(f, name, value)
+        self._tally(f)
+
+    def reset_files(self) -> None:
+        """Drop every approval, hunk approval and file note."""
+        for f in self.files.values():
+            f.do_reset()
+        self._reviewed_lines = self._reviewed_count = 0
+
+    def _tally(self, f: FileState, sign: int = 1) -> None:
+        self._lines += sign * f.lines
+        self._reviewed_lines += sign * f.reviewed_lines()
+        if f.approved_sha:
+            self._reviewed_count += sign
 
     def total_lines(self):
-        return sum([f.lines for f in self.files.values()])
+        return self._lines
 
     def total_reviewed_lines(self):
-        return sum([f.lines for f in self.files.values() if f.approved_sha])
+        return self._reviewed_lines
+
+    def reviewed_file_count(self) -> int:
+        return self._reviewed_count
 
     def reviewed_files(self) -> Dict[str, FileState]:
         return {k: f for (k, f) in self.files.items() if f.approved_sha}
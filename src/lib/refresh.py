@@ -0,0 +1,225 @@
+import sys
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from lib.diff.engine import Opcode, myers_opcodes, split_lines
+from lib.diff.service import DiffService, service_for
+from lib.hunks import approve_hunk, hunk_span
+from lib.models import FileState, PreApprovalBlock, ReviewState
+from lib.sources.blobs import blob_name
+from lib.sources.git import GitData, get_changes_in_range, merge_base
+from lib.state import StateManager
+
+if TYPE_CHECKING:
+    from lib.sources.github import GHData
+
+Interval = tuple[int, int]  # 1-based, inclusive line numbers
+# Above this many paths, diff the whole range and filter rather than pass a pathspec.
+PATHSPEC_LIMIT = 1000
+_MARKS = {"remapped": "~", "requeued": "!", "new": "+", "removed": "-"}
+_SUMMARY = ("kept", "remapped", "requeued", "new", "removed")
+
+
+@dataclass
+class FileRefresh:
+    path: str
+    status: str  # "kept", "remapped", "requeued", "new", "pending" or "removed"
+    lines: int = 0
+    reviewed_lines: int = 0
+
+
+def map_intervals(intervals: list[Interval], old: list[str], new: list[str]) -> list[Interval]:
+    """
+    Lines of `new` that are unchanged copies of lines of `old` inside `intervals`, as
+    merged intervals: what is left of a reviewed range after the file was edited.
+    """
+    return _map_intervals(intervals, myers_opcodes(old, new))[0]
+
+
+def _map_intervals(intervals: list[Interval], opcodes: list[Opcode]) -> tuple[list[Interval], list[int]]:
+    """
+    map_intervals, plus where lines of `intervals` were deleted outright: each as the number
+    of `new` lines before the gap they left (a deletion leaves none in the merged intervals).
+    """
+    mapped: list[Interval] = []
+    cuts: list[int] = []
+    for tag, i1, i2, j1, _j2 in opcodes:
+        for start, end in intervals:
+            lo, hi = max(start - 1, i1), min(end, i2)
+            if lo >= hi:
+                continue
+            if tag == "equal":
+                mapped.append((j1 + lo - i1 + 1, j1 + hi - i1))
+            elif tag == "delete":
+                cuts.append(j1)
+    merged: list[Interval] = []
+    for start, end in sorted(mapped):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged, cuts
+
+
+def _content(f: FileState) -> Optional[tuple[str, str]]:
+    """What reviewing a file's diff amounts to: its new content, or the deletion of its old one."""
+    if f.head_blob:
+        return "blob", f.head_blob
+    if f.base_blob:
+        return "deleted", f.base_blob
+    return None
+
+
+def _reviewed(state_manager: StateManager, path: str, old: FileState) -> tuple[Optional[str], list[Interval]]:
+    """The blob the reviewer saw and the line intervals of it they approved."""
+    if old.approved_sha:
+        blob = old.head_blob
+        if blob is None:
+            # Reviews from before blob SHAs were recorded: the file at the approved commit.
+            info = state_manager.blobs.info(blob_name(old.approved_sha, path))
+            blob = info.sha if info and info.type == "blob" else None
+        return blob, [(1, sys.maxsize)]
+    return old.preapproved_sha, [(b.start_line, b.end_line) for b in old.preapproved_blocks]
+
+
+def _carry_over(
+    state_manager: StateManager, service: Optional[DiffService], path: str, old: FileState, new: FileState
+) -> str:
+    """Move what was approved of `old` onto `new`, hunk by hunk; returns the FileRefresh status."""
+    new.notes = old.notes
+    if old.approved_sha and _content(old) is not None and _content(old) == _content(new):
+        new.approved_sha = old.approved_sha
+        return "kept"
+    blob, intervals = _reviewed(state_manager, path, old)
+    fd = service.file_diff(path) if service else None
+    if not blob or not intervals or fd is None or fd.binary or not fd.hunks or not fd.new_sha:
+        return "requeued"
+    old_data = state_manager.blobs.read(blob)
+    new_data = state_manager.blobs.read(fd.new_sha)
+    if old_data is None or new_data is None:
+        return "requeued"
+
+    unchanged, cuts = _map_intervals(intervals, myers_opcodes(split_lines(old_data), split_lines(new_data)))
+    blocks: list[PreApprovalBlock] = []
+    for hunk in fd.hunks:
+        start, end = hunk_span(hunk)
+        # Approved lines deleted since sit between unchanged ones: the hunk showing that is new.
+        if any(lo <= start and end <= hi for lo, hi in unchanged) and not any(start - 1 <= j <= end for j in cuts):
+            blocks = approve_hunk(blocks, hunk)
+    if sum(b.lines for b in blocks) == fd.changed_lines:
+        new.approved_sha = old.approved_sha or state_manager.current_sha
+        return "kept"
+    new.preapproved_sha = fd.new_sha
+    new.preapproved_blocks = blocks
+    return "remapped" if blocks else "requeued"
+
+
+def refresh_review(
+    state_manager: StateManager,
+    state: ReviewState,
+    gh_data: "GHData",
+    only: Optional[set[str]] = None,
+) -> list[FileRefresh]:
+    """
+    Move a review to a new version of its PR (after a force-push, rebase or fixup), keeping
+    the approvals that still hold.
+
+    A file approved whole stays approved if its content is unchanged. Otherwise the
+    approved lines of the blob the reviewer saw are diffed against the new head blob, and
+    the hunks of the new diff lying entirely on unchanged approved lines stay approved; the
+    rest is queued again. Files the PR no longer changes are dropped, new ones are added.
+
+    With `only`, `gh_data` describes just those paths (see incremental_data): every other
+    file keeps its state as is.
+    """
+    old_files = dict(state.files)
+    new_files = state_manager.files_for(gh_data)
+    service = None
+    if gh_data.base_commit and gh_data.head_commit:
+        service = service_for(f"{gh_data.base_commit}..{gh_data.head_commit}")
+        if service is not None:
+            service.files = new_files
+
+    results = []
+    for path, new in new_files.items():
+        change = gh_data.changes.get(path)
+        old = old_files.get(path)
+        if old is None and change is not None and change.old_path:
+            old = old_files.get(change.old_path)  # Renamed since the last version
+        if old is None:
+            status = "new"
+        elif not (old.approved_sha or old.preapproved_blocks):
+            new.notes = old.notes
+            status = "pending"
+        else:
+            status = _carry_over(state_manager, service, path, old, new)
+        results.append(FileRefresh(path, status, new.lines, new.reviewed_lines()))
+    renamed = {c.old_path for c in gh_data.changes.values() if c.old_path}
+    results += [
+        FileRefresh(path, "removed", old.lines, old.reviewed_lines())
+        for path, old in old_files.items()
+        if path not in new_files and path not in renamed and (only is None or path in only)
+    ]
+
+    if only is not None:
+        # Untouched files keep their place (and `ls` index); new ones go last.
+        kept = {path: f for path, f in old_files.items() if path not in only}
+        new_files = {
+            **{path: kept.get(path) or new_files[path] for path in old_files if path in kept or path in new_files},
+            **{path: f for path, f in new_files.items() if path not in old_files},
+        }
+    state_manager.replace_files(state, new_files, gh_data)
+    state_manager.save_state(state)
+    return results
+
+
+def changed_paths(old: str, new: str) -> set[str]:
+    """Paths whose content differs between two commits (both names of renamed files)."""
+    changes = get_changes_in_range(f"{old}..{new}")
+    return {c.path for c in changes} | {c.old_path for c in changes if c.old_path}
+
+
+def incremental_data(state: ReviewState, base: str, head: str) -> tuple[GitData, set[str]]:
+    """
+    The PR data refresh_review needs to move `state` to `base`...`head`, computed only for
+    the paths that can have changed, and those paths.
+
+    That is what differs between the recorded head and the new one (one `git diff --raw`),
+    plus what differs between the fork points when the PR was rebased. Raises ValueError
+    if the review has no recorded commits or they are not available locally.
+    """
+    old_base, old_head = state.metadata.get("base_commit"), state.metadata.get("head_commit")
+    if not old_base or not old_head:
+        raise ValueError("the review has no recorded base and head commits")
+    touched = changed_paths(old_head, head)
+    old_fork, new_fork = merge_base(old_base, old_head), merge_base(base, head)
+    if old_fork != new_fork:
+        touched |= changed_paths(old_fork, new_fork)
+    changes = []
+    if touched:
+        paths = sorted(touched) if len(touched) <= PATHSPEC_LIMIT else None
+        changes = [
+            c for c in get_changes_in_range(f"{base}...{head}", paths) if c.path in touched or c.old_path in touched
+        ]
+    data = GitData(
+        files=[c.path for c in changes],
+        lines_changed={c.path: c.lines for c in changes},
+        base_commit=base,
+        head_commit=head,
+        changes={c.path: c for c in changes},
+    )
+    return data, touched
+
+
+def print_results(results: list[FileRefresh]) -> None:
+    for r in results:
+        if r.status in _MARKS:
+            line = f"{_MARKS[r.status]} {r.path}"
+            if r.status == "remapped":
+                line += f" ({r.lines - r.reviewed_lines} of {r.lines} lines to review again)"
+            print(line)
+    counts = {status: sum(r.status == status for r in results) for status in _SUMMARY}
+    print(
+        f"> {counts['kept']} approvals kept, {counts['remapped']} partly kept, {counts['requeued']} re-queued,"
+        f" {counts['new']} new and {counts['removed']} removed files"
+    )
@@ -1,19 +1,30 @@
 from typing import Optional
 
 from lib.sources.git import get_current_branch, get_current_commit_sha, get_name_rev
+from lib.worktrees import pool_review_id
 
 class ReviewIdentifier:
     """Modular logic for determining review slug/identifier"""
     
     @staticmethod
-    def from_branch() -> Optional[str]:
+    def for_branch(branch_name: str) -> str:
+        """Identifier of the review of a branch, whether or not it is checked out"""
+        # Normalize branch name by replacing "/" with "-"
+        normalized_branch_name = branch_name.replace("/", "-")
+        return f"branch-{normalized_branch_name}"
+
+    @staticmethod
+    def for_pr(number: int | str) -> str:
+        """Identifier of a review prepared for a PR without checking it out (see `queue sync`)"""
+        return f"pr-{number}"
+
+    @classmethod
+    def from_branch(cls) -> Optional[str]:
         """Get identifier from current branch"""
         try:
             branch_name = get_current_branch() or get_name_rev()
             if branch_name and branch_name != "HEAD":
-                # Normalize branch name by replacing "/" with "-"
-                normalized_branch_name = branch_name.replace("/", "-")
-                return f"branch-{normalized_branch_name}"
+                return cls.for_branch(branch_name)
         except ValueError:
             pass
         return None
@@ -29,9 +40,17 @@ class ReviewIdentifier:
             pass
         return None
     
+    @staticmethod
+    def from_worktree_pool() -> Optional[str]:
+        """Get identifier of the review a pool worktree was opened for"""
+        return pool_review_id()
+
     @classmethod
     def determine_review_id(cls) -> str:
         """Determine review ID using fallback strategy"""
+        if pool_id := cls.from_worktree_pool():
+            return pool_id
+
         if branch_id := cls.from_branch():
             return branch_id
 
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+from lib import runner
+from lib.review_identifier import ReviewIdentifier
+from lib.sources.git import ChangedFile, changes_in_range_args, parse_raw_numstat
+from lib.sources.github import GHData, gh_data_from_view
+from lib.sources.pr_fetch import GIT_TIMEOUT, run_command
+from lib.state import StateManager
+
+DEFAULT_SEARCH = "review-requested:@me"
+DEFAULT_LIMIT = 50
+REMOTE = "origin"
+# Fetched PR heads live here, so nothing is checked out and no local branch is touched.
+PR_REF_PREFIX = "refs/acre/pr"
+QUEUE_FIELDS = "number,title,body,url,headRefName,headRefOid,baseRefName,baseRefOid,changedFiles"
+# PR diffs (or GitHub file listings) in flight at once.
+DIFF_WORKERS = 8
+
+
+@dataclass
+class QueuedReview:
+    review_id: str
+    number: int
+    title: str
+    status: str  # "initialized", "exists" or "failed"
+    files: int = 0
+    detail: Optional[str] = None
+
+
+def list_review_requests(search: str = DEFAULT_SEARCH, limit: int = DEFAULT_LIMIT) -> list[dict]:
+    """Open PRs matching `search` (by default those awaiting the current user's review)."""
+    res = runner.run(
+        ["gh", "pr", "list", "--search", search, "--limit", str(limit), "--json", QUEUE_FIELDS],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(res.stdout)
+
+
+def fetch_refspecs(prs: list[dict], remote: str = REMOTE) -> list[str]:
+    heads = [f"+refs/pull/{pr['number']}/head:{PR_REF_PREFIX}/{pr['number']}" for pr in prs]
+    bases = sorted({pr["baseRefName"] for pr in prs if pr.get("baseRefName")})
+    return heads + [f"+refs/heads/{b}:refs/remotes/{remote}/{b}" for b in bases]
+
+
+def fetch_prs(prs: list[dict], remote: str = REMOTE) -> None:
+    """Fetch every PR head and base branch in one `git fetch`."""
+    runner.run(
+        ["git", "fetch", "--quiet", "--no-tags", remote, *fetch_refspecs(prs, remote)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+
+async def _local_changes(pr: dict, remote: str) -> Optional[list[ChangedFile]]:
+    base = pr.get("baseRefOid") or f"refs/remotes/{remote}/{pr.get('baseRefName')}"
+    head = pr.get("headRefOid") or f"{PR_REF_PREFIX}/{pr['number']}"
+    try:
+        return parse_raw_numstat(await run_command(changes_in_range_args(f"{base}...{head}"), GIT_TIMEOUT))
+    except (subprocess.SubprocessError, OSError, ValueError):
+        return None
+
+
+async def _pr_data(pr: dict, remote: str, slots: asyncio.Semaphore) -> GHData:
+    async with slots:
+        changes = await _local_changes(pr, remote)
+        if changes is None:
+            # Commits missing locally: GitHub's files API, in a thread so other PRs keep going.
+            return await asyncio.to_thread(gh_data_from_view, pr)
+        return gh_data_from_view(pr, local_changes=changes)
+
+
+async def _gather_pr_data(prs: list[dict], remote: str) -> list:
+    slots = asyncio.Semaphore(DIFF_WORKERS)
+    return await asyncio.gather(*(_pr_data(pr, remote, slots) for pr in prs), return_exceptions=True)
+
+
+def sync_queue(
+    state_manager: StateManager,
+    search: str = DEFAULT_SEARCH,
+    limit: int = DEFAULT_LIMIT,
+    force: bool = False,
+    remote: str = REMOTE,
+) -> list[QueuedReview]:
+    """
+    Initialize a review for every PR awaiting review, without checking any of them out.
+
+    One `gh pr list` provides the metadata, one `git fetch` the commits, and the diffs of
+    the PRs are computed concurrently (DIFF_WORKERS at a time). Each review is named after
+    its PR number, since head branch names repeat across forks. Reviews that already exist
+    are left alone unless `force` is set.
+    """
+    prs = list_review_requests(search=search, limit=limit)
+    queued = {
+        pr["number"]: QueuedReview(
+            review_id=ReviewIdentifier.for_pr(pr["number"]),
+            number=pr["number"],
+            title=pr.get("title") or "",
+            status="exists",
+        )
+        for pr in prs
+    }
+    todo = [pr for pr in prs if force or state_manager.load_state(queued[pr["number"]].review_id) is None]
+    if not todo:
+        return list(queued.values())
+
+    try:
+        fetch_prs(todo, remote=remote)
+    except subprocess.CalledProcessError as e:
+        print(f"Warning: git fetch failed, using GitHub for file lists: {e.stderr or e}", file=sys.stderr)
+
+    for pr, data in zip(todo, asyncio.run(_gather_pr_data(todo, remote))):
+        entry = queued[pr["number"]]
+        if isinstance(data, BaseException):
+            entry.status, entry.detail = "failed", str(data)
+            continue
+        state = state_manager.initialize_review(entry.review_id, data, init_commit_sha=data.head_commit)
+        entry.status, entry.files = "initialized", len(state.files)
+    return list(queued.values())
@@ -0,0 +1,346 @@
+import atexit
+import base64
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+# Print every external command as it finishes.
+TRACE = os.environ.get("ACRE_TRACE", "") not in ("", "0")
+# Append every external command's argv, input, output and timing to this file (JSON lines).
+RECORD = os.environ.get("ACRE_RECORD") or None
+# Serve external commands from a file written with ACRE_RECORD instead of running them.
+REPLAY = os.environ.get("ACRE_REPLAY") or None
+
+
+class ReplayMissError(subprocess.SubprocessError):
+    """A command was not found in the replayed recording."""
+
+    def __init__(self, argv: list[str]):
+        self.argv = argv
+        super().__init__(f"not in {REPLAY}: {shlex.join(argv)}")
+
+
+@dataclass
+class CommandRecord:
+    argv: list[str]
+    start: float  # Seconds since the session started
+    duration: float
+    status: Optional[int]  # Exit status; None if the command could not be started or timed out
+    bytes_in: int = 0
+    bytes_out: int = 0
+    interactive: bool = False  # Pager, editor, browser: time spent by the user, not by acre
+
+
+@dataclass
+class Exchange:
+    """One recorded command: what it was given and what it returned."""
+
+    argv: list[str]
+    stdin: Optional[str]  # Text, or "base64:..." for binary data (as are stdout and stderr)
+    stdout: Optional[str]
+    stderr: Optional[str]
+    status: Optional[int]
+    duration: float
+    errno: Optional[int] = None  # Set if the command could not be started
+    timed_out: bool = False
+
+
+@dataclass
+class Session:
+    argv: list[str]
+    started_at: float
+    duration: float
+    calls: list[CommandRecord]
+
+
+_started = time.time()
+_t0 = time.perf_counter()
+_calls: list[CommandRecord] = []
+_lock = threading.Lock()
+_save_session = False
+
+
+def record(
+    argv: list[str],
+    start: float,
+    status: Optional[int],
+    bytes_in: int = 0,
+    bytes_out: int = 0,
+    interactive: bool = False,
+) -> None:
+    """Record an external command that started at perf_counter() `start` and just finished."""
+    entry = CommandRecord(
+        argv=[str(a) for a in argv],
+        start=start - _t0,
+        duration=time.perf_counter() - start,
+        status=status,
+        bytes_in=bytes_in,
+        bytes_out=bytes_out,
+        interactive=interactive,
+    )
+    with _lock:
+        _calls.append(entry)
+    if TRACE:
+        print(
+            f"acre: {entry.duration * 1000:8.1f} ms  exit {status}  in {format_size(bytes_in)}"
+            f"  out {format_size(bytes_out)}  {shlex.join(entry.argv)}",
+            file=sys.stderr,
+        )
+
+
+def _len(data) -> int:
+    return len(data) if isinstance(data, (str, bytes)) else 0
+
+
+def run(cmd: list[str], *, interactive: bool = False, **kwargs) -> subprocess.CompletedProcess[Any]:
+    """
+    `subprocess.run` for every external command acre starts, recording argv, duration,
+    bytes in/out and exit status for ACRE_TRACE and `stats`.
+
+    With ACRE_RECORD set, the command's input and output are saved too; with ACRE_REPLAY
+    set, nothing is started and the recorded result is returned (or raised) instead.
+    """
+    if REPLAY:
+        return _run_replayed(cmd, interactive, kwargs)
+    start = time.perf_counter()
+    bytes_in = _len(kwargs.get("input"))
+    try:
+        result = subprocess.run(cmd, **kwargs)
+    except subprocess.CalledProcessError as e:
+        record(cmd, start, e.returncode, bytes_in, _len(e.stdout) + _len(e.stderr), interactive)
+        save_exchange(cmd, kwargs.get("input"), e.stdout, e.stderr, e.returncode, start)
+        raise
+    except subprocess.TimeoutExpired:
+        record(cmd, start, None, bytes_in, 0, interactive)
+        save_exchange(cmd, kwargs.get("input"), None, None, None, start, timed_out=True)
+        raise
+    except OSError as e:
+        record(cmd, start, None, bytes_in, 0, interactive)
+        save_exchange(cmd, kwargs.get("input"), None, None, None, start, errno=e.errno)
+        raise
+    except subprocess.SubprocessError:
+        record(cmd, start, None, bytes_in, 0, interactive)
+        raise
+    record(
+        cmd,
+        start,
+        getattr(result, "returncode", 0),
+        bytes_in,
+        _len(getattr(result, "stdout", None)) + _len(getattr(result, "stderr", None)),
+        interactive,
+    )
+    save_exchange(
+        cmd,
+        kwargs.get("input"),
+        getattr(result, "stdout", None),
+        getattr(result, "stderr", None),
+        getattr(result, "returncode", 0),
+        start,
+    )
+    return result
+
+
+def _run_replayed(cmd: list[str], interactive: bool, kwargs: dict) -> subprocess.CompletedProcess[Any]:
+    start = time.perf_counter()
+    bytes_in = _len(kwargs.get("input"))
+    exchange = replay_exchange(cmd, kwargs.get("input"))
+    if exchange is None:
+        record(cmd, start, None, bytes_in, 0, interactive)
+        raise ReplayMissError(cmd)
+    if exchange.errno is not None:
+        record(cmd, start, None, bytes_in, 0, interactive)
+        raise OSError(exchange.errno, os.strerror(exchange.errno), cmd[0])
+    if exchange.timed_out:
+        record(cmd, start, None, bytes_in, 0, interactive)
+        raise subprocess.TimeoutExpired(cmd, kwargs.get("timeout") or exchange.duration)
+
+    text = bool(kwargs.get("text") or kwargs.get("universal_newlines") or kwargs.get("encoding"))
+    capture = kwargs.get("capture_output", False)
+    stdout = _decode(exchange.stdout, text) if capture or kwargs.get("stdout") == subprocess.PIPE else None
+    stderr = _decode(exchange.stderr, text) if capture or kwargs.get("stderr") == subprocess.PIPE else None
+    status = exchange.status or 0
+    record(cmd, start, status, bytes_in, _len(stdout) + _len(stderr), interactive)
+    if kwargs.get("check") and status:
+        raise subprocess.CalledProcessError(status, cmd, stdout, stderr)
+    return subprocess.CompletedProcess(cmd, status, stdout, stderr)
+
+
+def _encode(data) -> Optional[str]:
+    if data is None:
+        return None
+    if isinstance(data, str):
+        if not data.startswith("base64:"):
+            return data
+        data = data.encode("utf-8")
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        text = None
+    if text is None or text.startswith("base64:"):
+        return "base64:" + base64.b64encode(data).decode("ascii")
+    return text
+
+
+def _decode(data: Optional[str], text: bool):
+    if data is None:
+        return "" if text else b""
+    raw = base64.b64decode(data[7:]) if data.startswith("base64:") else data.encode("utf-8")
+    return raw.decode("utf-8", errors="replace") if text else raw
+
+
+def save_exchange(
+    argv: list[str],
+    stdin,
+    stdout,
+    stderr,
+    status: Optional[int],
+    start: float,
+    errno: Optional[int] = None,
+    timed_out: bool = False,
+) -> None:
+    """With ACRE_RECORD set, append a command that started at perf_counter() `start` to the recording."""
+    if not RECORD:
+        return
+    exchange = Exchange(
+        argv=[str(a) for a in argv],
+        stdin=_encode(stdin),
+        stdout=_encode(stdout),
+        stderr=_encode(stderr),
+        status=status,
+        duration=time.perf_counter() - start,
+        errno=errno,
+        timed_out=timed_out,
+    )
+    line = (json.dumps(asdict(exchange)) + "\n").encode("utf-8")
+    # One O_APPEND write per exchange, so concurrent acre processes can share a recording.
+    fd = os.open(RECORD, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+class Recording:
+    """
+    Exchanges of a recording, looked up by argv and input.
+
+    A command recorded several times is answered with its recorded results in order, and
+    with the last one once they run out.
+    """
+
+    def __init__(self, exchanges: list[Exchange]):
+        self._by_key: dict[tuple, list[Exchange]] = {}
+        self._served: dict[tuple, int] = {}
+        for exchange in exchanges:
+            self._by_key.setdefault((tuple(exchange.argv), exchange.stdin), []).append(exchange)
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        with open(path, "r", encoding="utf-8") as fh:
+            return cls([Exchange(**json.loads(line)) for line in fh if line.strip()])
+
+    def take(self, argv: list[str], stdin) -> Optional[Exchange]:
+        key = (tuple(str(a) for a in argv), _encode(stdin))
+        exchanges = self._by_key.get(key)
+        if not exchanges:
+            return None
+        served = self._served.get(key, 0)
+        self._served[key] = served + 1
+        return exchanges[min(served, len(exchanges) - 1)]
+
+
+_recordings: dict[str, Recording] = {}
+
+
+def replay_exchange(argv: list[str], stdin=None) -> Optional[Exchange]:
+    """The recorded result of a command in the ACRE_REPLAY recording, or None."""
+    assert REPLAY
+    with _lock:
+        recording = _recordings.get(REPLAY)
+        if recording is None:
+            try:
+                recording = _recordings[REPLAY] = Recording.load(REPLAY)
+            except (OSError, ValueError, TypeError) as e:
+                raise ReplayMissError(argv) from e
+        return recording.take(argv, stdin)
+
+
+def run_interactive(cmd: list[str], **kwargs) -> subprocess.CompletedProcess[Any]:
+    """`run` for commands the user interacts with (pager, editor, browser)."""
+    return run(cmd, interactive=True, **kwargs)
+
+
+def calls() -> list[CommandRecord]:
+    with _lock:
+        return list(_calls)
+
+
+def save_session_at_exit() -> None:
+    """Save this process's commands as the last session when it exits (done by the CLI)."""
+    global _save_session
+    if not _save_session:
+        _save_session = True
+        atexit.register(_save_at_exit)
+
+
+def discard_session() -> None:
+    """Keep this process from replacing the saved last session (e.g. while reporting on it)."""
+    global _save_session
+    _save_session = False
+
+
+def session_path(acre_dir: str) -> str:
+    return os.path.join(acre_dir, "stats", "last-session.json")
+
+
+def save_session(acre_dir: str) -> None:
+    path = session_path(acre_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    session = Session(
+        argv=sys.argv[1:],
+        started_at=_started,
+        duration=time.perf_counter() - _t0,
+        calls=calls(),
+    )
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(asdict(session), fh)
+    os.replace(tmp, path)
+
+
+def load_session(acre_dir: str) -> Optional[Session]:
+    try:
+        with open(session_path(acre_dir), "r") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return Session(
+        argv=data.get("argv", []),
+        started_at=data.get("started_at", 0.0),
+        duration=data.get("duration", 0.0),
+        calls=[CommandRecord(**c) for c in data.get("calls", [])],
+    )
+
+
+def _save_at_exit() -> None:
+    if not _save_session or not _calls:
+        return
+    try:
+        from lib.sources.git import get_acre_dir
+        save_session(get_acre_dir())
+    except (OSError, ValueError, subprocess.SubprocessError):
+        pass
+
+
+def format_size(n: int) -> str:
+    if n < 1024:
+        return f"{n} B"
+    if n < 1024 * 1024:
+        return f"{n / 1024:.1f} KB"
+    return f"{n / (1024 * 1024):.1f} MB"
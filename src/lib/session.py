@@ -0,0 +1,30 @@
+from typing import Optional
+
+from lib.models import ReviewState
+from lib.state import StateManager
+
+
+class ReviewSession:
+    """
+    The loaded review of a long-running session (interactive mode), shared by its commands.
+
+    The state is parsed once and reused across prompts. Each access asks the state manager
+    whether anything changed on disk (snapshot replaced, journal grown, database written by
+    another process), which costs a couple of stat calls; only then is the state refreshed.
+    """
+
+    def __init__(self, state_manager: StateManager, key: str, config: dict):
+        self.state_manager = state_manager
+        self.key = key
+        self.config = config
+        self._state: Optional[ReviewState] = None
+
+    def state(self) -> Optional[ReviewState]:
+        if self._state is None:
+            self._state = self.state_manager.load_state(self.key)
+        else:
+            self._state = self.state_manager.refresh(self._state)
+        return self._state
+
+    def invalidate(self) -> None:
+        self._state = None
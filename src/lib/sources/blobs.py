@@ -0,0 +1,214 @@
+import atexit
+import os
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import IO, Iterable, Optional
+
+from lib import runner
+
+
+@dataclass(frozen=True)
+class ObjectInfo:
+    sha: str
+    type: str
+    size: int
+
+
+def blob_name(rev: str, path: str) -> str:
+    """Object name for a path at a revision, as understood by `git cat-file`."""
+    return f"{rev}:{path}"
+
+
+class _BatchProcess:
+    """One `git cat-file <mode>` child process and its pipes."""
+
+    def __init__(self, mode: str, cwd: Optional[str]):
+        self.argv = ["git", "cat-file", mode]
+        self.proc = subprocess.Popen(
+            self.argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=cwd,
+        )
+
+    @property
+    def stdin(self) -> IO[bytes]:
+        assert self.proc.stdin is not None
+        return self.proc.stdin
+
+    @property
+    def stdout(self) -> IO[bytes]:
+        assert self.proc.stdout is not None
+        return self.proc.stdout
+
+    def close(self) -> None:
+        try:
+            self.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self.stdout.close()
+
+
+def _parse_header(line: bytes) -> Optional[ObjectInfo]:
+    parts = line.decode("utf-8", errors="replace").rstrip("\n").split(" ")
+    if len(parts) != 3 or not parts[2].isdigit():
+        # "<name> missing" / "<name> ambiguous"
+        return None
+    return ObjectInfo(sha=parts[0], type=parts[1], size=int(parts[2]))
+
+
+class BlobReader:
+    """
+    Long-lived reader for git objects over `git cat-file --batch` / `--batch-check`.
+
+    Objects can be named by SHA or as `<rev>:<path>`. Each mode is a single child process
+    started on first use and reused for every later request, so reviewing hundreds of files
+    costs two process spawns instead of hundreds. Safe to share between threads.
+    """
+
+    def __init__(self, cwd: Optional[str] = None):
+        self.cwd = cwd
+        self._lock = threading.Lock()
+        self._batch: Optional[_BatchProcess] = None
+        self._check: Optional[_BatchProcess] = None
+
+    def __enter__(self) -> "BlobReader":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def _process(self, mode: str) -> _BatchProcess:
+        if mode == "--batch":
+            if self._batch is None or self._batch.proc.poll() is not None:
+                self._batch = _BatchProcess(mode, self.cwd)
+            return self._batch
+        if self._check is None or self._check.proc.poll() is not None:
+            self._check = _BatchProcess(mode, self.cwd)
+        return self._check
+
+    def info(self, name: str) -> Optional[ObjectInfo]:
+        """Type, size and resolved SHA for an object, or None if it does not exist."""
+        return self.info_many([name]).get(name)
+
+    def size(self, name: str) -> Optional[int]:
+        info = self.info(name)
+        return info.size if info else None
+
+    def info_many(self, names: Iterable[str]) -> dict[str, Optional[ObjectInfo]]:
+        """
+        Look up many objects in one pipelined exchange.
+
+        Requests are written from a helper thread while responses are read, so large
+        batches cannot deadlock on full pipe buffers.
+        """
+        names = [n for n in names if "\n" not in n]
+        if not names:
+            return {}
+        if runner.REPLAY:
+            return {n: _parse_header(self._replayed("--batch-check", n)) for n in names}
+        with self._lock:
+            start = time.perf_counter()
+            try:
+                proc = self._process("--batch-check")
+            except FileNotFoundError:
+                return {n: None for n in names}
+            sent = sum(len(n.encode("utf-8")) + 1 for n in names)
+            received = 0
+
+            def _write():
+                try:
+                    for n in names:
+                        proc.stdin.write(n.encode("utf-8") + b"\n")
+                    proc.stdin.flush()
+                except (BrokenPipeError, OSError):
+                    pass
+
+            writer = threading.Thread(target=_write, daemon=True)
+            writer.start()
+            out: dict[str, Optional[ObjectInfo]] = {}
+            for n in names:
+                line = proc.stdout.readline()
+                if not line:
+                    # cat-file exited (e.g. not a repository): nothing more to read.
+                    out.update({rest: None for rest in names if rest not in out})
+                    break
+                received += len(line)
+                out[n] = _parse_header(line)
+                runner.save_exchange(proc.argv, n + "\n", line, None, 0, start)
+            writer.join()
+            # One exchange with the long-lived process counts as one command.
+            runner.record(proc.argv, start, 0, sent, received)
+            return out
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Contents of an object, or None if it does not exist."""
+        if "\n" in name:
+            return None
+        if runner.REPLAY:
+            header, _, rest = self._replayed("--batch", name).partition(b"\n")
+            info = _parse_header(header)
+            return rest[: info.size] if info else None
+        with self._lock:
+            start = time.perf_counter()
+            try:
+                proc = self._process("--batch")
+                proc.stdin.write(name.encode("utf-8") + b"\n")
+                proc.stdin.flush()
+            except (FileNotFoundError, BrokenPipeError, OSError):
+                return None
+            header = proc.stdout.readline()
+            info = _parse_header(header)
+            if info is None:
+                runner.save_exchange(proc.argv, name + "\n", header, None, 0, start)
+                return None
+            data = proc.stdout.read(info.size)
+            proc.stdout.read(1)  # Trailing newline after the contents
+            runner.record(proc.argv, start, 0, len(name) + 1, len(data))
+            runner.save_exchange(proc.argv, name + "\n", header + data + b"\n", None, 0, start)
+            return data
+
+    def _replayed(self, mode: str, name: str) -> bytes:
+        """
+        Recorded response to one request, one exchange per object so batches can differ.
+        Raises ReplayMissError for objects the recording never asked about.
+        """
+        argv = ["git", "cat-file", mode]
+        return runner.run(argv, input=(name + "\n").encode("utf-8"), capture_output=True).stdout
+
+    def close(self) -> None:
+        with self._lock:
+            for proc in (self._batch, self._check):
+                if proc is not None:
+                    proc.close()
+            self._batch = None
+            self._check = None
+
+
+_shared_readers: dict[str, BlobReader] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_blob_reader(cwd: Optional[str] = None) -> BlobReader:
+    """Process-wide reader for a repository, closed at interpreter exit."""
+    key = os.path.abspath(cwd or os.getcwd())
+    with _shared_lock:
+        reader = _shared_readers.get(key)
+        if reader is None:
+            reader = _shared_readers[key] = BlobReader(cwd=key)
+        return reader
+
+
+@atexit.register
+def _close_shared_readers() -> None:
+    for reader in list(_shared_readers.values()):
+        reader.close()
+    _shared_readers.clear()
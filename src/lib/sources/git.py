@@ -1,8 +1,32 @@
+import os
 import subprocess
 import sys
 from dataclasses import dataclass, field
 from typing import List, Optional
 
+from lib import runner
+from lib.ere import compile_ere_patterns, matches_any
+from lib.sources.repo import locate_repo, read_head
+
+@dataclass
+class ChangedFile:
+    """One file from `git diff --raw --numstat`: identity, blob SHAs and line counts."""
+    path: str
+    status: str
+    old_sha: Optional[str] = None
+    new_sha: Optional[str] = None
+    old_mode: Optional[str] = None
+    new_mode: Optional[str] = None
+    old_path: Optional[str] = None  # Set for renames and copies
+    added: int = 0
+    deleted: int = 0
+    binary: bool = False
+
+    @property
+    def lines(self) -> int:
+        return self.added + self.deleted
+
+
 @dataclass
 class GitData:
     title: Optional[str] = None
@@ -13,12 +37,16 @@ class GitData:
     lines_changed: dict[str, int] = field(default_factory=dict)
     base_commit: Optional[str] = None
     head_commit: Optional[str] = None
+    changes: dict[str, ChangedFile] = field(default_factory=dict)
 
 
 def get_repo_root() -> str:
     """Get repository root directory"""
+    location = locate_repo()
+    if location is not None:
+        return location.root
     try:
-        result = subprocess.run(
+        result = runner.run(
             ["git", "rev-parse", "--show-toplevel"],
             check=True,
             capture_output=True,
@@ -28,9 +56,60 @@ def get_repo_root() -> str:
     except subprocess.CalledProcessError:
         raise ValueError("Not in a git repository")
 
+def get_git_dir(cwd: Optional[str] = None) -> str:
+    """Get the absolute git directory, handling worktrees where .git is a file."""
+    location = locate_repo(cwd)
+    if location is not None:
+        return location.git_dir
+    try:
+        result = runner.run(
+            ["git", "rev-parse", "--absolute-git-dir"],
+            check=True,
+            capture_output=True,
+            text=True,
+            cwd=cwd,
+        )
+        return result.stdout.strip()
+    except subprocess.CalledProcessError:
+        raise ValueError("Not in a git repository")
+
+def get_acre_dir(cwd: Optional[str] = None) -> str:
+    """
+    Where acre keeps reviews and caches: `acre` in the shared git directory, so every linked
+    worktree (including the worktree pool) sees the same reviews.
+
+    Worktrees that already have their own `acre` directory keep using it.
+    """
+    location = locate_repo(cwd)
+    if location is not None:
+        git_dir, common_dir = location.git_dir, location.common_dir
+    else:
+        try:
+            result = runner.run(
+                ["git", "rev-parse", "--absolute-git-dir", "--git-common-dir"],
+                check=True,
+                capture_output=True,
+                text=True,
+                cwd=cwd,
+            )
+        except subprocess.CalledProcessError:
+            raise ValueError("Not in a git repository")
+        git_dir, common_dir = result.stdout.splitlines()[:2]
+        common_dir = os.path.normpath(os.path.join(cwd or os.getcwd(), common_dir))
+    if git_dir != common_dir and os.path.isdir(os.path.join(git_dir, "acre")):
+        return os.path.join(git_dir, "acre")
+    return os.path.join(common_dir, "acre")
+
 def get_current_branch() -> str:
+    """Current branch name, or "" when HEAD is detached (like `git branch --show-current`)."""
+    location = locate_repo()
+    if location is not None:
+        ref, _sha = read_head(location)
+        if ref is None:
+            return ""
+        return ref.removeprefix("refs/heads/")
     try:
-        result = subprocess.run(
+        result = runner.run(
             ["git", "branch", "--show-current"],
             check=True,
             capture_output=True,
@@ -43,7 +122,7 @@ def get_current_branch() -> str:
 def get_name_rev() -> str:
     """This works if on detached head."""
     try:
-        result = subprocess.run(
+        result = runner.run(
             ["git", "name-rev", "--name-only", "HEAD"],
             check=True,
             capture_output=True,
@@ -55,8 +134,13 @@ def get_name_rev() -> str:
 
 def get_current_commit_sha() -> str:
     """Get current commit SHA"""
+    location = locate_repo()
+    if location is not None:
+        _ref, sha = read_head(location)
+        if sha:
+            return sha
     try:
-        result = subprocess.run(
+        result = runner.run(
             ["git", "rev-parse", "HEAD"],
             check=True,
             capture_output=True,
@@ -68,7 +152,7 @@ def get_current_commit_sha() -> str:
 
 def diff(path, diff_target = "main"):
     args = ["git", "diff", diff_target, "--", path]
-    subprocess.run(args)
+    runner.run(args)
 
 def diff_filtered(
     path: str,
@@ -83,7 +167,7 @@ def diff_filtered(
     - Each pattern is tested against both the raw line (including +/-) and the stripped content.
     Returns the number of matching lines printed.
     """
-    result = subprocess.run(
+    result = runner.run(
         ["git", "diff", diff_target, "--", path],
         check=False,
         capture_output=True,
@@ -100,64 +184,31 @@ def diff_filtered(
         if line.startswith("+++ ") or line.startswith("--- "):
             continue
         candidates.append(line)
+    return print_matching_lines(candidates, line_patterns)
 
-    if not candidates:
-        return 0
 
-    try:
-        # test_diff_patterns are documented as grep -E (ERE) patterns; use grep for POSIX class support.
-        def _grep_matching_line_numbers(lines: list[str]) -> list[int]:
-            grep_args = ["grep", "-n", "-E"]
-            for p in line_patterns:
-                grep_args.extend(["-e", p])
-            grep = subprocess.run(
-                grep_args,
-                input="\n".join(lines) + "\n",
-                text=True,
-                capture_output=True,
-                check=False,
-            )
-            if grep.returncode != 0:
-                # 1 = no matches; 2 = grep error. In either case, treat as no matches.
-                return []
-            out = grep.stdout or ""
-            nums: list[int] = []
-            for ln in out.splitlines():
-                if not ln:
-                    continue
-                prefix, _sep, _rest = ln.partition(":")
-                try:
-                    nums.append(int(prefix))
-                except ValueError:
-                    continue
-            return nums
-
-        raw_nums = _grep_matching_line_numbers(candidates)
-        stripped_nums = _grep_matching_line_numbers([c[1:] for c in candidates])
-        matched_nums: list[int] = []
-        seen: set[int] = set()
-        for n in raw_nums + stripped_nums:
-            if n not in seen:
-                seen.add(n)
-                matched_nums.append(n)
-    except FileNotFoundError:
-        return 0
+def print_matching_lines(candidates: list[str], line_patterns: list[str]) -> int:
+    """
+    Print the changed lines (+/- prefixed) matching any pattern; returns the number printed.
 
-    if not matched_nums:
+    test_diff_patterns are documented as grep -E (ERE) patterns; they are translated once per
+    pattern list and matched against both the raw line and its content without the +/- marker.
+    """
+    compiled = compile_ere_patterns(line_patterns)
+    if not candidates or not compiled:
         return 0
 
     printed = 0
-    for n in matched_nums:
-        idx = n - 1
-        if 0 <= idx < len(candidates):
-            print(candidates[idx], file=sys.stdout)
+    for line in candidates:
+        if matches_any(line, compiled) or matches_any(line[1:], compiled):
+            print(line, file=sys.stdout)
             printed += 1
     return printed
 
 def get_files_in_range(git_range: str) -> list[str]:
     """Get list of files changed in a git range"""
     try:
-        result = subprocess.run(
+        result = runner.run(
             ["git", "diff", "--name-only", git_range],
             check=True,
             capture_output=True,
@@ -170,7 +221,7 @@ def get_files_in_range(git_range: str) -> list[str]:
 def get_lines_changed_in_range(git_range: str) -> dict[str, int]:
     """Get lines changed per file in a git range"""
     try:
-        result = subprocess.run(
+        result = runner.run(
             ["git", "diff", "--numstat", git_range],
             check=True,
             capture_output=True,
@@ -197,7 +248,7 @@ def get_commit_sha_from_range(git_range: str) -> str:
         else:
             to_ref = git_range
         
-        result = subprocess.run(
+        result = runner.run(
             ["git", "rev-parse", to_ref],
             check=True,
             capture_output=True,
@@ -207,36 +258,126 @@ def get_commit_sha_from_range(git_range: str) -> str:
     except subprocess.CalledProcessError as e:
         raise ValueError(f"Invalid git reference '{git_range}': {e}")
 
+def _blob_sha(sha: str) -> Optional[str]:
+    return None if not sha or set(sha) == {"0"} else sha
+
+
+def parse_raw_numstat(output: str) -> list[ChangedFile]:
+    """
+    Parse the output of `git diff --raw --numstat -z --no-abbrev`.
+
+    Raw records come first (`:<old_mode> <new_mode> <old_sha> <new_sha> <status>` followed by
+    one path, or two for renames/copies), then numstat records (`<added>\t<deleted>\t<path>`,
+    or `<added>\t<deleted>\t` followed by old and new paths for renames/copies).
+    """
+    tokens = output.split("\0")
+    changes: dict[str, ChangedFile] = {}
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        if not token:
+            continue
+        if token.startswith(":"):
+            old_mode, new_mode, old_sha, new_sha, status = token[1:].split(" ", 4)
+            old_path = None
+            if status[:1] in {"R", "C"}:
+                old_path, path = tokens[i], tokens[i + 1]
+                i += 2
+            else:
+                path = tokens[i]
+                i += 1
+            changes[path] = ChangedFile(
+                path=path,
+                status=status[:1],
+                old_sha=_blob_sha(old_sha),
+                new_sha=_blob_sha(new_sha),
+                old_mode=None if old_mode == "000000" else old_mode,
+                new_mode=None if new_mode == "000000" else new_mode,
+                old_path=old_path,
+            )
+            continue
+        added, deleted, path = token.split("\t", 2)
+        if not path:
+            # Rename or copy: old and new paths follow as separate records.
+            path = tokens[i + 1]
+            i += 2
+        change = changes.get(path)
+        if change is None:
+            change = changes[path] = ChangedFile(path=path, status="M")
+        change.binary = added == "-" and deleted == "-"
+        change.added = int(added) if added != "-" else 0
+        change.deleted = int(deleted) if deleted != "-" else 0
+    return list(changes.values())
+
+
+def changes_in_range_args(git_range: str, paths: Optional[list[str]] = None) -> list[str]:
+    """The `git diff` whose output `parse_raw_numstat` reads (limited to `paths` if given)."""
+    cmd = ["git", "diff", "--raw", "--numstat", "-z", "--no-abbrev", git_range]
+    return [*cmd, "--", *paths] if paths is not None else cmd
+
+
+def get_changes_in_range(git_range: str, paths: Optional[list[str]] = None) -> list[ChangedFile]:
+    """Get changed files, blob SHAs and line counts for a git range in a single diff pass"""
+    try:
+        result = runner.run(
+            changes_in_range_args(git_range, paths),
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        return parse_raw_numstat(result.stdout)
+    except subprocess.CalledProcessError as e:
+        raise ValueError(f"Invalid git range '{git_range}': {e}")
+
+
+def resolve_range_commits(git_range: str) -> tuple[Optional[str], str]:
+    """
+    Resolve both ends of a git range with one `git rev-parse`.
+
+    `A..B` prints B then ^A; `A...B` prints B, A then ^merge-base; a single ref prints itself.
+    Returns (base_commit, head_commit); base_commit is None for a single ref.
+    """
+    try:
+        result = runner.run(
+            ["git", "rev-parse", git_range],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except subprocess.CalledProcessError as e:
+        raise ValueError(f"Invalid git reference '{git_range}': {e}")
+    lines = [ln.strip() for ln in result.stdout.splitlines() if ln.strip()]
+    if not lines:
+        raise ValueError(f"Invalid git reference '{git_range}'")
+    head_commit = lines[0]
+    base_commit = next((ln[1:] for ln in lines if ln.startswith("^")), None)
+    return base_commit, head_commit
+
+
+def merge_base(a: str, b: str) -> str:
+    """Best common ancestor of two commits"""
+    try:
+        result = runner.run(["git", "merge-base", a, b], check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        raise ValueError(f"No merge base for {a} and {b}: {e}")
+    return result.stdout.strip()
+
+
 def data_from_git_range(git_range: str) -> GitData:
     """Get data from a git range instead of GitHub PR"""
     try:
-        files = get_files_in_range(git_range)
-        lines_changed = get_lines_changed_in_range(git_range)
-        head_commit = get_commit_sha_from_range(git_range)
-        
-        # Extract base commit from range if specified
-        base_commit = None
-        if '..' in git_range:
-            base_ref = git_range.split('..')[0]
-            try:
-                result = subprocess.run(
-                    ["git", "rev-parse", base_ref],
-                    check=True,
-                    capture_output=True,
-                    text=True,
-                )
-                base_commit = result.stdout.strip()
-            except subprocess.CalledProcessError:
-                pass
-        
+        changes = get_changes_in_range(git_range)
+        base_commit, head_commit = resolve_range_commits(git_range)
         return GitData(
             title=f"Git range: {git_range}",
             body=f"Changes from git range {git_range}",
             number=None,
-            files=files,
-            lines_changed=lines_changed,
+            files=[c.path for c in changes],
+            lines_changed={c.path: c.lines for c in changes},
             base_commit=base_commit,
             head_commit=head_commit,
+            changes={c.path: c for c in changes},
         )
     except ValueError as e:
         raise ValueError(f"Failed to get data from git range '{git_range}': {e}")
@@ -1,25 +1,141 @@
 import json
+import re
 import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
 
-from lib.sources.git import GitData, get_name_rev
+from lib import runner
+from lib.sources.git import ChangedFile, GitData, get_changes_in_range, get_name_rev
 
 GHData = GitData
 
-def data_from_gh(retry_remote_branch=False):
-    try:
-        cmds = ["gh", "pr", "view", "--json", "title,body,url,files,number,baseRefOid,headRefOid"]
-        if retry_remote_branch:
-            name_rev = get_name_rev()
-            if name_rev.startswith("remotes/origin/"):
-                name_rev = name_rev.replace("remotes/origin/", "")
-            cmds.append(name_rev)
-        res = subprocess.run(
-            cmds,
-            check=True,
-            capture_output=True,
-            text=True,
+# The pull request files API serves at most 3000 files, 100 per page.
+FILES_PER_PAGE = 100
+API_FILES_LIMIT = 3000
+PAGE_WORKERS = 8
+
+_PR_URL_RE = re.compile(r"^https?://([^/]+)/([^/]+/[^/]+)/pull/\d+")
+
+
+def _gh_api(path: str, hostname: Optional[str] = None) -> Any:
+    cmd = ["gh", "api", path]
+    if hostname and hostname != "github.com":
+        cmd += ["--hostname", hostname]
+    res = runner.run(cmd, check=True, capture_output=True, text=True)
+    return json.loads(res.stdout)
+
+
+def fetch_pr_files(pr_url: Optional[str], number: int, total: int) -> list[dict]:
+    """
+    All changed files of a PR (up to the API's 3000), fetching the pages concurrently.
+
+    Pages come back in order, so the file order matches GitHub's.
+    """
+    match = _PR_URL_RE.match(pr_url or "")
+    if not match:
+        raise ValueError(f"Not a pull request URL: {pr_url}")
+    hostname, repo = match.groups()
+    pages = range(1, -(-min(total, API_FILES_LIMIT) // FILES_PER_PAGE) + 1)
+    with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as pool:
+        results = pool.map(
+            lambda page: _gh_api(
+                f"repos/{repo}/pulls/{number}/files?per_page={FILES_PER_PAGE}&page={page}", hostname
+            ),
+            pages,
         )
-        data = json.loads(res.stdout)
+        return [f for page in results for f in page]
+
+
+def _complete_files(data: dict) -> Optional[GitData]:
+    """
+    `gh pr view` truncates the file list of large PRs; fill in the rest.
+
+    Uses the paginated files API, or a local `git diff` of the PR range when the PR has
+    more files than the API serves (or the API fails) and both commits are available.
+    """
+    total = data.get("changedFiles") or 0
+    base, head = data.get("baseRefOid"), data.get("headRefOid")
+    if total > API_FILES_LIMIT and base and head:
+        try:
+            changes = get_changes_in_range(f"{base}...{head}")
+            return GitData(
+                files=[c.path for c in changes],
+                lines_changed={c.path: c.lines for c in changes},
+                changes={c.path: c for c in changes},
+            )
+        except ValueError:
+            pass
+    try:
+        files = fetch_pr_files(data.get("url"), int(data["number"]), total)
+    except (subprocess.CalledProcessError, ValueError, KeyError) as e:
+        print(f"Warning: could not list all {total} changed files: {e}", file=sys.stderr)
+        return None
+    if len(files) < total:
+        print(f"Warning: GitHub lists only {len(files)} of {total} changed files", file=sys.stderr)
+    return GitData(
+        files=[f["filename"] for f in files],
+        lines_changed={f["filename"]: f.get("additions", 0) + f.get("deletions", 0) for f in files},
+    )
+
+
+PR_VIEW_FIELDS = "title,body,url,files,changedFiles,number,baseRefOid,headRefOid"
+# What `overview` and friends show: no file list, so no pagination or local diff on large PRs.
+PR_METADATA_FIELDS = "number,title,body,url,baseRefOid,headRefOid"
+
+
+def pr_heads(pr: Optional[str] = None) -> tuple[str, str]:
+    """Base and head commits of PR `pr` (the current branch's without one), from one small `gh pr view`."""
+    res = runner.run(
+        ["gh", "pr", "view", *([pr] if pr else []), "--json", "baseRefOid,headRefOid"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    data = json.loads(res.stdout)
+    return data["baseRefOid"], data["headRefOid"]
+
+
+def pr_metadata(pr: Optional[str] = None) -> Optional[GHData]:
+    """
+    Title, body, URL and base/head commits of PR `pr` (a number or URL; the current
+    branch's PR without one), but not its files. None if gh finds no such PR.
+    """
+    cmd = ["gh", "pr", "view", *([pr] if pr else []), "--json", PR_METADATA_FIELDS]
+    try:
+        res = runner.run(cmd, check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError:
+        return None
+    return gh_data_from_view(json.loads(res.stdout))
+
+
+def pr_view_args(pr: Optional[str] = None) -> list[str]:
+    """`gh pr view` of the current branch's PR, or of `pr` (a number, URL or branch)."""
+    cmd = ["gh", "pr", "view", "--json", PR_VIEW_FIELDS]
+    if pr:
+        cmd.append(pr)
+    return cmd
+
+
+def remote_branch_name(name_rev: str) -> str:
+    """Branch to look a PR up by when HEAD is detached at a remote branch."""
+    if name_rev.startswith("remotes/origin/"):
+        return name_rev.replace("remotes/origin/", "")
+    return name_rev
+
+
+def gh_data_from_view(data: dict, local_changes: Optional[list[ChangedFile]] = None) -> GHData:
+    """
+    GHData from `gh pr view` JSON.
+
+    `local_changes` (the PR's base...head diff from the local repo) replace the file list
+    of the view: they are complete for any PR size and already carry the blob SHAs.
+    """
+    if local_changes is not None:
+        files = [c.path for c in local_changes]
+        lines_changed = {c.path: c.lines for c in local_changes}
+        changes = {c.path: c for c in local_changes}
+    else:
         files = [
             f.get("path")
             for f in data.get("files", [])
@@ -30,17 +146,35 @@ def data_from_gh(retry_remote_branch=False):
             for f in data.get("files", [])
             if f.get("path")
         }
-        number = int(data.get("number")) if data.get("number") else None
-        return GHData(
-            title=data.get("title"),
-            body=data.get("body"),
-            number=number,
-            url=data.get("url"),
-            files=files,
-            lines_changed=lines_changed,
-            base_commit=data.get("baseRefOid"),
-            head_commit=data.get("headRefOid"),
+        changes = {}
+        if (data.get("changedFiles") or 0) > len(files):
+            complete = _complete_files(data)
+            if complete is not None:
+                files, lines_changed, changes = complete.files, complete.lines_changed, complete.changes
+    number = int(data["number"]) if data.get("number") else None
+    return GHData(
+        title=data.get("title"),
+        body=data.get("body"),
+        number=number,
+        url=data.get("url"),
+        files=files,
+        lines_changed=lines_changed,
+        base_commit=data.get("baseRefOid"),
+        head_commit=data.get("headRefOid"),
+        changes=changes,
+    )
+
+
+def data_from_gh(retry_remote_branch=False):
+    try:
+        branch = remote_branch_name(get_name_rev()) if retry_remote_branch else None
+        res = runner.run(
+            pr_view_args(branch),
+            check=True,
+            capture_output=True,
+            text=True,
         )
+        return gh_data_from_view(json.loads(res.stdout))
     except subprocess.CalledProcessError:
         if not retry_remote_branch:
             return data_from_gh(retry_remote_branch=True)
@@ -50,7 +184,7 @@ def data_from_gh(retry_remote_branch=False):
 
 
 def approve_pr(pr_number: str | int) -> None:
-    subprocess.run(
+    runner.run(
         ["gh", "pr", "review", "--approve", str(pr_number)],
         check=True,
         text=True,
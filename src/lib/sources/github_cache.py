@@ -0,0 +1,147 @@
+import json
+import os
+import re
+import subprocess
+import time
+from typing import Any, Optional
+
+from lib import runner
+from lib.sources.git import GitData
+from lib.sources.github import pr_metadata
+
+DEFAULT_TTL = 300.0
+
+_PR_URL_RE = re.compile(r"^https?://([^/]+)/([^/]+/[^/]+)/pull/(\d+)")
+_FIELDS = ("title", "body", "number", "url", "base_commit", "head_commit")
+
+
+def gh_cache_dir_for(acre_dir: str) -> str:
+    return os.path.join(acre_dir, "gh")
+
+
+def pr_cache_key(review_id: str, metadata: dict) -> str:
+    """PR number and head commit recorded at init; reviews without a known PR use their id."""
+    number, head = metadata.get("pr_number"), metadata.get("head_commit")
+    if number and head:
+        return f"pr-{number}-{head[:12]}"
+    return f"review-{review_id}"
+
+
+class PRMetadataCache:
+    """
+    Pull request metadata (title, body, URL, base/head) on disk under .git/acre/gh.
+
+    Entries are keyed by PR number and head commit (see `pr_cache_key`) and are served
+    without any `gh` call for `ttl` seconds. Stale entries are refetched with `gh api` (much lighter than `gh pr view`),
+    conditionally once an ETag is known: GitHub answers If-None-Match with an empty 304
+    when the PR is unchanged. Offline, whatever is cached is served regardless of age.
+    """
+
+    def __init__(self, root: str, ttl: float = DEFAULT_TTL):
+        self.root = root
+        self.ttl = ttl
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key.replace('/', '_')}.json")
+
+    def _read(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._path(key), "r") as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) and isinstance(entry.get("data"), dict) else None
+
+    def _write(self, key: str, entry: dict) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(entry, fh)
+        os.replace(tmp, path)
+
+    def get(self, key: str, offline: bool = False, pr: Optional[str] = None) -> Optional[GitData]:
+        """
+        Metadata of the PR cached under `key`, fetched or revalidated as needed.
+
+        Fetched by `pr` (its number). Without one, the current branch's PR is shown but
+        not cached: nothing ties it to the review `key` stands for.
+        """
+        entry = self._read(key)
+        if offline:
+            return _to_data(entry["data"]) if entry else None
+        if entry is not None and time.time() - float(entry.get("fetched_at") or 0) < self.ttl:
+            return _to_data(entry["data"])
+        if entry is not None:
+            data = self._revalidate(key, entry)
+            if data is not None:
+                return data
+        data = pr_metadata(pr)
+        if data is None:
+            return GitData()
+        if pr and (data.url or data.title):
+            self._write(key, {"fetched_at": time.time(), "etag": None, "data": _to_json(data)})
+        return data
+
+    def _revalidate(self, key: str, entry: dict) -> Optional[GitData]:
+        match = _PR_URL_RE.match((entry.get("data") or {}).get("url") or "")
+        if not match:
+            return None
+        hostname, repo, number = match.groups()
+        cmd = ["gh", "api", "--include", f"repos/{repo}/pulls/{number}"]
+        if hostname != "github.com":
+            cmd += ["--hostname", hostname]
+        if entry.get("etag"):
+            cmd += ["-H", f"If-None-Match: {entry['etag']}"]
+        try:
+            res = runner.run(cmd, check=True, capture_output=True, text=True)
+            output = res.stdout
+        except subprocess.CalledProcessError as e:
+            # Depending on the gh version a 304 may exit non-zero; its headers are still printed.
+            output = e.stdout or ""
+        status, headers, body = _parse_response(output)
+        if status == 304:
+            entry["fetched_at"] = time.time()
+            self._write(key, entry)
+            return _to_data(entry["data"])
+        if status != 200:
+            return None
+        try:
+            pr = json.loads(body)
+        except ValueError:
+            return None
+        data = GitData(
+            title=pr.get("title"),
+            body=pr.get("body"),
+            number=pr.get("number"),
+            url=pr.get("html_url"),
+            base_commit=(pr.get("base") or {}).get("sha"),
+            head_commit=(pr.get("head") or {}).get("sha"),
+        )
+        self._write(key, {"fetched_at": time.time(), "etag": headers.get("etag"), "data": _to_json(data)})
+        return data
+
+
+def _parse_response(output: str) -> tuple[Optional[int], dict[str, str], str]:
+    """Splits `gh api --include` output into status code, lower-cased headers and body."""
+    head, _, body = output.replace("\r\n", "\n").partition("\n\n")
+    lines = head.split("\n")
+    try:
+        status = int(lines[0].split()[1])
+    except (IndexError, ValueError):
+        return None, {}, ""
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return status, headers, body
+
+
+def _to_json(data: GitData) -> dict:
+    return {name: getattr(data, name) for name in _FIELDS}
+
+
+def _to_data(data: dict) -> GitData:
+    fields: dict[str, Any] = {name: data.get(name) for name in _FIELDS}
+    return GitData(**fields)
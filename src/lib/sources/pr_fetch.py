@@ -0,0 +1,127 @@
+import asyncio
+import json
+import subprocess
+import time
+from typing import Optional
+
+from lib import runner
+
+from lib.sources.git import ChangedFile, changes_in_range_args, parse_raw_numstat
+from lib.sources.github import GHData, gh_data_from_view, pr_view_args, remote_branch_name
+
+GH_TIMEOUT = 30.0
+GIT_TIMEOUT = 60.0
+
+
+async def run_command(cmd: list[str], timeout: float) -> str:
+    """
+    Output of `cmd`, which is killed if it outlives `timeout` or the awaiting task is cancelled.
+
+    Raises CalledProcessError on a non-zero exit and TimeoutExpired on timeout, like subprocess.run.
+    """
+    if runner.REPLAY:
+        return runner.run(cmd, capture_output=True, text=True, check=True).stdout
+    start = time.perf_counter()
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        runner.record(cmd, start, None)
+        runner.save_exchange(cmd, None, None, None, None, start, timed_out=True)
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    except asyncio.CancelledError:
+        proc.kill()
+        try:
+            # Reaped even if cancelled again meanwhile, so no zombie outlives the event loop.
+            await asyncio.shield(proc.wait())
+        finally:
+            runner.record(cmd, start, None)
+        raise
+    runner.record(cmd, start, proc.returncode, 0, len(stdout) + len(stderr))
+    runner.save_exchange(cmd, None, stdout, stderr, proc.returncode, start)
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stdout.decode(), stderr.decode())
+    return stdout.decode()
+
+
+async def _changes(git_range: str, timeout: float) -> list[ChangedFile]:
+    return parse_raw_numstat(await run_command(changes_in_range_args(git_range), timeout))
+
+
+async def _likely_range(timeout: float) -> tuple[str, str]:
+    """Base and head GitHub most likely shows for the checked-out PR: origin's default branch and HEAD."""
+    base, head = (await run_command(["git", "rev-parse", "refs/remotes/origin/HEAD", "HEAD"], timeout)).split()
+    return base, head
+
+
+async def _speculative_changes(likely_range: asyncio.Task, timeout: float) -> list[ChangedFile]:
+    base, head = await likely_range
+    return await _changes(f"{base}...{head}", timeout)
+
+
+async def _result(task: asyncio.Task):
+    """Result of a finished or running task, or None if it failed."""
+    try:
+        return await task
+    except (subprocess.SubprocessError, OSError, ValueError):
+        return None
+
+
+async def gather_pr_data(
+    gh_timeout: float = GH_TIMEOUT, git_timeout: float = GIT_TIMEOUT, pr: Optional[str] = None
+) -> GHData:
+    """
+    PR data for init, overlapping the `gh` round-trip with the local git work.
+
+    `gh pr view`, `git name-rev` (needed if the PR has to be looked up by remote branch) and a
+    speculative local diff all start at once. Once GitHub names the base and head, the
+    speculative diff is used if it matches; otherwise the exact diff is computed if both
+    commits are local, and GitHub's file list is used if not. Every call has a timeout, and
+    whatever is still running when the result is known (or on error) is cancelled.
+
+    With `pr` (a number or URL), that PR is fetched instead of the current branch's.
+    """
+    view = asyncio.create_task(run_command(pr_view_args(pr), gh_timeout))
+    name_rev = asyncio.create_task(run_command(["git", "name-rev", "--name-only", "HEAD"], git_timeout))
+    likely_range = asyncio.create_task(_likely_range(git_timeout))
+    speculative = asyncio.create_task(_speculative_changes(likely_range, git_timeout))
+    tasks = [view, name_rev, likely_range, speculative]
+    try:
+        try:
+            output = await view
+        except subprocess.CalledProcessError:
+            if pr:
+                print(f"No GH data found for PR #{pr}")
+                return GHData()
+            branch = await name_rev
+            try:
+                output = await run_command(pr_view_args(remote_branch_name(branch.strip())), gh_timeout)
+            except subprocess.CalledProcessError:
+                print("No GH data found for branch")
+                return GHData()
+        name_rev.cancel()
+        data = json.loads(output)
+
+        local_changes: Optional[list[ChangedFile]] = None
+        base, head = data.get("baseRefOid"), data.get("headRefOid")
+        if base and head:
+            if await _result(likely_range) == (base, head):
+                local_changes = await _result(speculative)
+            else:
+                speculative.cancel()
+                local_changes = await _result(asyncio.create_task(_changes(f"{base}...{head}", git_timeout)))
+        return gh_data_from_view(data, local_changes=local_changes)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def data_from_gh_concurrently(
+    gh_timeout: float = GH_TIMEOUT, git_timeout: float = GIT_TIMEOUT, pr: Optional[str] = None
+) -> GHData:
+    return asyncio.run(gather_pr_data(gh_timeout=gh_timeout, git_timeout=git_timeout, pr=pr))
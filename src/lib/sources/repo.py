@@ -0,0 +1,122 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+_SHA_RE = re.compile(r"^[0-9a-f]{40}([0-9a-f]{24})?$")
+_MAX_SYMREF_DEPTH = 5
+
+
+@dataclass(frozen=True)
+class RepoLocation:
+    root: str  # Top of the working tree
+    git_dir: str  # Per-worktree git directory (holds HEAD)
+    common_dir: str  # Shared git directory (holds refs, packed-refs, objects)
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _git_dir_from_dotgit(dotgit: str) -> Optional[str]:
+    if os.path.isdir(dotgit):
+        return dotgit
+    content = _read(dotgit)
+    if content is None or not content.startswith("gitdir:"):
+        return None
+    target = content[len("gitdir:"):].strip()
+    return os.path.normpath(os.path.join(os.path.dirname(dotgit), target))
+
+
+def _unsupported(common_dir: str) -> bool:
+    """Layouts where reading files directly could disagree with git; let git answer instead."""
+    if os.path.isdir(os.path.join(common_dir, "reftable")):
+        return True
+    config = _read(os.path.join(common_dir, "config")) or ""
+    return bool(re.search(r"^\s*worktree\s*=", config, re.MULTILINE | re.IGNORECASE))
+
+
+_locations: dict[str, Optional[RepoLocation]] = {}
+
+
+def locate_repo(cwd: Optional[str] = None) -> Optional[RepoLocation]:
+    """
+    Find the repository containing `cwd` by reading `.git` directories and gitdir files.
+
+    Handles linked worktrees and submodules (`.git` files) and the `commondir` indirection.
+    Returns None when the environment or layout needs git's own discovery (GIT_DIR and
+    friends, bare repositories, reftable, core.worktree), so callers fall back to git.
+    """
+    start = os.path.abspath(cwd or os.getcwd())
+    if start in _locations:
+        return _locations[start]
+    location = None
+    if not any(os.environ.get(v) for v in ("GIT_DIR", "GIT_WORK_TREE", "GIT_COMMON_DIR", "GIT_CEILING_DIRECTORIES")):
+        location = _locate(start)
+    _locations[start] = location
+    return location
+
+
+def _locate(start: str) -> Optional[RepoLocation]:
+    d = start
+    while True:
+        dotgit = os.path.join(d, ".git")
+        if os.path.lexists(dotgit):
+            git_dir = _git_dir_from_dotgit(dotgit)
+            if git_dir is None or not os.path.isfile(os.path.join(git_dir, "HEAD")):
+                return None
+            common = _read(os.path.join(git_dir, "commondir"))
+            common_dir = os.path.normpath(os.path.join(git_dir, common.strip())) if common else git_dir
+            if _unsupported(common_dir):
+                return None
+            return RepoLocation(root=d, git_dir=git_dir, common_dir=common_dir)
+        parent = os.path.dirname(d)
+        if parent == d:
+            return None
+        d = parent
+
+
+def _packed_ref(common_dir: str, ref: str) -> Optional[str]:
+    content = _read(os.path.join(common_dir, "packed-refs"))
+    if not content:
+        return None
+    suffix = " " + ref
+    for line in content.splitlines():
+        if line.startswith(("#", "^")):
+            continue
+        if line.endswith(suffix):
+            return line[: -len(suffix)]
+    return None
+
+
+def resolve_ref(location: RepoLocation, ref: str) -> Optional[str]:
+    """Resolve a full ref name (e.g. refs/heads/main) to a SHA via loose refs, then packed-refs."""
+    for _ in range(_MAX_SYMREF_DEPTH):
+        # Per-worktree refs (HEAD, refs/bisect, ...) live in git_dir; the rest in common_dir.
+        base = location.git_dir if not ref.startswith("refs/") or ref.startswith("refs/bisect/") else location.common_dir
+        content = _read(os.path.join(base, ref))
+        if content is None:
+            return _packed_ref(location.common_dir, ref)
+        content = content.strip()
+        if content.startswith("ref:"):
+            ref = content[len("ref:"):].strip()
+            continue
+        return content if _SHA_RE.match(content) else None
+    return None
+
+
+def read_head(location: RepoLocation) -> tuple[Optional[str], Optional[str]]:
+    """
+    Returns (branch ref, commit SHA) for HEAD.
+
+    The ref is None when HEAD is detached; the SHA is None for an unborn branch.
+    """
+    content = (_read(os.path.join(location.git_dir, "HEAD")) or "").strip()
+    if content.startswith("ref:"):
+        ref = content[len("ref:"):].strip()
+        return ref, resolve_ref(location, ref)
+    return None, content if _SHA_RE.match(content) else None
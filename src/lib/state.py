@@ -1,10 +1,28 @@
 import json
 import os
-import subprocess
-from typing import Optional
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator, Optional, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
 
 from lib.models import FileState, PreApprovalBlock, ReviewState
-from lib.sources.github import GHData
+from lib.sources.git import get_acre_dir
+
+if TYPE_CHECKING:
+    from lib.sources.blobs import BlobReader
+    from lib.sources.github import GHData
+
+# Rewrite the snapshot once the journal holds this many mutations.
+JOURNAL_COMPACT_OPS = 1000
+# Seconds between background writes of a dirty review inside a unit of work.
+FLUSH_INTERVAL = 5.0
 
 class StateManager:
     """Manages review state persistence in .git/acre directory"""
@@ -12,136 +30,579 @@ class StateManager:
     def __init__(self, repo_root: str, current_sha: str):
         self.repo_root = repo_root
         self.current_sha = current_sha
-        self.acre_dir = os.path.join(self._get_git_dir(repo_root), "acre")
+        self.acre_dir = get_acre_dir(repo_root)
         os.makedirs(self.acre_dir, exist_ok=True)
+        self._pending: dict[str, list[dict]] = {}  # Unsaved mutations per review
+        self._seen: dict[str, _Seen] = {}  # What is on disk for reviews this manager loaded or saved
+        self._batches: dict[str, _Batch] = {}  # Open units of work per review
+        self._rewrite: set[str] = set()  # Reviews whose next save must replace the snapshot
+        self._lock = threading.RLock()  # Guards the bookkeeping above; ReviewState itself is not shared
 
-    @staticmethod
-    def _get_git_dir(repo_root: str) -> str:
-        """Get the actual git directory, handling worktrees where .git is a file."""
-        result = subprocess.run(
-            ["git", "rev-parse", "--git-dir"],
-            check=True,
-            capture_output=True,
-            text=True,
-            cwd=repo_root,
-        )
-        git_dir = result.stdout.strip()
-        if not os.path.isabs(git_dir):
-            git_dir = os.path.join(repo_root, git_dir)
-        return git_dir
-    
+    @property
+    def blobs(self) -> "BlobReader":
+        """Shared `git cat-file` reader for this repository."""
+        from lib.sources.blobs import shared_blob_reader
+        return shared_blob_reader(self.repo_root)
 
     def state_file_path(self, review_id: str) -> str:
         """Get path to state file for given review ID"""
+        return self._snapshot_path(review_id)
+
+    def _snapshot_path(self, review_id: str) -> str:
         return os.path.join(self.acre_dir, f"{review_id}.json")
-    
+
+    def journal_file_path(self, review_id: str) -> str:
+        """Get path to the journal of mutations applied on top of the state file"""
+        return os.path.join(self.acre_dir, f"{review_id}.journal")
+
+    def lock_file_path(self, review_id: str) -> str:
+        return os.path.join(self.acre_dir, f"{review_id}.lock")
+
+    @contextmanager
+    def locked(self, review_id: str) -> Iterator[None]:
+        """
+        Hold the review's advisory lock, serializing read-modify-write cycles across processes.
+
+        A no-op where `fcntl` is unavailable; writes are still atomic there.
+        """
+        with open(self.lock_file_path(review_id), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _record(self, state: ReviewState, op: dict) -> None:
+        with self._lock:
+            self._pending.setdefault(state.review_id, []).append(op)
+
+    @contextmanager
+    def unit_of_work(self, state: ReviewState, flush_interval: Optional[float] = FLUSH_INTERVAL) -> Iterator[None]:
+        """
+        Coalesce the saves of `state` made inside the block into as few writes as possible.
+
+        save_state only marks the review dirty; it is written once when the block ends
+        (also on exceptions, Ctrl-C and SIGTERM/SIGHUP), and by the first save_state
+        coming `flush_interval` seconds after the previous write, so a long session never
+        holds much unsaved work. Writes happen on the caller's thread, never concurrently
+        with its changes to `state`. Nested blocks join the outer one.
+        """
+        review_id = state.review_id
+        with self._lock:
+            nested = review_id in self._batches
+            batch = self._batches.get(review_id)
+            if batch is None:
+                batch = self._batches[review_id] = _Batch(state, flush_interval)
+                batch.schedule()
+        if nested:
+            yield
+            return
+        try:
+            with _exit_on_signals():
+                yield
+        finally:
+            with self._lock:
+                del self._batches[review_id]
+                self._flush(batch)
+
+    def _flush(self, batch: "_Batch") -> None:
+        with self._lock:
+            if batch.dirty:
+                batch.dirty = False
+                self._save(batch.state)
+            batch.schedule()
+
+    def flush(self, state: ReviewState) -> None:
+        """Save review state to disk now, even inside a unit_of_work (for changes that must not wait)"""
+        with self._lock:
+            batch = self._batches.get(state.review_id)
+            if batch is not None and batch.state is state:
+                batch.dirty = True
+                self._flush(batch)
+                return
+            self._save(state)
+
     def save_state(self, state: ReviewState) -> None:
-        """Save review state to disk"""
-        state_dict = {
-            "review_id": state.review_id,
-            "init_commit_sha": state.init_commit_sha,
-            "files": {
-                path: {
-                    "approved_sha": file_state.approved_sha,
-                    "preapproved_sha": file_state.preapproved_sha,
-                    "preapproved_blocks": [
-                        {
-                            "start_line": block.start_line,
-                            "end_line": block.end_line,
-                            "notes": block.notes
-                        }
-                        for block in file_state.preapproved_blocks
-                    ],
-                    "notes": file_state.notes,
-                    "lines": file_state.lines
-                }
-                for path, file_state in state.files.items()
-            },
-            "notes": state.notes,
-            "metadata": state.metadata
-        }
-        
-        state_file = self.state_file_path(state.review_id)
-        with open(state_file, "w") as f:
-            json.dump(state_dict, f, indent=2)
-    
+        """Save review state to disk, or mark it dirty inside a unit_of_work"""
+        with self._lock:
+            batch = self._batches.get(state.review_id)
+            if batch is not None and batch.state is state:
+                batch.dirty = True
+                if batch.due():
+                    self._flush(batch)
+                return
+            self._save(state)
+
+    def _save(self, state: ReviewState) -> None:
+        """
+        Write review state to disk.
+
+        Mutations made through this manager (mark_file_reviewed, set_preapproved_blocks,
+        do_reset, set_notes, set_metadata) on a review it loaded are appended to the review's journal, so an
+        approval costs one small write. Anything else, and every JOURNAL_COMPACT_OPS
+        entries, atomically replaces the snapshot and starts a fresh journal.
+
+        Changes another process saved since this one loaded the review are merged into
+        `state` first: their journaled mutations are applied underneath ours, and
+        approvals of files we haven't touched are kept even if they compacted meanwhile.
+        """
+        review_id = state.review_id
+        ops = self._pending.pop(review_id, [])
+        rewrite = review_id in self._rewrite
+        self._rewrite.discard(review_id)
+        with self.locked(review_id):
+            seen = self._seen.get(review_id)
+            if seen is not None and not rewrite:
+                seen = self._catch_up(state, seen, ops)
+            if rewrite or not ops or seen is None or seen.ops + len(ops) > JOURNAL_COMPACT_OPS:
+                self._write_snapshot(state)
+                return
+            data = "".join(json.dumps(op, separators=(",", ":")) + "\n" for op in ops).encode("utf-8")
+            with open(self.journal_file_path(review_id), "ab") as f:
+                f.write(data)
+            self._seen[review_id] = _Seen(seen.snapshot, seen.offset + len(data), seen.ops + len(ops))
+
+    def _catch_up(self, state: ReviewState, seen: "_Seen", ops: list[dict]) -> Optional["_Seen"]:
+        """Fold in changes saved by other processes since `seen`; returns what is on disk now."""
+        snapshot = _signature(self._snapshot_path(state.review_id))
+        if snapshot is None:
+            return None
+        if snapshot == seen.snapshot:
+            theirs, offset = self._read_journal(state.review_id, seen.offset)
+            if not theirs:
+                return seen
+            for op in theirs:
+                _apply_op(state, op)
+            for op in ops:
+                _apply_op(state, op)
+            return _Seen(snapshot, offset, seen.ops + len(theirs))
+
+        # Rewritten underneath us: start from the disk state and re-apply our changes on top.
+        disk, now = self._read(state.review_id)
+        if disk is None:
+            return None
+        touched = {op.get("path") for op in ops if op.get("op") in ("approve", "reset")}
+        if any(op.get("op") == "reset" for op in ops):
+            touched = set(disk.files)
+        for path, file_state in disk.files.items():
+            ours = state.files.get(path)
+            if ours is not None and path not in touched and ours.approved_sha is None:
+                state.update_file(path, approved_sha=file_state.approved_sha)
+        for key, value in disk.metadata.items():
+            state.metadata.setdefault(key, value)
+        return now
+
+    def _write_snapshot(self, state: ReviewState) -> None:
+        """Replace the snapshot atomically, so an interrupted write leaves the previous one intact."""
+        state_file = self._snapshot_path(state.review_id)
+        tmp = f"{state_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(_state_to_dict(state), f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, state_file)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        # The snapshot already reflects every journaled op; replaying them would be harmless
+        # (ops are assignments) but wasteful, so start over.
+        try:
+            os.remove(self.journal_file_path(state.review_id))
+        except FileNotFoundError:
+            pass
+        self._seen[state.review_id] = _Seen(_signature(state_file), 0, 0)
+
+    def _read_journal(self, review_id: str, offset: int = 0) -> tuple[list[dict], int]:
+        """Journaled ops from byte `offset` on, and the offset just past the last complete one."""
+        ops = []
+        try:
+            with open(self.journal_file_path(review_id), "rb+") as f:
+                f.seek(offset)
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated journal entry")
+                        op = json.loads(line)
+                    except ValueError:
+                        # A torn final line from an interrupted append: everything before it
+                        # stands, and dropping it keeps later appends on a line of their own.
+                        f.truncate(offset)
+                        break
+                    ops.append(op)
+                    offset += len(line)
+        except FileNotFoundError:
+            pass
+        return ops, offset
+
+    def _read(self, review_id: str) -> tuple[Optional[ReviewState], Optional["_Seen"]]:
+        state_file = self._snapshot_path(review_id)
+        try:
+            with open(state_file) as f:
+                snapshot = _signature(state_file)
+                state = _state_from_dict(json.load(f))
+        except FileNotFoundError:
+            return None, None
+        ops, offset = self._read_journal(review_id)
+        for op in ops:
+            _apply_op(state, op)
+        return state, _Seen(snapshot, offset, len(ops))
+
     def load_state(self, review_id: str) -> Optional[ReviewState]:
-        """Load review state from disk"""
-        state_file = self.state_file_path(review_id)
-        if not os.path.exists(state_file):
+        """Load review state from disk: the snapshot, then any journaled mutations"""
+        if not os.path.exists(self._snapshot_path(review_id)):
             return None
-        
-        with open(state_file) as f:
-            data = json.load(f)
-        
-        files = {}
-        for path, file_data in data.get("files", {}).items():
-            preapproved_blocks = [
-                PreApprovalBlock(
-                    start_line=block["start_line"],
-                    end_line=block["end_line"],
-                    notes=block.get("notes", "")
-                )
-                for block in file_data.get("preapproved_blocks", [])
-            ]
-            
-            files[path] = FileState(
-                approved_sha=file_data.get("approved_sha"),
-                preapproved_sha=file_data.get("preapproved_sha"),
-                preapproved_blocks=preapproved_blocks,
-                notes=file_data.get("notes", ""),
-                lines=file_data.get("lines", 0)
-            )
-        
-        return ReviewState(
-            review_id=data["review_id"],
-            init_commit_sha=data["init_commit_sha"],
-            files=files,
-            notes=data.get("notes", ""),
-            metadata=data.get("metadata", {})
-        )
-    
-    def initialize_review(self, review_id: str, gh_data: Optional[GHData] = None) -> ReviewState:
-        """Initialize a new review state"""
-        files = {}
-        
-        # Populate files from GitHub data if available
-        if gh_data:
-            for file_path in gh_data.files:
-                lines_changed = gh_data.lines_changed.get(file_path, 0)
-                files[file_path] = FileState(lines=lines_changed)
-        
+        with self.locked(review_id):
+            state, seen = self._read(review_id)
+        self._pending.pop(review_id, None)
+        if seen is not None:
+            self._seen[review_id] = seen
+        return state
+
+    def refresh(self, state: ReviewState) -> Optional[ReviewState]:
+        """
+        Bring a state loaded by this manager up to date with disk.
+
+        Returns `state` itself when nothing changed or when other processes only appended
+        to the journal (applied in place), and a freshly loaded state otherwise.
+        """
+        review_id = state.review_id
+        seen = self._seen.get(review_id)
+        if seen is None or self._pending.get(review_id):
+            return self.load_state(review_id)
+        if _signature(self._snapshot_path(review_id)) != seen.snapshot:
+            return self.load_state(review_id)
+        if _size(self.journal_file_path(review_id)) == seen.offset:
+            return state
+        with self.locked(review_id):
+            compacted = _signature(self._snapshot_path(review_id)) != seen.snapshot
+            ops, offset = ([], seen.offset) if compacted else self._read_journal(review_id, seen.offset)
+        if compacted:
+            return self.load_state(review_id)
+        for op in ops:
+            _apply_op(state, op)
+        self._seen[review_id] = _Seen(seen.snapshot, offset, seen.ops + len(ops))
+        return state
+
+    def initialize_review(
+        self, review_id: str, gh_data: Optional["GHData"] = None, init_commit_sha: Optional[str] = None
+    ) -> ReviewState:
+        """Initialize a new review state (at the checked-out commit unless `init_commit_sha` is given)"""
+        self._pending.pop(review_id, None)
         state = ReviewState(
             review_id=review_id,
-            init_commit_sha=self.current_sha,
-            files=files,
+            init_commit_sha=init_commit_sha or self.current_sha,
+            files=self.files_for(gh_data) if gh_data else {},
         )
-
         if gh_data:
-            if gh_data.base_commit:
-                state.metadata["base_commit"] = gh_data.base_commit
-            if gh_data.head_commit:
-                state.metadata["head_commit"] = gh_data.head_commit
-            if gh_data.number:
-                state.metadata["pr_number"] = str(gh_data.number)
-            if gh_data.url:
-                state.metadata["pr_url"] = gh_data.url
-        
+            state.metadata.update(_metadata_of(gh_data))
         self.save_state(state)
         return state
 
+    def files_for(self, gh_data: "GHData") -> dict[str, FileState]:
+        """Unreviewed file states for the files of a PR (or git range), with their blob SHAs"""
+        files = {}
+        for file_path in gh_data.files:
+            lines_changed = gh_data.lines_changed.get(file_path, 0)
+            change = gh_data.changes.get(file_path)
+            files[file_path] = FileState(
+                lines=lines_changed,
+                base_blob=change.old_sha if change else None,
+                head_blob=change.new_sha if change else None,
+                base_mode=change.old_mode if change else None,
+                head_mode=change.new_mode if change else None,
+            )
+        if gh_data.base_commit and gh_data.head_commit and not gh_data.changes:
+            self._fill_blob_shas(files, gh_data.base_commit, gh_data.head_commit)
+        return files
+
+    def replace_files(self, state: ReviewState, files: dict[str, FileState], gh_data: "GHData") -> None:
+        """
+        Swap in the files of a new version of the PR (see lib.refresh), carrying what the
+        caller kept of the old ones. Not journaled: the next save replaces the snapshot,
+        and changes other processes made to the old file list meanwhile are not merged.
+        """
+        state.files = files
+        state.recount()
+        state.metadata.update(_metadata_of(gh_data))
+        with self._lock:
+            self._pending.pop(state.review_id, None)
+            self._rewrite.add(state.review_id)
+
+    def _fill_blob_shas(self, files: dict[str, FileState], base: str, head: str) -> None:
+        """Resolve base/head blob SHAs for every file in one batched lookup (if the commits are local)."""
+        from lib.sources.blobs import blob_name
+        names = [blob_name(rev, path) for path in files for rev in (base, head)]
+        infos = self.blobs.info_many(names)
+        for path, file_state in files.items():
+            base_info = infos.get(blob_name(base, path))
+            head_info = infos.get(blob_name(head, path))
+            if base_info and base_info.type == "blob":
+                file_state.base_blob = base_info.sha
+            if head_info and head_info.type == "blob":
+                file_state.head_blob = head_info.sha
+
     def do_reset(self, state: ReviewState):
-        for k in state.files.keys():
-            state.files[k].do_reset()
+        _apply_op(state, {"op": "reset"})
+        self._record(state, {"op": "reset"})
 
     def mark_file_reviewed(self, state: ReviewState, path: str):
         f = state.files[path]
         if f is None:
             raise Exception(f"Not found for approval: {f}")
-        f.approved_sha = self.current_sha
+        op = {"op": "approve", "path": path, "sha": self.current_sha}
+        _apply_op(state, op)
+        self._record(state, op)
+
+    def set_preapproved_blocks(
+        self, state: ReviewState, path: str, sha: Optional[str], blocks: Sequence[PreApprovalBlock]
+    ):
+        """Replace the approved hunks of a file: line blocks of its content at blob `sha`"""
+        if path not in state.files:
+            raise Exception(f"Not found for hunk approval: {path}")
+        op = {
+            "op": "blocks",
+            "path": path,
+            "sha": sha,
+            "blocks": [[b.start_line, b.end_line, b.lines, b.notes] for b in blocks],
+        }
+        _apply_op(state, op)
+        self._record(state, op)
+
+    def set_notes(self, state: ReviewState, notes: Optional[str], path: Optional[str] = None):
+        """Set the notes of the review, or of one file when `path` is given"""
+        if path is not None and path not in state.files:
+            raise Exception(f"Not found for notes: {path}")
+        op = {"op": "notes", "path": path, "notes": notes}
+        _apply_op(state, op)
+        self._record(state, op)
+
+    def set_metadata(self, state: ReviewState, key: str, value: str):
+        op = {"op": "metadata", "key": key, "value": value}
+        _apply_op(state, op)
+        self._record(state, op)
+
+    def review_ids(self) -> list[str]:
+        """Ids of all reviews stored in this repository"""
+        return sorted(
+            name[: -len(".json")]
+            for name in os.listdir(self.acre_dir)
+            if name.endswith(".json") and os.path.isfile(os.path.join(self.acre_dir, name))
+        )
+
+    def review_progress(self) -> list["ReviewProgress"]:
+        """Progress of every stored review; parses each state file"""
+        progress = []
+        for review_id in self.review_ids():
+            state = self.load_state(review_id)
+            if state is not None:
+                progress.append(ReviewProgress.of(state))
+        return progress
 
     def delete_state(self, review_id: str) -> None:
         """Permanently delete the review state file"""
-        state_file = self.state_file_path(review_id)
-        if os.path.exists(state_file):
-            os.remove(state_file)
+        with self.locked(review_id):
+            for path in (self._snapshot_path(review_id), self.journal_file_path(review_id)):
+                if os.path.exists(path):
+                    os.remove(path)
+        if os.path.exists(self.lock_file_path(review_id)):
+            os.remove(self.lock_file_path(review_id))
+        self._pending.pop(review_id, None)
+        self._seen.pop(review_id, None)
+
+
+@dataclass
+class ReviewProgress:
+    review_id: str
+    files: int
+    reviewed_files: int
+    lines: int
+    reviewed_lines: int
+    pr_url: Optional[str] = None
+
+    @staticmethod
+    def of(state: ReviewState) -> "ReviewProgress":
+        return ReviewProgress(
+            review_id=state.review_id,
+            files=len(state.files),
+            reviewed_files=state.reviewed_file_count(),
+            lines=state.total_lines(),
+            reviewed_lines=state.total_reviewed_lines(),
+            pr_url=state.metadata.get("pr_url"),
+        )
+
+
+def create_state_manager(repo_root: str, current_sha: str, config: Optional[dict] = None) -> StateManager:
+    """StateManager for the backend selected by config `[state] backend` ("json" or "sqlite")."""
+    from lib.config.config import get_state_backend
+    if get_state_backend(config or {}) == "sqlite":
+        from lib.state_sqlite import SqliteStateManager
+        return SqliteStateManager(repo_root=repo_root, current_sha=current_sha)
+    return StateManager(repo_root=repo_root, current_sha=current_sha)
+
+
+@dataclass
+class _Batch:
+    state: ReviewState
+    flush_interval: Optional[float] = None
+    dirty: bool = False
+    flush_at: Optional[float] = None  # time.monotonic() after which a save writes through
+
+    def schedule(self) -> None:
+        self.flush_at = time.monotonic() + self.flush_interval if self.flush_interval else None
+
+    def due(self) -> bool:
+        return self.flush_at is not None and time.monotonic() >= self.flush_at
+
+
+@contextmanager
+def _exit_on_signals() -> Iterator[None]:
+    """Turn SIGTERM/SIGHUP into SystemExit so `finally` blocks (pending flushes) still run."""
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def _exit(signum, _frame):
+        raise SystemExit(128 + signum)
+
+    previous = {}
+    for name in ("SIGTERM", "SIGHUP"):
+        signum = getattr(signal, name, None)
+        if signum is not None:
+            previous[signum] = signal.signal(signum, _exit)
+    try:
+        yield
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+
+@dataclass(frozen=True)
+class _Seen:
+    snapshot: Optional[tuple[int, int, int]]  # Signature of the snapshot file we built on
+    offset: int  # Bytes of the journal already applied
+    ops: int  # Number of journal entries already applied
+
+
+def _signature(path: str) -> Optional[tuple[int, int, int]]:
+    """Identifies one version of a file; atomic replacement always changes the inode."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _size(path: str) -> int:
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _metadata_of(gh_data: "GHData") -> dict[str, str]:
+    metadata = {}
+    if gh_data.base_commit:
+        metadata["base_commit"] = gh_data.base_commit
+    if gh_data.head_commit:
+        metadata["head_commit"] = gh_data.head_commit
+    if gh_data.number:
+        metadata["pr_number"] = str(gh_data.number)
+    if gh_data.url:
+        metadata["pr_url"] = gh_data.url
+    return metadata
+
+
+def _state_to_dict(state: ReviewState) -> dict:
+    return {
+        "review_id": state.review_id,
+        "init_commit_sha": state.init_commit_sha,
+        "files": {
+            path: {
+                "approved_sha": file_state.approved_sha,
+                "preapproved_sha": file_state.preapproved_sha,
+                "preapproved_blocks": [
+                    {
+                        "start_line": block.start_line,
+                        "end_line": block.end_line,
+                        "notes": block.notes,
+                        "lines": block.lines,
+                    }
+                    for block in file_state.preapproved_blocks
+                ],
+                "notes": file_state.notes,
+                "lines": file_state.lines,
+                "base_blob": file_state.base_blob,
+                "head_blob": file_state.head_blob,
+                "base_mode": file_state.base_mode,
+                "head_mode": file_state.head_mode,
+            }
+            for path, file_state in state.files.items()
+        },
+        "notes": state.notes,
+        "metadata": state.metadata
+    }
+
+
+def _state_from_dict(data: dict) -> ReviewState:
+    files = {}
+    for path, file_data in data.get("files", {}).items():
+        preapproved_blocks = [
+            PreApprovalBlock(
+                start_line=block["start_line"],
+                end_line=block["end_line"],
+                notes=block.get("notes", ""),
+                lines=block.get("lines", 0),
+            )
+            for block in file_data.get("preapproved_blocks", [])
+        ]
+
+        files[path] = FileState(
+            approved_sha=file_data.get("approved_sha"),
+            preapproved_sha=file_data.get("preapproved_sha"),
+            preapproved_blocks=preapproved_blocks,
+            notes=file_data.get("notes", ""),
+            lines=file_data.get("lines", 0),
+            base_blob=file_data.get("base_blob"),
+            head_blob=file_data.get("head_blob"),
+            base_mode=file_data.get("base_mode"),
+            head_mode=file_data.get("head_mode"),
+        )
+
+    return ReviewState(
+        review_id=data["review_id"],
+        init_commit_sha=data["init_commit_sha"],
+        files=files,
+        notes=data.get("notes", ""),
+        metadata=data.get("metadata", {})
+    )
+
+
+def _apply_op(state: ReviewState, op: dict) -> None:
+    """Apply one journaled mutation. Ops are plain assignments, so replaying them is idempotent."""
+    match op.get("op"):
+        case "approve":
+            if op["path"] in state.files:
+                state.update_file(op["path"], approved_sha=op["sha"])
+        case "reset":
+            state.reset_files()
+        case "blocks":
+            if op["path"] in state.files:
+                state.update_file(
+                    op["path"],
+                    preapproved_sha=op["sha"],
+                    preapproved_blocks=[
+                        PreApprovalBlock(start_line=start, end_line=end, lines=lines, notes=notes)
+                        for start, end, lines, notes in op["blocks"]
+                    ],
+                )
+        case "notes":
+            if op.get("path") is None:
+                state.notes = op["notes"]
+            elif op["path"] in state.files:
+                state.files[op["path"]].notes = op["notes"]
+        case "metadata":
+            state.metadata[op["key"]] = op["value"]
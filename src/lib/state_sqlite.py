@@ -0,0 +1,310 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from typing import Iterator, Optional
+
+from lib.models import FileState, PreApprovalBlock, ReviewState
+from lib.state import ReviewProgress, StateManager
+
+SCHEMA_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    review_id TEXT PRIMARY KEY,
+    init_commit_sha TEXT NOT NULL,
+    notes TEXT,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    review_id TEXT NOT NULL REFERENCES reviews(review_id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    lines INTEGER NOT NULL DEFAULT 0,
+    preapproved_sha TEXT,
+    notes TEXT,
+    base_blob TEXT,
+    head_blob TEXT,
+    base_mode TEXT,
+    head_mode TEXT,
+    PRIMARY KEY (review_id, path)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS approvals (
+    review_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    approved_at REAL NOT NULL,
+    PRIMARY KEY (review_id, path),
+    FOREIGN KEY (review_id, path) REFERENCES files(review_id, path) ON DELETE CASCADE
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS preapproved_blocks (
+    review_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    start_line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL,
+    notes TEXT,
+    lines INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (review_id, path) REFERENCES files(review_id, path) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS preapproved_blocks_by_file ON preapproved_blocks(review_id, path);
+"""
+
+# Totals per review straight from the indexes, without materializing any ReviewState.
+_PROGRESS = """
+SELECT r.review_id,
+       COUNT(f.path),
+       COUNT(a.path),
+       COALESCE(SUM(f.lines), 0),
+       COALESCE(SUM(CASE WHEN a.path IS NOT NULL THEN f.lines ELSE MIN(f.lines, COALESCE(b.lines, 0)) END), 0),
+       json_extract(r.metadata, '$.pr_url')
+FROM reviews r
+LEFT JOIN files f ON f.review_id = r.review_id
+LEFT JOIN approvals a ON a.review_id = f.review_id AND a.path = f.path
+LEFT JOIN (
+    SELECT review_id, path, SUM(lines) AS lines FROM preapproved_blocks GROUP BY review_id, path
+) b ON b.review_id = f.review_id AND b.path = f.path
+GROUP BY r.review_id
+ORDER BY r.review_id
+"""
+
+
+class SqliteStateManager(StateManager):
+    """
+    StateManager storing every review in one SQLite database (.git/acre/state.db).
+
+    Same ReviewState API as the JSON backend. Mutations made through the manager are
+    saved as targeted row updates in a single transaction, so concurrent sessions merge
+    at row level; other saves replace the review's rows. Reviews that only exist as JSON
+    files are imported on first load (or all at once with `migrate_json`).
+    """
+
+    def __init__(self, repo_root: str, current_sha: str):
+        super().__init__(repo_root=repo_root, current_sha=current_sha)
+        self.db_path = os.path.join(self.acre_dir, "state.db")
+        self._versions: dict[str, int] = {}  # PRAGMA data_version when each review was loaded
+        # One connection, used only by the thread that made the manager (flushes included).
+        self._conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._conn.executescript(_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(preapproved_blocks)")}
+            if "lines" not in columns:  # Version 1 databases
+                self._conn.execute("ALTER TABLE preapproved_blocks ADD COLUMN lines INTEGER NOT NULL DEFAULT 0")
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(files)")}
+            if "base_mode" not in columns:  # Version 2 databases and older
+                self._conn.execute("ALTER TABLE files ADD COLUMN base_mode TEXT")
+                self._conn.execute("ALTER TABLE files ADD COLUMN head_mode TEXT")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def state_file_path(self, review_id: str) -> str:
+        return self.db_path
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction; BEGIN IMMEDIATE takes SQLite's write lock up front, like `locked`."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _save(self, state: ReviewState) -> None:
+        ops = self._pending.pop(state.review_id, [])
+        rewrite = state.review_id in self._rewrite
+        self._rewrite.discard(state.review_id)
+        with self._transaction() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM reviews WHERE review_id = ?", (state.review_id,)
+            ).fetchone()
+            if ops and exists and not rewrite:
+                for op in ops:
+                    self._apply_op_sql(conn, state.review_id, op)
+                conn.execute(
+                    "UPDATE reviews SET updated_at = ? WHERE review_id = ?", (time.time(), state.review_id)
+                )
+            else:
+                self._replace(conn, state)
+
+    def _apply_op_sql(self, conn: sqlite3.Connection, review_id: str, op: dict) -> None:
+        match op.get("op"):
+            case "approve":
+                conn.execute(
+                    "INSERT OR REPLACE INTO approvals (review_id, path, sha, approved_at)"
+                    " SELECT review_id, path, ?, ? FROM files WHERE review_id = ? AND path = ?",
+                    (op["sha"], time.time(), review_id, op["path"]),
+                )
+            case "reset":
+                conn.execute("DELETE FROM approvals WHERE review_id = ?", (review_id,))
+                conn.execute("DELETE FROM preapproved_blocks WHERE review_id = ?", (review_id,))
+                conn.execute(
+                    "UPDATE files SET preapproved_sha = NULL, notes = NULL WHERE review_id = ?", (review_id,)
+                )
+            case "blocks":
+                conn.execute(
+                    "UPDATE files SET preapproved_sha = ? WHERE review_id = ? AND path = ?",
+                    (op["sha"], review_id, op["path"]),
+                )
+                conn.execute(
+                    "DELETE FROM preapproved_blocks WHERE review_id = ? AND path = ?", (review_id, op["path"])
+                )
+                conn.executemany(
+                    "INSERT INTO preapproved_blocks (review_id, path, start_line, end_line, notes, lines)"
+                    " SELECT review_id, path, ?, ?, ?, ? FROM files WHERE review_id = ? AND path = ?",
+                    (
+                        (start, end, notes, lines, review_id, op["path"])
+                        for start, end, lines, notes in op["blocks"]
+                    ),
+                )
+            case "notes":
+                if op.get("path") is None:
+                    conn.execute("UPDATE reviews SET notes = ? WHERE review_id = ?", (op["notes"], review_id))
+                else:
+                    conn.execute(
+                        "UPDATE files SET notes = ? WHERE review_id = ? AND path = ?",
+                        (op["notes"], review_id, op["path"]),
+                    )
+            case "metadata":
+                conn.execute(
+                    "UPDATE reviews SET metadata = json_set(metadata, '$.' || json_quote(?), ?)"
+                    " WHERE review_id = ?",
+                    (op["key"], op["value"], review_id),
+                )
+
+    def _replace(self, conn: sqlite3.Connection, state: ReviewState) -> None:
+        now = time.time()
+        conn.execute("DELETE FROM reviews WHERE review_id = ?", (state.review_id,))
+        conn.execute(
+            "INSERT INTO reviews (review_id, init_commit_sha, notes, metadata, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (state.review_id, state.init_commit_sha, state.notes, json.dumps(state.metadata), now),
+        )
+        conn.executemany(
+            "INSERT INTO files"
+            " (review_id, path, lines, preapproved_sha, notes, base_blob, head_blob, base_mode, head_mode)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    state.review_id, path, f.lines, f.preapproved_sha, f.notes,
+                    f.base_blob, f.head_blob, f.base_mode, f.head_mode,
+                )
+                for path, f in state.files.items()
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO approvals (review_id, path, sha, approved_at) VALUES (?, ?, ?, ?)",
+            ((state.review_id, path, f.approved_sha, now) for path, f in state.files.items() if f.approved_sha),
+        )
+        conn.executemany(
+            "INSERT INTO preapproved_blocks (review_id, path, start_line, end_line, notes, lines)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (state.review_id, path, b.start_line, b.end_line, b.notes, b.lines)
+                for path, f in state.files.items()
+                for b in f.preapproved_blocks
+            ),
+        )
+
+    def _data_version(self) -> int:
+        # Changes whenever another connection commits; our own commits leave it alone.
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def refresh(self, state: ReviewState) -> Optional[ReviewState]:
+        if self._pending.get(state.review_id) or self._versions.get(state.review_id) != self._data_version():
+            return self.load_state(state.review_id)
+        return state
+
+    def load_state(self, review_id: str) -> Optional[ReviewState]:
+        self._pending.pop(review_id, None)
+        self._versions[review_id] = self._data_version()
+        conn = self._conn
+        row = conn.execute(
+            "SELECT init_commit_sha, notes, metadata FROM reviews WHERE review_id = ?", (review_id,)
+        ).fetchone()
+        if row is None:
+            return self._import_json(review_id)
+        init_commit_sha, notes, metadata = row
+
+        blocks: dict[str, list[PreApprovalBlock]] = {}
+        for path, start_line, end_line, block_notes, block_lines in conn.execute(
+            "SELECT path, start_line, end_line, notes, lines FROM preapproved_blocks WHERE review_id = ? ORDER BY rowid",
+            (review_id,),
+        ):
+            blocks.setdefault(path, []).append(
+                PreApprovalBlock(start_line=start_line, end_line=end_line, notes=block_notes, lines=block_lines)
+            )
+        files = {
+            path: FileState(
+                approved_sha=approved_sha,
+                preapproved_sha=preapproved_sha,
+                preapproved_blocks=blocks.get(path, []),
+                notes=file_notes,
+                lines=lines,
+                base_blob=base_blob,
+                head_blob=head_blob,
+                base_mode=base_mode,
+                head_mode=head_mode,
+            )
+            for (
+                path, approved_sha, preapproved_sha, file_notes, lines, base_blob, head_blob, base_mode, head_mode
+            ) in conn.execute(
+                "SELECT f.path, a.sha, f.preapproved_sha, f.notes, f.lines, f.base_blob, f.head_blob,"
+                " f.base_mode, f.head_mode"
+                " FROM files f LEFT JOIN approvals a ON a.review_id = f.review_id AND a.path = f.path"
+                " WHERE f.review_id = ?",
+                (review_id,),
+            )
+        }
+        return ReviewState(
+            review_id=review_id,
+            init_commit_sha=init_commit_sha,
+            files=files,
+            notes=notes,
+            metadata=json.loads(metadata),
+        )
+
+    def _import_json(self, review_id: str) -> Optional[ReviewState]:
+        if not os.path.exists(self._snapshot_path(review_id)):
+            return None
+        state = StateManager.load_state(self, review_id)
+        if state is not None:
+            with self._transaction() as conn:
+                self._replace(conn, state)
+        return state
+
+    def migrate_json(self) -> list[str]:
+        """Import every JSON review not yet in the database; returns the imported ids"""
+        with closing(self._conn.execute("SELECT review_id FROM reviews")) as cursor:
+            known = {row[0] for row in cursor}
+        imported = []
+        for review_id in StateManager.review_ids(self):
+            if review_id not in known and self._import_json(review_id) is not None:
+                imported.append(review_id)
+        return imported
+
+    def review_ids(self) -> list[str]:
+        return [row[0] for row in self._conn.execute("SELECT review_id FROM reviews ORDER BY review_id")]
+
+    def review_progress(self) -> list[ReviewProgress]:
+        return [
+            ReviewProgress(
+                review_id=review_id,
+                files=files,
+                reviewed_files=reviewed_files,
+                lines=lines,
+                reviewed_lines=reviewed_lines,
+                pr_url=pr_url,
+            )
+            for review_id, files, reviewed_files, lines, reviewed_lines, pr_url in self._conn.execute(_PROGRESS)
+        ]
+
+    def delete_state(self, review_id: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM reviews WHERE review_id = ?", (review_id,))
+        # Also drop any JSON original, which would otherwise be imported again on the next load.
+        super().delete_state(review_id)
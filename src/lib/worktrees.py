@@ -0,0 +1,162 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+from lib import runner
+from lib.sources.repo import locate_repo
+
+DEFAULT_POOL_SIZE = 4
+
+
+def pool_dir_for(acre_dir: str) -> str:
+    return os.path.join(acre_dir, "worktrees")
+
+
+@dataclass
+class Slot:
+    name: str
+    review_id: Optional[str] = None
+    head: Optional[str] = None
+    last_used: float = 0.0
+
+
+class WorktreePool:
+    """
+    A fixed number of detached `git worktree`s under .git/acre/worktrees, lent out per review.
+
+    Opening a review reuses the slot that already holds it, else adds a worktree while the
+    pool has room, else takes over the least recently used slot without uncommitted
+    changes: `checkout --force` to the new head only rewrites the files that differ, which
+    is far cheaper than switching the main clone, and the main clone's checkout is never
+    touched. A slot with uncommitted changes is never checked out over, so edits made in
+    a worktree are not lost. The slot assignments are kept in pool.json, which is how
+    commands run inside a slot know their review.
+    """
+
+    def __init__(self, acre_dir: str, repo_root: str, size: int = DEFAULT_POOL_SIZE):
+        self.root = pool_dir_for(acre_dir)
+        self.repo_root = repo_root
+        self.size = max(1, size)
+        self._index = os.path.join(self.root, "pool.json")
+
+    def path(self, slot: Slot) -> str:
+        return os.path.join(self.root, slot.name)
+
+    def slots(self) -> list[Slot]:
+        try:
+            with open(self._index, "r") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return []
+        return [Slot(**entry) for entry in data.get("slots", [])]
+
+    def _write(self, slots: list[Slot]) -> None:
+        tmp = f"{self._index}.{os.getpid()}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump({"slots": [asdict(s) for s in slots]}, fh, indent=2)
+        os.replace(tmp, self._index)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, "pool.lock"), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _git(self, *args: str, cwd: Optional[str] = None) -> str:
+        return runner.run(
+            ["git", *args], check=True, capture_output=True, text=True, cwd=cwd or self.repo_root
+        ).stdout
+
+    def is_dirty(self, slot: Slot) -> bool:
+        """Whether a slot's worktree has uncommitted changes or untracked files."""
+        path = self.path(slot)
+        if not os.path.exists(os.path.join(path, ".git")):
+            return False
+        return bool(self._git("status", "--porcelain", cwd=path).strip())
+
+    def _least_recently_used(self, slots: list[Slot]) -> Slot:
+        for slot in sorted(slots, key=lambda s: s.last_used):
+            if not self.is_dirty(slot):
+                return slot
+            print(f"Warning: not reusing {self.path(slot)}: it has uncommitted changes", file=sys.stderr)
+        raise ValueError("Every pooled worktree has uncommitted changes; commit, stash or discard some")
+
+    def open(self, review_id: str, head: str) -> str:
+        """
+        Path of a worktree checked out (detached) at `head` for `review_id`. Raises
+        ValueError rather than check out over uncommitted changes.
+        """
+        with self._locked():
+            slots = self.slots()
+            slot = next((s for s in slots if s.review_id == review_id), None)
+            if slot is None and len(slots) < self.size:
+                taken = {s.name for s in slots}
+                name = next(f"wt-{i}" for i in range(1, len(slots) + 2) if f"wt-{i}" not in taken)
+                slot = Slot(name=name)
+                slots.append(slot)
+            elif slot is None:
+                slot = self._least_recently_used(slots)
+            elif slot.head != head and self.is_dirty(slot):
+                raise ValueError(
+                    f"{self.path(slot)} has uncommitted changes;"
+                    f" commit, stash or discard them to move it to {head[:12]}"
+                )
+            self._check_out(slot, head)
+            slot.review_id, slot.head, slot.last_used = review_id, head, time.time()
+            self._write(slots)
+            return self.path(slot)
+
+    def _check_out(self, slot: Slot, head: str) -> None:
+        path = self.path(slot)
+        if not os.path.exists(os.path.join(path, ".git")):
+            self._git("worktree", "prune")
+            self._git("worktree", "add", "--detach", "--force", path, head)
+        elif slot.head != head:
+            self._git("checkout", "--detach", "--force", "--quiet", head, cwd=path)
+            self._git("clean", "-fdq", cwd=path)
+
+    def review_at(self, path: str) -> Optional[str]:
+        """The review a slot was opened for, if `path` is inside one."""
+        path = os.path.abspath(path)
+        for slot in self.slots():
+            slot_path = self.path(slot)
+            if path == slot_path or path.startswith(slot_path + os.sep):
+                return slot.review_id
+        return None
+
+    def remove_all(self) -> int:
+        """Remove every worktree of the pool; returns how many were removed."""
+        with self._locked():
+            slots = self.slots()
+            for slot in slots:
+                if os.path.exists(self.path(slot)):
+                    self._git("worktree", "remove", "--force", self.path(slot))
+            self._git("worktree", "prune")
+            self._write([])
+            return len(slots)
+
+
+def pool_review_id(cwd: Optional[str] = None) -> Optional[str]:
+    """Review of the pool worktree containing `cwd`, found without running git."""
+    location = locate_repo(cwd)
+    if location is None:
+        return None
+    root = pool_dir_for(os.path.join(location.common_dir, "acre"))
+    if not location.root.startswith(root + os.sep):
+        return None
+    return WorktreePool(os.path.dirname(root), location.root).review_at(location.root)
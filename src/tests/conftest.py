@@ -0,0 +1,23 @@
+import os
+import subprocess
+
+import pytest
+
+_GIT_IDENTITY = {"GIT_AUTHOR_NAME": "a", "GIT_AUTHOR_EMAIL": "a@b", "GIT_COMMITTER_NAME": "a", "GIT_COMMITTER_EMAIL": "a@b"}
+
+
+@pytest.fixture
+def repo_root(tmp_path) -> str:
+    """A repository layout StateManager can resolve without running git."""
+    (tmp_path / ".git").mkdir(exist_ok=True)
+    (tmp_path / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+    return str(tmp_path)
+
+
+@pytest.fixture
+def git():
+    """Runs `git <args>` in a repository with a fixed identity; returns its stripped stdout."""
+    def run(repo, *args) -> str:
+        env = {**os.environ, **_GIT_IDENTITY}
+        return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True, env=env).stdout.strip()
+    return run
@@ -0,0 +1,64 @@
+import subprocess
+
+import pytest
+
+from lib.sources.blobs import BlobReader
+
+
+def _repo_with_blob(tmp_path, content: bytes) -> str:
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    res = subprocess.run(
+        ["git", "hash-object", "-w", "--stdin"],
+        input=content,
+        capture_output=True,
+        check=True,
+        cwd=tmp_path,
+    )
+    return res.stdout.decode().strip()
+
+
+def test_blob_reader_reads_contents_and_sizes_over_one_process(tmp_path):
+    sha = _repo_with_blob(tmp_path, b"line 1\nline 2\n")
+    missing = "f" * 40
+
+    with BlobReader(cwd=str(tmp_path)) as reader:
+        assert reader.read(sha) == b"line 1\nline 2\n"
+        assert reader.read(missing) is None
+        assert reader.read(sha) == b"line 1\nline 2\n"
+        batch_pid = reader._batch.proc.pid if reader._batch else None
+
+        info = reader.info(sha)
+        assert info is not None
+        assert (info.type, info.size) == ("blob", 14)
+        assert reader.size(missing) is None
+        assert reader.info_many([sha, missing]) == {sha: info, missing: None}
+
+        assert reader._batch is not None and reader._batch.proc.pid == batch_pid
+
+
+def test_blob_reader_outside_repository_returns_none(tmp_path):
+    with BlobReader(cwd=str(tmp_path)) as reader:
+        assert reader.read("HEAD:a.py") is None
+        assert reader.info_many(["HEAD:a.py", "HEAD:b.py"]) == {"HEAD:a.py": None, "HEAD:b.py": None}
+
+
+def test_blob_reader_replays_recorded_objects_without_git(tmp_path, monkeypatch):
+    from lib import runner
+
+    sha = _repo_with_blob(tmp_path, b"\x00binary\n")
+    recording = str(tmp_path / "calls.jsonl")
+    monkeypatch.setattr(runner, "RECORD", recording)
+    with BlobReader(cwd=str(tmp_path)) as reader:
+        info = reader.info(sha)
+        assert reader.info("f" * 40) is None
+        assert reader.read(sha) == b"\x00binary\n"
+
+    monkeypatch.setattr(runner, "RECORD", None)
+    monkeypatch.setattr(runner, "REPLAY", recording)
+    monkeypatch.setattr(runner, "_recordings", {})
+    with BlobReader(cwd=str(tmp_path / "elsewhere")) as reader:
+        assert reader.info_many([sha, "f" * 40]) == {sha: info, "f" * 40: None}
+        assert reader.read(sha) == b"\x00binary\n"
+        with pytest.raises(runner.ReplayMissError):
+            reader.read("e" * 40)
+        assert reader._batch is None and reader._check is None
@@ -0,0 +1,84 @@
+import os
+
+from lib.diff.cache import DiffCache
+from lib.diff.engine import diff_blobs
+from lib.diff.render import render_file_diff
+from lib.diff.service import DiffService
+from lib.models import FileState
+from lib.sources.blobs import BlobReader
+
+
+def test_diff_cache_roundtrip_is_keyed_by_content_and_options(tmp_path):
+    cache = DiffCache(str(tmp_path / "cache"))
+    fd = diff_blobs("a.py", b"a\nb\n", b"a\nc\n", old_sha="old", new_sha="new")
+
+    cache.put(fd, "context=3")
+
+    hit = cache.get("renamed.py", "old", "new", "context=3")
+    assert hit is not None
+    assert hit.path == "renamed.py"
+    assert [h.header for h in hit.hunks] == [h.header for h in fd.hunks]
+    assert hit.hunks[0].lines == fd.hunks[0].lines
+    assert cache.get("a.py", "old", "new", "context=5") is None
+    assert cache.get("a.py", "old", "other", "context=3") is None
+
+
+def test_diff_cache_prune_evicts_least_recently_used(tmp_path):
+    cache = DiffCache(str(tmp_path / "cache"))
+    for idx, name in enumerate(["first", "second", "third"]):
+        cache.put(diff_blobs(f"{name}.py", b"a\n", b"b\n", old_sha=name, new_sha=name), "o")
+        entry = cache._entry_path(cache.key(name, name, "o"))
+        os.utime(entry, (1000 + idx, 1000 + idx))
+    cache.get("first.py", "first", "first", "o")  # Refreshes "first"
+
+    one_entry = cache.stats().total_bytes // 3
+    removed, freed = cache.prune(max_bytes=one_entry)
+
+    assert (removed, freed) == (2, 2 * one_entry)
+    assert cache.get("first.py", "first", "first", "o") is not None
+    assert cache.stats().entries == 1
+
+
+def test_diff_cache_stays_bounded_across_writes(tmp_path):
+    cache = DiffCache(str(tmp_path / "cache"))
+    cache.put(diff_blobs("a.py", b"a\n", b"b\n", old_sha="0", new_sha="0"), "o")
+    cache.max_bytes = 3 * cache.stats().total_bytes
+
+    for idx in range(1, 20):
+        cache.put(diff_blobs("a.py", b"a\n", b"b\n", old_sha=str(idx), new_sha=str(idx)), "o")
+
+    assert cache.stats().total_bytes <= cache.max_bytes
+    assert cache.get("a.py", "19", "19", "o") is not None
+
+
+def test_diff_cache_keeps_file_modes(tmp_path):
+    cache = DiffCache(str(tmp_path / "cache"))
+    fd = diff_blobs("run.sh", None, b"echo\n", new_sha="1" * 40)
+    fd.new_mode = "100755"
+
+    cache.put(fd, "o")
+
+    assert cache.get("run.sh", None, "1" * 40, "o") is None
+    hit = cache.get("run.sh", None, "1" * 40, "o", new_mode="100755")
+    assert hit is not None
+    assert "new file mode 100755\n" in render_file_diff(hit)
+
+
+class _NoBlobs(BlobReader):
+    def info_many(self, names):
+        raise AssertionError("should not touch git")
+
+    def read(self, name):
+        raise AssertionError("should not touch git")
+
+
+def test_diff_service_serves_cached_diffs_without_git(tmp_path):
+    cache = DiffCache(str(tmp_path / "cache"))
+    cache.put(diff_blobs("a.py", b"a\n", b"b\n", old_sha="old", new_sha="new"), "context=3")
+    service = DiffService("base", "head", blobs=_NoBlobs(), disk_cache=cache)
+    service.files = {"a.py": FileState(base_blob="old", head_blob="new")}
+
+    fd = service.file_diff("a.py")
+
+    assert fd is not None
+    assert fd.hunks[0].lines == ["-a\n", "+b\n"]
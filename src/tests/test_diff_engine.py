@@ -0,0 +1,141 @@
+import subprocess
+
+import lib.diff.service as diff_service
+from lib.diff.engine import build_hunks, diff_blobs, myers_opcodes
+from lib.diff.render import render_file_diff
+from lib.sources.blobs import BlobReader
+
+
+def _lines(*items: str) -> list[str]:
+    return [f"{i}\n" for i in items]
+
+
+def test_myers_opcodes_reports_minimal_edits_with_deletes_first():
+    a = _lines("a", "b", "c", "d")
+    b = _lines("a", "x", "c", "d", "e")
+
+    assert myers_opcodes(a, b) == [
+        ("equal", 0, 1, 0, 1),
+        ("delete", 1, 2, 1, 1),
+        ("insert", 2, 2, 1, 2),
+        ("equal", 2, 4, 2, 4),
+        ("insert", 4, 4, 4, 5),
+    ]
+
+
+def test_myers_opcodes_slides_insertions_down_like_git():
+    a = _lines("x", "", "y")
+    b = _lines("x", "", "new", "", "y")
+
+    assert myers_opcodes(a, b) == [
+        ("equal", 0, 2, 0, 2),
+        ("insert", 2, 2, 2, 4),
+        ("equal", 2, 3, 4, 5),
+    ]
+
+
+def test_build_hunks_splits_distant_changes_and_keeps_context():
+    a = _lines(*[str(i) for i in range(1, 21)])
+    b = list(a)
+    b[1] = "two\n"
+    b[17] = "eighteen\n"
+
+    hunks = build_hunks(a, b)
+
+    assert [h.header for h in hunks] == ["@@ -1,5 +1,5 @@", "@@ -15,6 +15,6 @@"]
+    assert hunks[0].lines == [" 1\n", "-2\n", "+two\n", " 3\n", " 4\n", " 5\n"]
+    assert [h.changed_lines for h in hunks] == [2, 2]
+
+
+def test_render_new_file_and_missing_newline():
+    fd = diff_blobs("a.py", None, b"one\ntwo", old_sha=None, new_sha="1" * 40)
+
+    assert render_file_diff(fd) == (
+        "diff --git a/a.py b/a.py\n"
+        "new file mode 100644\n"
+        "index 0000000..1111111\n"
+        "--- /dev/null\n"
+        "+++ b/a.py\n"
+        "@@ -0,0 +1,2 @@\n"
+        "+one\n"
+        "+two\n"
+        "\\ No newline at end of file\n"
+    )
+
+
+def test_only_newlines_end_lines_like_git_diff(tmp_path):
+    old = b"x\x0cy\nz\n\x0bv\r\nkeep\r\n"
+    new = b"x\x0cy\nZ\n\x0bv\r\nkeep\r\n"
+    (tmp_path / "old").write_bytes(old)
+    (tmp_path / "new").write_bytes(new)
+    result = subprocess.run(
+        ["git", "diff", "--no-index", "--no-color", "old", "new"], cwd=tmp_path, capture_output=True
+    )
+    expected = result.stdout.decode("utf-8")
+
+    rendered = render_file_diff(diff_blobs("a", old, new, old_sha="1" * 40, new_sha="2" * 40))
+
+    assert rendered[rendered.index("@@") :] == expected[expected.index("@@") :]
+    assert "@@ -1,4 +1,4 @@" in rendered
+
+
+def test_diff_blobs_flags_binary_content():
+    fd = diff_blobs("img.png", b"\x89PNG\0\x01", b"\x89PNG\0\x02")
+    assert fd.binary is True
+    assert fd.hunks == []
+
+
+class _FakeBlobs(BlobReader):
+    def __init__(self, objects: dict[str, bytes]):
+        super().__init__()
+        self.objects = objects
+        self.reads: list[str] = []
+
+    def info_many(self, names):
+        raise AssertionError("blob SHAs should come from the review state")
+
+    def read(self, name):
+        self.reads.append(name)
+        return self.objects.get(name)
+
+
+def _service(objects) -> diff_service.DiffService:
+    from lib.models import FileState
+
+    service = diff_service.DiffService("base", "head", blobs=_FakeBlobs(objects))
+    service.files = {
+        "a.py": FileState(base_blob="old", head_blob="new"),
+        "bin.dat": FileState(base_blob="bin1", head_blob="bin2"),
+    }
+    return service
+
+
+def test_diff_renders_in_process_without_git(monkeypatch, capsys):
+    service = _service({"old": b"a\nb\n", "new": b"a\nc\n"})
+    monkeypatch.setattr(diff_service, "service_for", lambda _target: service)
+    monkeypatch.setattr(diff_service, "git_diff", lambda *_a, **_k: (_ for _ in ()).throw(AssertionError()))
+
+    diff_service.diff("a.py", diff_target="base..head")
+
+    out = capsys.readouterr().out
+    assert "@@ -1,2 +1,2 @@\n a\n-b\n+c\n" in out
+
+
+def test_diff_falls_back_to_git_for_binary_files(monkeypatch):
+    service = _service({"bin1": b"\0a", "bin2": b"\0b"})
+    calls = []
+    monkeypatch.setattr(diff_service, "service_for", lambda _target: service)
+    monkeypatch.setattr(diff_service, "git_diff", lambda path, diff_target: calls.append((path, diff_target)))
+
+    diff_service.diff("bin.dat", diff_target="base..head")
+
+    assert calls == [("bin.dat", "base..head")]
+
+
+def test_diff_falls_back_to_git_for_worktree_targets(monkeypatch):
+    calls = []
+    monkeypatch.setattr(diff_service, "git_diff", lambda path, diff_target: calls.append((path, diff_target)))
+
+    diff_service.diff("a.py", diff_target="main")
+
+    assert calls == [("a.py", "main")]
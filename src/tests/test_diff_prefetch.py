@@ -0,0 +1,61 @@
+import threading
+
+from lib.diff.prefetch import DiffPrefetcher
+from lib.diff.service import DiffService
+from lib.models import FileState
+
+
+class _SlowBlobs:
+    def __init__(self):
+        self.release = threading.Event()
+        self.reads: list[str] = []
+
+    def info_many(self, names):
+        raise AssertionError("blob SHAs should come from the review state")
+
+    def read(self, sha):
+        self.release.wait(timeout=5)
+        self.reads.append(sha)
+        return f"{sha}\n".encode()
+
+
+def _service(blobs, paths, **kwargs) -> DiffService:
+    service = DiffService("base", "head", blobs=blobs, **kwargs)
+    service.files = {p: FileState(base_blob=f"{p}-old", head_blob=f"{p}-new") for p in paths}
+    return service
+
+
+def test_prefetcher_computes_upcoming_diffs_once():
+    blobs = _SlowBlobs()
+    service = _service(blobs, ["a.py", "b.py", "c.py"])
+
+    with DiffPrefetcher(service, depth=2) as prefetcher:
+        prefetcher.schedule(["a.py", "b.py", "c.py"])
+        assert service.cached("a.py") and service.cached("b.py")
+        assert not service.cached("c.py")
+        blobs.release.set()
+        # Waits on the in-flight prefetch instead of diffing a second time.
+        fd = service.file_diff("a.py")
+
+    assert fd is not None and fd.changed_lines == 2
+    assert service.file_diff("b.py") is not None
+    assert sorted(blobs.reads) == ["a.py-new", "a.py-old", "b.py-new", "b.py-old"]
+
+
+def test_diff_memo_respects_memory_budget():
+    blobs = _SlowBlobs()
+    blobs.release.set()
+    service = _service(blobs, ["a.py", "b.py"], memory_budget=600)
+
+    service.file_diff("a.py")
+    service.file_diff("b.py")
+
+    assert not service.cached("a.py")
+    assert service.cached("b.py")
+
+
+def test_prefetcher_is_noop_without_service_or_depth():
+    DiffPrefetcher(None).schedule(["a.py"])
+    service = _service(_SlowBlobs(), ["a.py"])
+    DiffPrefetcher(service, depth=0).schedule(["a.py"])
+    assert not service.cached("a.py")
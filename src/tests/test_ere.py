@@ -0,0 +1,37 @@
+import re
+
+import pytest
+
+from lib.ere import compile_ere_patterns, matches_any, translate_ere
+
+
+@pytest.mark.parametrize(
+    ("pattern", "line", "expected"),
+    [
+        ("^[[:space:]]*(async[[:space:]]+def|def)[[:space:]]+test_", "    async  def test_x():", True),
+        ("^[[:space:]]*(async[[:space:]]+def|def)[[:space:]]+test_", "def helper():", False),
+        ("assert[A-Za-z_]*\\b", "self.assertEqual(a, b)", True),
+        ("[[:digit:]]{3}", "code 404", True),
+        ("[[:digit:]]{3}", "code 40", False),
+        ("[]x]", "a]b", True),
+        ("[\\d]", "\\", True),
+        ("[\\d]", "7", False),
+        ("\\<id\\>", "user_id = 1", False),
+        ("\\<id\\>", "x = id(y)", True),
+        ("[^[:alnum:][:space:]]", "abc 123", False),
+        ("[^[:alnum:][:space:]]", "abc-123", True),
+        ("a.c", "abc", True),
+        ("a\\.c", "abc", False),
+    ],
+)
+def test_translate_ere_matches_like_grep(pattern, line, expected):
+    assert bool(re.search(translate_ere(pattern), line)) is expected
+
+
+def test_compile_ere_patterns_drops_invalid_and_caches():
+    compiled = compile_ere_patterns(["[[:nope:]]", "foo("])
+    assert compiled == ()
+    first = compile_ere_patterns(["def", "assert"])
+    assert first is compile_ere_patterns(["def", "assert"])
+    assert matches_any("def x", first) is not None
+    assert matches_any("return", first) is None
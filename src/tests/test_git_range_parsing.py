@@ -47,7 +47,72 @@ def test_get_lines_changed_in_range_wraps_called_process_error(monkeypatch):
 
 
 def test_data_from_git_range_wraps_failures(monkeypatch):
-    monkeypatch.setattr(git, "get_files_in_range", lambda _r: (_ for _ in ()).throw(ValueError("bad")))
+    monkeypatch.setattr(git, "get_changes_in_range", lambda _r: (_ for _ in ()).throw(ValueError("bad")))
     with pytest.raises(ValueError, match="Failed to get data from git range 'main..HEAD'"):
         git.data_from_git_range("main..HEAD")
 
+
+_OLD = "1" * 40
+_NEW = "2" * 40
+_ZERO = "0" * 40
+
+
+def test_parse_raw_numstat_handles_renames_binaries_and_odd_paths():
+    out = "\0".join([
+        f":100644 100755 {_OLD} {_NEW} M", "a.py",
+        f":000000 100644 {_ZERO} {_NEW} A", "tab\there.py",
+        f":100644 100644 {_OLD} {_NEW} R087", "old.py", "new.py",
+        f":100644 100644 {_OLD} {_NEW} M", "bin.dat",
+        "2\t1\ta.py",
+        "4\t0\ttab\there.py",
+        "1\t3\t", "old.py", "new.py",
+        "-\t-\tbin.dat",
+        "",
+    ])
+
+    changes = {c.path: c for c in git.parse_raw_numstat(out)}
+
+    assert list(changes) == ["a.py", "tab\there.py", "new.py", "bin.dat"]
+    assert (changes["a.py"].status, changes["a.py"].old_sha, changes["a.py"].new_sha) == ("M", _OLD, _NEW)
+    assert changes["a.py"].new_mode == "100755"
+    assert changes["a.py"].lines == 3
+    assert changes["tab\there.py"].old_sha is None
+    assert changes["tab\there.py"].old_mode is None
+    assert changes["tab\there.py"].lines == 4
+    assert (changes["new.py"].status, changes["new.py"].old_path) == ("R", "old.py")
+    assert (changes["new.py"].added, changes["new.py"].deleted) == (1, 3)
+    assert changes["bin.dat"].binary is True
+    assert changes["bin.dat"].lines == 0
+
+
+def test_resolve_range_commits_uses_single_rev_parse(monkeypatch):
+    calls = []
+
+    def run(cmd, **_kwargs):
+        calls.append(cmd)
+        return _Res("headsha\n^basesha\n")
+
+    monkeypatch.setattr(git.subprocess, "run", run)
+    assert git.resolve_range_commits("main..HEAD") == ("basesha", "headsha")
+    assert calls == [["git", "rev-parse", "main..HEAD"]]
+
+
+def test_resolve_range_commits_single_ref_has_no_base(monkeypatch):
+    monkeypatch.setattr(git.subprocess, "run", lambda _cmd, **_kwargs: _Res("headsha\n"))
+    assert git.resolve_range_commits("HEAD") == (None, "headsha")
+
+
+def test_data_from_git_range_carries_blob_shas(monkeypatch):
+    def run(cmd, **_kwargs):
+        if cmd[:2] == ["git", "diff"]:
+            return _Res(f":100644 100644 {_OLD} {_NEW} M\0a.py\0" + "3\t2\ta.py\0")
+        return _Res("headsha\n^basesha\n")
+
+    monkeypatch.setattr(git.subprocess, "run", run)
+    data = git.data_from_git_range("main..HEAD")
+
+    assert data.files == ["a.py"]
+    assert data.lines_changed == {"a.py": 5}
+    assert (data.base_commit, data.head_commit) == ("basesha", "headsha")
+    assert (data.changes["a.py"].old_sha, data.changes["a.py"].new_sha) == (_OLD, _NEW)
+
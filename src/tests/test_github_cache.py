@@ -0,0 +1,122 @@
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import lib.sources.github_cache as github_cache
+from lib.sources.git import GitData
+from lib.sources.github_cache import PRMetadataCache, pr_cache_key
+
+PR_URL = "https://github.com/acme/repo/pull/7"
+
+
+def _fake_view(monkeypatch) -> list[str | None]:
+    calls: list[str | None] = []
+
+    def pr_metadata(pr=None):
+        calls.append(pr)
+        return GitData(title="Title", body="Body", number=7, url=PR_URL, head_commit="head1")
+
+    monkeypatch.setattr(github_cache, "pr_metadata", pr_metadata)
+    return calls
+
+
+def _get(cache: PRMetadataCache, key: str, **kwargs) -> GitData:
+    data = cache.get(key, **kwargs)
+    assert data is not None
+    return data
+
+
+def _fake_api(monkeypatch, output: str) -> list[list[str]]:
+    calls: list[list[str]] = []
+
+    def run(cmd, **_kwargs):
+        calls.append(cmd)
+        return SimpleNamespace(stdout=output)
+
+    monkeypatch.setattr("lib.runner.subprocess.run", run)
+    return calls
+
+
+def _age(cache: PRMetadataCache, key: str, seconds: float) -> None:
+    path = os.path.join(cache.root, f"{key}.json")
+    with open(path) as fh:
+        entry = json.load(fh)
+    entry["fetched_at"] = time.time() - seconds
+    with open(path, "w") as fh:
+        json.dump(entry, fh)
+
+
+def test_pr_cache_key_prefers_pr_number_and_head():
+    assert pr_cache_key("rid", {"pr_number": "7", "head_commit": "0123456789abcdef"}) == "pr-7-0123456789ab"
+    assert pr_cache_key("rid", {}) == "review-rid"
+
+
+def test_fresh_entries_are_served_without_gh(monkeypatch, tmp_path):
+    views = _fake_view(monkeypatch)
+    api = _fake_api(monkeypatch, "")
+    cache = PRMetadataCache(str(tmp_path), ttl=60)
+
+    first = _get(cache, "pr-7", pr="7")
+    second = _get(cache, "pr-7", pr="7")
+
+    assert (first.title, second.title, second.url) == ("Title", "Title", PR_URL)
+    assert len(views) == 1
+    assert api == []
+
+
+def test_stale_entries_revalidate_with_etag(monkeypatch, tmp_path):
+    views = _fake_view(monkeypatch)
+    cache = PRMetadataCache(str(tmp_path), ttl=60)
+    cache.get("pr-7", pr="7")
+
+    _age(cache, "pr-7", 120)
+    body = json.dumps({
+        "title": "New title", "body": "Body", "number": 7, "html_url": PR_URL,
+        "base": {"sha": "base1"}, "head": {"sha": "head2"},
+    })
+    api = _fake_api(monkeypatch, f'HTTP/2.0 200 OK\r\nEtag: W/"abc"\r\n\r\n{body}')
+    assert _get(cache, "pr-7", pr="7").title == "New title"
+    assert api[-1][:4] == ["gh", "api", "--include", "repos/acme/repo/pulls/7"]
+
+    _age(cache, "pr-7", 120)
+    api = _fake_api(monkeypatch, 'HTTP/2.0 304 Not Modified\r\nEtag: W/"abc"\r\n\r\n')
+    data = _get(cache, "pr-7", pr="7")
+
+    assert (data.title, data.head_commit) == ("New title", "head2")
+    assert api[-1][-2:] == ["-H", 'If-None-Match: W/"abc"']
+    assert len(views) == 1
+    assert _get(cache, "pr-7", pr="7").title == "New title"
+    assert len(api) == 1
+
+
+def test_offline_serves_any_cached_entry_and_never_calls_gh(monkeypatch, tmp_path):
+    views = _fake_view(monkeypatch)
+    cache = PRMetadataCache(str(tmp_path), ttl=60)
+
+    assert cache.get("pr-7", offline=True, pr="7") is None
+    cache.get("pr-7", pr="7")
+    _age(cache, "pr-7", 10_000)
+    api = _fake_api(monkeypatch, "")
+
+    assert _get(cache, "pr-7", offline=True, pr="7").url == PR_URL
+    assert len(views) == 1
+    assert api == []
+
+
+def test_misses_fetch_the_review_pr_by_number_without_files(monkeypatch, tmp_path):
+    api = _fake_api(monkeypatch, json.dumps({"number": 7, "title": "Title", "url": PR_URL, "headRefOid": "head1"}))
+    cache = PRMetadataCache(str(tmp_path), ttl=60)
+
+    assert _get(cache, "pr-7-head1", pr="7").title == "Title"
+
+    assert api == [["gh", "pr", "view", "7", "--json", "number,title,body,url,baseRefOid,headRefOid"]]
+
+
+def test_reviews_without_a_pr_number_are_not_cached(monkeypatch, tmp_path):
+    views = _fake_view(monkeypatch)
+    cache = PRMetadataCache(str(tmp_path), ttl=60)
+
+    assert _get(cache, "review-rid").title == "Title"
+    assert cache.get("review-rid", offline=True) is None
+    assert views == [None]
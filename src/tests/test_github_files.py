@@ -0,0 +1,76 @@
+import json
+from types import SimpleNamespace
+
+import lib.sources.github as github
+from lib.sources.git import ChangedFile
+
+PR_URL = "https://github.com/acme/repo/pull/7"
+
+
+def _view(total: int, listed: int) -> dict:
+    return {
+        "title": "t",
+        "body": "b",
+        "url": PR_URL,
+        "number": 7,
+        "baseRefOid": "base",
+        "headRefOid": "head",
+        "changedFiles": total,
+        "files": [{"path": f"f{i}.py", "additions": 1, "deletions": 0} for i in range(listed)],
+    }
+
+
+def _fake_gh(monkeypatch, view: dict, total: int) -> list[list[str]]:
+    calls: list[list[str]] = []
+
+    def run(cmd, **_kwargs):
+        calls.append(cmd)
+        if cmd[:3] == ["gh", "pr", "view"]:
+            return SimpleNamespace(stdout=json.dumps(view))
+        assert cmd[:2] == ["gh", "api"]
+        page = int(cmd[2].rsplit("page=", 1)[1])
+        start = (page - 1) * github.FILES_PER_PAGE
+        files = [
+            {"filename": f"f{i}.py", "additions": i, "deletions": 1}
+            for i in range(start, min(start + github.FILES_PER_PAGE, total))
+        ]
+        return SimpleNamespace(stdout=json.dumps(files))
+
+    monkeypatch.setattr("lib.sources.github.subprocess.run", run)
+    return calls
+
+
+def test_data_from_gh_pages_through_files_api_for_large_prs(monkeypatch):
+    calls = _fake_gh(monkeypatch, _view(total=250, listed=100), total=250)
+
+    data = github.data_from_gh()
+
+    assert data.files == [f"f{i}.py" for i in range(250)]
+    assert data.lines_changed["f249.py"] == 250
+    assert sum(data.lines_changed.values()) == sum(range(250)) + 250
+    pages = sorted(cmd[2] for cmd in calls if cmd[1] == "api")
+    assert pages == [f"repos/acme/repo/pulls/7/files?per_page=100&page={p}" for p in (1, 2, 3)]
+
+
+def test_data_from_gh_skips_api_when_view_lists_every_file(monkeypatch):
+    calls = _fake_gh(monkeypatch, _view(total=2, listed=2), total=2)
+
+    data = github.data_from_gh()
+
+    assert data.files == ["f0.py", "f1.py"]
+    assert [cmd[1] for cmd in calls] == ["pr"]
+
+
+def test_data_from_gh_uses_local_diff_beyond_api_limit(monkeypatch):
+    calls = _fake_gh(monkeypatch, _view(total=4000, listed=100), total=4000)
+    changes = [ChangedFile(path=f"g{i}.py", status="M", added=2, deleted=1) for i in range(4000)]
+    ranges = []
+    monkeypatch.setattr(github, "get_changes_in_range", lambda r: ranges.append(r) or changes)
+
+    data = github.data_from_gh()
+
+    assert ranges == ["base...head"]
+    assert len(data.files) == 4000
+    assert data.lines_changed["g3999.py"] == 3
+    assert data.changes["g0.py"] is changes[0]
+    assert not [cmd for cmd in calls if cmd[1] == "api"]
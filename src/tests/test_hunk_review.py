@@ -0,0 +1,60 @@
+import pytest
+
+from lib.diff.engine import Hunk, build_hunks
+from lib.hunks import approve_hunk, hunk_span, is_hunk_approved
+from lib.models import FileState, ReviewState
+from lib.state import StateManager
+from lib.state_sqlite import SqliteStateManager
+
+
+def _hunks():
+    old = [f"line {i}\n" for i in range(1, 41)]
+    new = list(old)
+    new[1] = "changed 2\n"
+    new[19] = "changed 20\n"
+    new[37] = "changed 38\n"
+    return build_hunks(old, new)
+
+
+def test_approved_hunks_form_a_merged_interval_set():
+    first, middle, last = _hunks()
+    assert [hunk_span(h) for h in (first, middle, last)] == [(1, 5), (17, 23), (35, 40)]
+
+    blocks = approve_hunk([], last)
+    blocks = approve_hunk(blocks, first)
+    assert [(b.start_line, b.end_line, b.lines) for b in blocks] == [(1, 5, 2), (35, 40, 2)]
+    assert not is_hunk_approved(blocks, middle)
+    assert approve_hunk(blocks, first) == blocks
+
+    # A hunk touching a block merges with it.
+    touching = Hunk(old_start=6, old_count=1, new_start=6, new_count=1, lines=["-a\n", "+b\n"])
+    adjacent = approve_hunk(blocks, touching)
+    assert [(b.start_line, b.end_line, b.lines) for b in adjacent] == [(1, 6, 4), (35, 40, 2)]
+
+
+@pytest.mark.parametrize("manager", [StateManager, SqliteStateManager])
+def test_hunk_approvals_count_towards_status_and_persist(repo_root, manager):
+    state_manager = manager(repo_root=repo_root, current_sha="head")
+    files = {"a.py": FileState(lines=6), "b.py": FileState(lines=4)}
+    state = ReviewState(review_id="r1", init_commit_sha="init", files=files)
+    state_manager.save_state(state)
+    state = state_manager.load_state("r1")
+    first, middle, _last = _hunks()
+
+    blocks = approve_hunk(approve_hunk([], first), middle)
+    state_manager.set_preapproved_blocks(state, "a.py", "blob1", blocks)
+    state_manager.save_state(state)
+    assert (state.total_reviewed_lines(), state.reviewed_file_count()) == (4, 0)
+
+    loaded = state_manager.load_state("r1")
+    assert loaded.files["a.py"].preapproved_sha == "blob1"
+    assert loaded.files["a.py"].preapproved_blocks == blocks
+    assert loaded.total_reviewed_lines() == 4
+    [progress] = state_manager.review_progress()
+    assert (progress.reviewed_lines, progress.reviewed_files) == (4, 0)
+
+    state_manager.mark_file_reviewed(loaded, "a.py")
+    assert loaded.total_reviewed_lines() == 6
+    state_manager.do_reset(loaded)
+    state_manager.save_state(loaded)
+    assert state_manager.load_state("r1").total_reviewed_lines() == 0
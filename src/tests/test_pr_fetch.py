@@ -0,0 +1,181 @@
+import asyncio
+import json
+import subprocess
+import time
+
+import pytest
+
+import lib.sources.pr_fetch as pr_fetch
+from lib.sources.github import PR_VIEW_FIELDS
+
+VIEW = {
+    "title": "t",
+    "body": "b",
+    "url": "https://github.com/acme/repo/pull/7",
+    "number": 7,
+    "baseRefOid": "base",
+    "headRefOid": "head",
+    "changedFiles": 1,
+    "files": [{"path": "from_gh.py", "additions": 1, "deletions": 0}],
+}
+RAW = ":100644 100644 " + "a" * 40 + " " + "b" * 40 + " M\0local.py\0" + "3\t2\tlocal.py\0"
+
+
+def _fake_commands(monkeypatch, responses: dict[str, tuple[float, object]]) -> list[str]:
+    """Each command (matched by its first three tokens) sleeps, then returns or raises."""
+    started: list[str] = []
+
+    async def run_command(cmd, timeout):
+        key = " ".join(cmd[:3])
+        started.append(" ".join(cmd))
+        delay, result = responses[key]
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(pr_fetch, "run_command", run_command)
+    return started
+
+
+def test_git_work_overlaps_the_gh_call(monkeypatch):
+    started = _fake_commands(monkeypatch, {
+        "gh pr view": (0.3, json.dumps(VIEW)),
+        "git name-rev --name-only": (0.05, "feature\n"),
+        "git rev-parse refs/remotes/origin/HEAD": (0.05, "base\nhead\n"),
+        "git diff --raw": (0.25, RAW),
+    })
+
+    t0 = time.monotonic()
+    data = pr_fetch.data_from_gh_concurrently()
+    elapsed = time.monotonic() - t0
+
+    assert elapsed < 0.5
+    assert data.files == ["local.py"]
+    assert data.lines_changed == {"local.py": 5}
+    assert data.changes["local.py"].new_sha == "b" * 40
+    assert (data.number, data.base_commit, data.head_commit) == (7, "base", "head")
+    assert [c for c in started if c.startswith("git diff")] == [
+        "git diff --raw --numstat -z --no-abbrev base...head"
+    ]
+
+
+def test_mismatched_guess_diffs_the_pr_range(monkeypatch):
+    started = _fake_commands(monkeypatch, {
+        "gh pr view": (0.05, json.dumps(VIEW)),
+        "git name-rev --name-only": (0.0, "feature\n"),
+        "git rev-parse refs/remotes/origin/HEAD": (0.0, "stale\nhead\n"),
+        "git diff --raw": (0.0, RAW),
+    })
+
+    data = pr_fetch.data_from_gh_concurrently()
+
+    assert data.files == ["local.py"]
+    assert "git diff --raw --numstat -z --no-abbrev base...head" in started
+
+
+def test_missing_local_commits_fall_back_to_gh_files(monkeypatch):
+    _fake_commands(monkeypatch, {
+        "gh pr view": (0.0, json.dumps(VIEW)),
+        "git name-rev --name-only": (0.0, "feature\n"),
+        "git rev-parse refs/remotes/origin/HEAD": (0.0, subprocess.CalledProcessError(128, "git")),
+        "git diff --raw": (0.0, subprocess.CalledProcessError(128, "git")),
+    })
+
+    data = pr_fetch.data_from_gh_concurrently()
+
+    assert data.files == ["from_gh.py"]
+    assert data.changes == {}
+
+
+def test_gh_failure_retries_with_the_remote_branch(monkeypatch):
+    views = iter([subprocess.CalledProcessError(1, "gh"), json.dumps(VIEW)])
+    started: list[str] = []
+
+    async def run_command(cmd, timeout):
+        started.append(" ".join(cmd))
+        if cmd[:3] == ["gh", "pr", "view"]:
+            result = next(views)
+        elif cmd[1] == "name-rev":
+            result = "remotes/origin/feature\n"
+        else:
+            result = subprocess.CalledProcessError(128, "git")
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(pr_fetch, "run_command", run_command)
+
+    data = pr_fetch.data_from_gh_concurrently()
+
+    assert data.number == 7
+    assert started[-2:] == [
+        f"gh pr view --json {PR_VIEW_FIELDS} feature",
+        "git diff --raw --numstat -z --no-abbrev base...head",
+    ]
+
+
+def test_a_given_pr_is_fetched_by_number_without_branch_lookups(monkeypatch):
+    started = _fake_commands(monkeypatch, {
+        "gh pr view": (0.0, subprocess.CalledProcessError(1, "gh")),
+        "git name-rev --name-only": (0.0, "remotes/origin/feature\n"),
+        "git rev-parse refs/remotes/origin/HEAD": (0.0, "base\nhead\n"),
+        "git diff --raw": (0.0, RAW),
+    })
+
+    data = pr_fetch.data_from_gh_concurrently(pr="7")
+
+    assert data.head_commit is None
+    assert [c for c in started if c.startswith("gh")] == [f"gh pr view --json {PR_VIEW_FIELDS} 7"]
+
+
+def test_run_command_kills_on_timeout():
+    t0 = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(pr_fetch.run_command(["sleep", "5"], timeout=0.1))
+    assert time.monotonic() - t0 < 2
+
+
+def test_run_command_reaps_the_process_when_cancelled(monkeypatch):
+    procs = []
+    spawn = asyncio.create_subprocess_exec
+
+    async def tracked_spawn(*args, **kwargs):
+        procs.append(await spawn(*args, **kwargs))
+        return procs[-1]
+
+    monkeypatch.setattr(pr_fetch.asyncio, "create_subprocess_exec", tracked_spawn)
+
+    async def cancel_sleep():
+        task = asyncio.create_task(pr_fetch.run_command(["sleep", "5"], timeout=10))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # Already waited for, not just killed.
+        assert procs[0].returncode is not None
+
+    asyncio.run(cancel_sleep())
+
+
+def test_run_command_replays_recorded_output(monkeypatch, tmp_path):
+    import sys
+
+    from lib import runner
+
+    cmd = [sys.executable, "-c", "print('from the process')"]
+    recording = str(tmp_path / "calls.jsonl")
+    monkeypatch.setattr(runner, "RECORD", recording)
+    assert asyncio.run(pr_fetch.run_command(cmd, 10)) == "from the process\n"
+
+    monkeypatch.setattr(runner, "RECORD", None)
+    monkeypatch.setattr(runner, "REPLAY", recording)
+    monkeypatch.setattr(runner, "_recordings", {})
+
+    async def no_spawn(*args, **kwargs):
+        raise AssertionError("started a process while replaying")
+
+    monkeypatch.setattr(pr_fetch.asyncio, "create_subprocess_exec", no_spawn)
+    assert asyncio.run(pr_fetch.run_command(cmd, 10)) == "from the process\n"
+    with pytest.raises(runner.ReplayMissError):
+        asyncio.run(pr_fetch.run_command(["gh", "pr", "view"], 10))
@@ -0,0 +1,248 @@
+from lib.models import ReviewState
+from lib.refresh import map_intervals, refresh_review
+from lib.sources.git import data_from_git_range
+from lib.state import StateManager
+
+
+def _write(repo, name: str, lines: list[str]) -> None:
+    (repo / name).write_text("".join(f"{line}\n" for line in lines))
+
+
+def _reload(state_manager: StateManager, review_id: str = "r1") -> ReviewState:
+    """The review as saved, read by a fresh manager."""
+    state = StateManager(repo_root=state_manager.repo_root, current_sha="x").load_state(review_id)
+    assert state is not None
+    return state
+
+
+def _numbered(changes: dict[int, str]) -> list[str]:
+    return [changes.get(i, f"line {i}") for i in range(1, 61)]
+
+
+def test_map_intervals_keeps_only_unchanged_lines():
+    old = [f"{i}\n" for i in range(10)]
+    new = old[:3] + ["inserted\n"] + old[3:5] + ["changed\n"] + old[6:]
+    assert map_intervals([(1, 10)], old, new) == [(1, 3), (5, 6), (8, 11)]
+    assert map_intervals([(2, 4)], old, new) == [(2, 3), (5, 5)]
+    assert map_intervals([], old, new) == []
+    # A deleted line leaves no gap on the new side.
+    assert map_intervals([(1, 10)], old, old[:4] + old[5:]) == [(1, 9)]
+
+
+def test_refresh_keeps_approvals_of_unchanged_hunks_after_a_force_push(tmp_path, monkeypatch, git):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    _write(repo, "a.py", _numbered({}))
+    _write(repo, "b.py", ["b"])
+    _write(repo, "c.py", ["c"])
+    git(repo, "add", ".")
+    git(repo, "commit", "-qm", "base")
+    git(repo, "checkout", "-qb", "feature")
+    _write(repo, "a.py", _numbered({5: "five", 30: "thirty", 55: "fifty-five"}))
+    _write(repo, "b.py", ["b2"])
+    _write(repo, "c.py", ["c2"])
+    git(repo, "commit", "-qam", "change")
+    monkeypatch.chdir(repo)
+
+    state_manager = StateManager(repo_root=str(repo), current_sha=git(repo, "rev-parse", "HEAD"))
+    state = state_manager.initialize_review("r1", data_from_git_range("main..feature"))
+    for path in ("a.py", "b.py"):
+        state_manager.mark_file_reviewed(state, path)
+    state_manager.save_state(state)
+
+    # Fixup amended into the PR: one hunk of a.py changes, c.py is reverted, d.py is added.
+    _write(repo, "a.py", _numbered({5: "five", 30: "THIRTY", 55: "fifty-five"}))
+    _write(repo, "c.py", ["c"])
+    _write(repo, "d.py", ["d"])
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "--amend", "-m", "change")
+
+    results = refresh_review(state_manager, state, data_from_git_range("main..feature"))
+
+    assert {r.path: r.status for r in results} == {"a.py": "remapped", "b.py": "kept", "c.py": "removed", "d.py": "new"}
+    a = state.files["a.py"]
+    assert a.approved_sha is None
+    assert [(b.start_line, b.end_line, b.lines) for b in a.preapproved_blocks] == [(2, 8, 2), (52, 58, 2)]
+    assert state.is_file_reviewed("b.py")
+    assert (state.total_lines(), state.total_reviewed_lines()) == (9, 6)
+
+    loaded = _reload(state_manager)
+    assert set(loaded.files) == {"a.py", "b.py", "d.py"}
+    assert loaded.metadata["head_commit"] == git(repo, "rev-parse", "HEAD")
+    assert loaded.total_reviewed_lines() == 6
+
+
+def test_refresh_requeues_hunks_of_lines_deleted_by_a_force_push(tmp_path, monkeypatch, git):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    _write(repo, "a.py", _numbered({}))
+    git(repo, "add", ".")
+    git(repo, "commit", "-qm", "base")
+    git(repo, "checkout", "-qb", "feature")
+    _write(repo, "a.py", _numbered({5: "five", 30: "thirty", 55: "fifty-five"}))
+    git(repo, "commit", "-qam", "change")
+    monkeypatch.chdir(repo)
+
+    state_manager = StateManager(repo_root=str(repo), current_sha=git(repo, "rev-parse", "HEAD"))
+    state = state_manager.initialize_review("r1", data_from_git_range("main..feature"))
+    state_manager.mark_file_reviewed(state, "a.py")
+    state_manager.save_state(state)
+
+    # The amended PR only deletes lines: one in the middle of the file and the last one.
+    lines = _numbered({5: "five", 30: "thirty", 55: "fifty-five"})
+    _write(repo, "a.py", lines[:19] + lines[20:59])
+    git(repo, "commit", "-q", "--amend", "-am", "change")
+
+    results = refresh_review(state_manager, state, data_from_git_range("main..feature"))
+
+    assert [(r.path, r.status) for r in results] == [("a.py", "remapped")]
+    a = state.files["a.py"]
+    assert not state.is_file_reviewed("a.py")
+    assert [(b.start_line, b.end_line, b.lines) for b in a.preapproved_blocks] == [(2, 8, 2), (26, 32, 2)]
+
+
+def test_incremental_refresh_only_revisits_files_changed_between_heads(tmp_path, monkeypatch, git):
+    from lib.refresh import incremental_data
+
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    for name in ("a.py", "b.py", "c.py"):
+        _write(repo, name, [name])
+    git(repo, "add", ".")
+    git(repo, "commit", "-qm", "base")
+    git(repo, "checkout", "-qb", "feature")
+    for name in ("a.py", "b.py", "c.py"):
+        _write(repo, name, [name, "changed"])
+    git(repo, "commit", "-qam", "change")
+    monkeypatch.chdir(repo)
+
+    state_manager = StateManager(repo_root=str(repo), current_sha=git(repo, "rev-parse", "HEAD"))
+    state = state_manager.initialize_review("r1", data_from_git_range("main..feature"))
+    for path in ("a.py", "b.py"):
+        state_manager.mark_file_reviewed(state, path)
+    state_manager.set_notes(state, "looked at it", path="c.py")
+    state_manager.save_state(state)
+    b_before = state.files["b.py"]
+
+    # New commits on top: a.py edited again, c.py reverted, d.py added.
+    _write(repo, "a.py", ["a.py", "changed again"])
+    _write(repo, "c.py", ["c.py"])
+    _write(repo, "d.py", ["d"])
+    git(repo, "add", ".")
+    git(repo, "commit", "-qm", "more")
+
+    base, head = git(repo, "rev-parse", "main"), git(repo, "rev-parse", "HEAD")
+    data, touched = incremental_data(state, base, head)
+    assert touched == {"a.py", "c.py", "d.py"}
+    assert sorted(data.files) == ["a.py", "d.py"]
+
+    results = refresh_review(state_manager, state, data, only=touched)
+
+    assert {r.path: r.status for r in results} == {"a.py": "requeued", "c.py": "removed", "d.py": "new"}
+    assert list(state.files) == ["a.py", "b.py", "d.py"]
+    assert state.files["b.py"] is b_before and state.is_file_reviewed("b.py")
+    assert not state.is_file_reviewed("a.py")
+    assert state.metadata["head_commit"] == head
+    assert list(_reload(state_manager).files) == ["a.py", "b.py", "d.py"]
+
+
+def test_refresh_init_leaves_review_alone_when_the_pr_fetch_comes_back_empty(tmp_path, monkeypatch, git):
+    import pytest
+
+    import lib.initialize as initialize
+    from lib.sources.github import GHData
+
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    _write(repo, "a.py", ["a"])
+    git(repo, "add", ".")
+    git(repo, "commit", "-qm", "base")
+    git(repo, "checkout", "-qb", "feature")
+    _write(repo, "a.py", ["a", "changed"])
+    git(repo, "commit", "-qam", "change")
+    monkeypatch.chdir(repo)
+
+    state_manager = StateManager(repo_root=str(repo), current_sha=git(repo, "rev-parse", "HEAD"))
+    state = state_manager.initialize_review("r1", data_from_git_range("main..feature"))
+    state_manager.mark_file_reviewed(state, "a.py")
+    state_manager.save_state(state)
+
+    # The recorded head is unknown here, so refresh falls back to fetching the whole PR.
+    state.metadata["head_commit"] = "0" * 40
+    monkeypatch.setattr(initialize, "_new_heads", lambda *_: (git(repo, "rev-parse", "main"), "1" * 40))
+    monkeypatch.setattr(initialize, "data_from_gh_concurrently", lambda pr=None: GHData())
+
+    with pytest.raises(SystemExit):
+        initialize.refresh_init(state_manager, state)
+
+    assert state.is_file_reviewed("a.py")
+    assert _reload(state_manager).is_file_reviewed("a.py")
+
+
+def test_refresh_init_follows_the_reviews_pr_rather_than_the_checked_out_branch(tmp_path, monkeypatch, git):
+    import lib.initialize as initialize
+    import lib.sources.github as github
+
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    _write(repo, "a.py", ["a"])
+    git(repo, "add", ".")
+    git(repo, "commit", "-qm", "base")
+    git(repo, "checkout", "-qb", "pr-7-branch")
+    _write(repo, "a.py", ["a", "changed"])
+    git(repo, "commit", "-qam", "change")
+    monkeypatch.chdir(repo)
+
+    state_manager = StateManager(repo_root=str(repo), current_sha=git(repo, "rev-parse", "HEAD"))
+    state = state_manager.initialize_review("pr-7", data_from_git_range("main..pr-7-branch"))
+    state.metadata["pr_number"] = "7"
+    state.metadata["head_commit"] = "0" * 40  # Not available locally: refresh fetches the whole PR
+    git(repo, "commit", "-q", "--amend", "-am", "change")
+    git(repo, "checkout", "-q", "main")  # Another branch, with a PR of its own, is checked out
+
+    asked = []
+    base, head = git(repo, "rev-parse", "main"), git(repo, "rev-parse", "pr-7-branch")
+    monkeypatch.setattr(github, "pr_heads", lambda pr=None: (asked.append(("heads", pr)), (base, head))[1])
+
+    def fetch(pr=None):
+        asked.append(("fetch", pr))
+        return data_from_git_range(f"{base}..{head}")
+
+    monkeypatch.setattr(initialize, "data_from_gh_concurrently", fetch)
+
+    initialize.refresh_init(state_manager, state)
+
+    assert asked == [("heads", "7"), ("fetch", "7")]
+    assert state.metadata["head_commit"] == head
+
+
+def test_refresh_command_fetches_the_reviews_pr(monkeypatch, tmp_path):
+    import argparse
+
+    import pytest
+
+    import lib.commands.refresh as refresh_cmd
+    from cli.context import Context
+    from lib.sources.github import GHData
+
+    state_manager = StateManager(repo_root=str(tmp_path), current_sha="head")
+    state = state_manager.initialize_review("pr-7", GHData(files=["a.py"], lines_changed={"a.py": 1}))
+    context = Context(key="pr-7", state_manager=state_manager)
+    args = argparse.Namespace(git_range=None)
+
+    with pytest.raises(SystemExit):
+        refresh_cmd.impl(args, context)  # No PR recorded: nothing to look up
+
+    asked = []
+    monkeypatch.setattr(refresh_cmd, "data_from_gh_concurrently", lambda pr=None: (asked.append(pr), GHData())[1])
+    state.metadata["pr_number"] = "7"
+    state_manager.save_state(state)
+    with pytest.raises(SystemExit):
+        refresh_cmd.impl(args, context)
+    assert asked == ["7"]
+    assert list(_reload(state_manager, "pr-7").files) == ["a.py"]
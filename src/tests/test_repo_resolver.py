@@ -0,0 +1,80 @@
+import os
+
+import lib.sources.repo as repo
+
+SHA_A = "a" * 40
+SHA_B = "b" * 40
+
+
+def _write(path, content: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def _fresh(monkeypatch):
+    monkeypatch.setattr(repo, "_locations", {})
+    for var in ("GIT_DIR", "GIT_WORK_TREE", "GIT_COMMON_DIR", "GIT_CEILING_DIRECTORIES"):
+        monkeypatch.delenv(var, raising=False)
+
+
+def test_locate_repo_reads_loose_and_packed_refs_from_subdirectory(tmp_path, monkeypatch):
+    _fresh(monkeypatch)
+    git_dir = tmp_path / "main" / ".git"
+    _write(git_dir / "HEAD", "ref: refs/heads/feature/x\n")
+    _write(git_dir / "packed-refs", f"# pack-refs with: peeled\n{SHA_B} refs/heads/feature/x\n^{SHA_A}\n")
+    (tmp_path / "main" / "src").mkdir(parents=True)
+
+    location = repo.locate_repo(str(tmp_path / "main" / "src"))
+
+    assert location is not None
+    assert location.root == str(tmp_path / "main")
+    assert repo.read_head(location) == ("refs/heads/feature/x", SHA_B)
+
+    _write(git_dir / "refs" / "heads" / "feature" / "x", SHA_A + "\n")
+    assert repo.read_head(location) == ("refs/heads/feature/x", SHA_A)
+
+
+def test_locate_repo_follows_worktree_gitdir_and_commondir(tmp_path, monkeypatch):
+    _fresh(monkeypatch)
+    common = tmp_path / "main" / ".git"
+    wt_git = common / "worktrees" / "wt"
+    _write(common / "HEAD", "ref: refs/heads/main\n")
+    _write(common / "refs" / "heads" / "review", SHA_A + "\n")
+    _write(wt_git / "HEAD", "ref: refs/heads/review\n")
+    _write(wt_git / "commondir", "../..\n")
+    _write(tmp_path / "wt" / ".git", f"gitdir: {wt_git}\n")
+
+    location = repo.locate_repo(str(tmp_path / "wt"))
+
+    assert location is not None
+    assert location.root == str(tmp_path / "wt")
+    assert location.git_dir == str(wt_git)
+    assert location.common_dir == str(common)
+    assert repo.read_head(location) == ("refs/heads/review", SHA_A)
+
+
+def test_read_head_detached(tmp_path, monkeypatch):
+    _fresh(monkeypatch)
+    _write(tmp_path / ".git" / "HEAD", SHA_B + "\n")
+
+    location = repo.locate_repo(str(tmp_path))
+
+    assert location is not None
+    assert repo.read_head(location) == (None, SHA_B)
+
+
+def test_locate_repo_defers_to_git_when_environment_overrides(tmp_path, monkeypatch):
+    _fresh(monkeypatch)
+    _write(tmp_path / ".git" / "HEAD", SHA_B + "\n")
+    monkeypatch.setenv("GIT_DIR", str(tmp_path / ".git"))
+
+    assert repo.locate_repo(str(tmp_path)) is None
+
+
+def test_locate_repo_defers_to_git_for_reftable(tmp_path, monkeypatch):
+    _fresh(monkeypatch)
+    _write(tmp_path / ".git" / "HEAD", "ref: refs/heads/.invalid\n")
+    (tmp_path / ".git" / "reftable").mkdir()
+
+    assert repo.locate_repo(str(tmp_path)) is None
@@ -1,3 +1,4 @@
+from contextlib import nullcontext
 from types import SimpleNamespace
 
 import lib.commands.review as review_cmd
@@ -95,6 +96,9 @@ def test_review_impl_skim_mode_approves_all_when_confirmed(monkeypatch):
         def load_state(self, _key):
             return state
 
+        def unit_of_work(self, _state):
+            return nullcontext()
+
         def mark_file_reviewed(self, state, path):
             calls.append(("mark", path))
             state.files[path].approved_sha = "newsha"
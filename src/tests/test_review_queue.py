@@ -0,0 +1,116 @@
+import asyncio
+import json
+import subprocess
+import time
+from types import SimpleNamespace
+
+import lib.review_queue as review_queue
+from lib.models import ReviewState
+from lib.state import StateManager
+
+PRS = [
+    {
+        "number": n,
+        "title": f"PR {n}",
+        "body": "",
+        "url": f"https://github.com/acme/repo/pull/{n}",
+        "headRefName": f"user/feature-{n}",
+        "headRefOid": f"head{n}",
+        "baseRefName": "main",
+        "baseRefOid": "base",
+        "changedFiles": 1,
+    }
+    for n in (11, 12, 13)
+]
+PRS[2]["headRefName"] = PRS[0]["headRefName"]  # A fork's PR from a branch of the same name
+
+
+def _fake(monkeypatch, diff_delay: float = 0.0, missing: tuple[int, ...] = ()) -> list[list[str]]:
+    runs: list[list[str]] = []
+
+    def run(cmd, **_kwargs):
+        runs.append(cmd)
+        if cmd[:3] == ["gh", "pr", "list"]:
+            return SimpleNamespace(stdout=json.dumps(PRS))
+        return SimpleNamespace(stdout="")
+
+    async def run_command(cmd, timeout):
+        await asyncio.sleep(diff_delay)
+        number = int(cmd[-1].split("...head")[1])
+        if number in missing:
+            raise subprocess.CalledProcessError(128, cmd)
+        return f"{number}\t1\tfile{number}.py\0"
+
+    monkeypatch.setattr("lib.runner.subprocess.run", run)
+    monkeypatch.setattr(review_queue, "run_command", run_command)
+    return runs
+
+
+def test_sync_queue_fetches_once_and_initializes_every_pr(monkeypatch, repo_root):
+    runs = _fake(monkeypatch, diff_delay=0.2)
+    state_manager = StateManager(repo_root=repo_root, current_sha="checkedout")
+
+    t0 = time.monotonic()
+    queued = review_queue.sync_queue(state_manager)
+
+    assert time.monotonic() - t0 < 0.5
+    fetches = [cmd for cmd in runs if cmd[:2] == ["git", "fetch"]]
+    assert len(fetches) == 1
+    assert fetches[0][-4:] == [
+        "+refs/pull/11/head:refs/acre/pr/11",
+        "+refs/pull/12/head:refs/acre/pr/12",
+        "+refs/pull/13/head:refs/acre/pr/13",
+        "+refs/heads/main:refs/remotes/origin/main",
+    ]
+    assert [(q.review_id, q.status, q.files) for q in queued] == [
+        (f"pr-{n}", "initialized", 1) for n in (11, 12, 13)
+    ]
+    state = state_manager.load_state("pr-12")
+    assert state is not None
+    assert state.init_commit_sha == "head12"
+    assert state.files["file12.py"].lines == 13
+    assert state.metadata["pr_number"] == "12"
+
+
+def test_sync_queue_skips_existing_reviews_and_falls_back_to_github(monkeypatch, repo_root):
+    runs = _fake(monkeypatch, missing=(13,))
+    monkeypatch.setattr(
+        review_queue,
+        "gh_data_from_view",
+        lambda pr, local_changes=None: review_queue.GHData(
+            number=pr["number"], files=["remote.py"], lines_changed={"remote.py": 2}
+        ) if local_changes is None else review_queue.GHData(files=[c.path for c in local_changes]),
+    )
+    state_manager = StateManager(repo_root=repo_root, current_sha="checkedout")
+    state_manager.save_state(ReviewState(review_id="pr-11", init_commit_sha="old"))
+
+    queued = review_queue.sync_queue(state_manager)
+
+    assert [q.status for q in queued] == ["exists", "initialized", "initialized"]
+    existing, fetched = state_manager.load_state("pr-11"), state_manager.load_state("pr-13")
+    assert existing is not None and existing.init_commit_sha == "old"
+    assert fetched is not None and list(fetched.files) == ["remote.py"]
+    fetch = next(cmd for cmd in runs if cmd[:2] == ["git", "fetch"])
+    assert "+refs/pull/11/head:refs/acre/pr/11" not in fetch
+
+
+def test_sync_queue_bounds_concurrent_diffs(monkeypatch, repo_root):
+    _fake(monkeypatch)
+    monkeypatch.setattr(review_queue, "DIFF_WORKERS", 2)
+    running, peak = 0, 0
+    run_command = review_queue.run_command
+
+    async def counting(cmd, timeout):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return await run_command(cmd, timeout)
+
+    monkeypatch.setattr(review_queue, "run_command", counting)
+
+    queued = review_queue.sync_queue(StateManager(repo_root=repo_root, current_sha="checkedout"))
+
+    assert [q.status for q in queued] == ["initialized"] * 3
+    assert peak == 2
@@ -0,0 +1,69 @@
+from lib.models import FileState, ReviewState
+from lib.session import ReviewSession
+from lib.state import StateManager
+from lib.state_sqlite import SqliteStateManager
+
+
+def _seed(state_manager: StateManager) -> None:
+    state_manager.save_state(
+        ReviewState(
+            review_id="r1",
+            init_commit_sha="init",
+            files={"a.py": FileState(lines=1), "b.py": FileState(lines=2)},
+        )
+    )
+
+
+def test_review_session_reuses_state_until_disk_changes(tmp_path, monkeypatch, repo_root):
+    mine = StateManager(repo_root=repo_root, current_sha="mine")
+    _seed(mine)
+    session = ReviewSession(state_manager=mine, key="r1", config={})
+    state = session.state()
+    assert state is not None
+
+    mine.mark_file_reviewed(state, "a.py")
+    mine.save_state(state)
+    loads = []
+    monkeypatch.setattr(mine, "_read", lambda review_id: loads.append(review_id))
+    assert session.state() is state
+    monkeypatch.undo()
+
+    other = StateManager(repo_root=str(tmp_path), current_sha="other")
+    other_state = other.load_state("r1")
+    assert other_state is not None
+    other.mark_file_reviewed(other_state, "b.py")
+    other.save_state(other_state)
+
+    refreshed = session.state()
+    assert refreshed is state  # Journal entries from the other process were applied in place.
+    assert state.files["b.py"].approved_sha == "other"
+    assert loads == []
+
+    other_state.notes = "compacted"
+    other.save_state(other_state)
+    reloaded = session.state()
+    assert reloaded is not state
+    assert reloaded is not None and reloaded.notes == "compacted"
+
+
+def test_review_session_with_sqlite_backend_reloads_after_other_writers(tmp_path, repo_root):
+    mine = SqliteStateManager(repo_root=repo_root, current_sha="mine")
+    _seed(mine)
+    session = ReviewSession(state_manager=mine, key="r1", config={})
+    state = session.state()
+    assert state is not None
+
+    mine.mark_file_reviewed(state, "a.py")
+    mine.save_state(state)
+    assert session.state() is state
+
+    other = SqliteStateManager(repo_root=str(tmp_path), current_sha="other")
+    other_state = other.load_state("r1")
+    assert other_state is not None
+    other.mark_file_reviewed(other_state, "b.py")
+    other.save_state(other_state)
+
+    reloaded = session.state()
+    assert reloaded is not state
+    assert reloaded is not None
+    assert (reloaded.files["a.py"].approved_sha, reloaded.files["b.py"].approved_sha) == ("mine", "other")
@@ -1,4 +1,4 @@
-from lib.models import FileState, ReviewState
+from lib.models import FileState, PreApprovalBlock, ReviewState
 
 
 def test_review_state_helpers_totals_and_flags():
@@ -35,3 +35,30 @@ def test_review_state_diff_target_defaults_to_main():
     state = ReviewState(review_id="rid", init_commit_sha="init", files={}, metadata={})
     assert state.diff_target() == "main"
 
+
+def test_review_state_totals_follow_approvals_resets_and_file_changes():
+    state = ReviewState(
+        review_id="rid",
+        init_commit_sha="init",
+        files={"a.py": FileState(lines=3), "b.py": FileState(lines=5)},
+    )
+
+    state.update_file("a.py", approved_sha="sha1")
+    assert (state.total_reviewed_lines(), state.reviewed_file_count()) == (3, 1)
+
+    state.update_file("a.py", lines=4)
+    state.update_file("b.py", preapproved_blocks=[PreApprovalBlock(start_line=1, end_line=2, lines=2)])
+    assert (state.total_lines(), state.total_reviewed_lines(), state.reviewed_file_count()) == (9, 6, 1)
+
+    state.reset_files()
+    assert (state.total_lines(), state.total_reviewed_lines(), state.reviewed_file_count()) == (9, 0, 0)
+
+    # Edits that bypass the mutators are only counted once recount() runs.
+    state.files = {"d.py": FileState(lines=1, approved_sha="sha3")}
+    state.files["d.py"].lines = 2
+    state.recount()
+    assert (state.total_lines(), state.total_reviewed_lines(), state.reviewed_file_count()) == (2, 2, 1)
+
+
+def test_file_state_is_slotted():
+    assert not hasattr(FileState(), "__dict__")
@@ -1,3 +1,4 @@
+from contextlib import nullcontext
 from types import SimpleNamespace
 
 import lib.commands.review as review_cmd
@@ -66,6 +67,9 @@ def test_review_impl_passes_test_diff_first_to_cmd_review(monkeypatch):
         def load_state(self, _key):
             return state
 
+        def unit_of_work(self, _state):
+            return nullcontext()
+
     class FakeCommandsV0:
         def __init__(self, **_kwargs):
             pass
@@ -95,6 +99,9 @@ def test_review_impl_uses_config_default_for_test_diff_first(monkeypatch):
         def load_state(self, _key):
             return state
 
+        def unit_of_work(self, _state):
+            return nullcontext()
+
     class FakeCommandsV0:
         def __init__(self, **_kwargs):
             pass
@@ -0,0 +1,114 @@
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from lib import runner
+from lib.commands.stats import _kind
+
+
+def test_run_records_argv_status_and_bytes(monkeypatch):
+    monkeypatch.setattr(runner, "_calls", [])
+    monkeypatch.setattr(
+        "lib.runner.subprocess.run",
+        lambda cmd, **_kwargs: SimpleNamespace(returncode=0, stdout="x" * 10, stderr=""),
+    )
+
+    runner.run(["git", "diff", "--numstat", "a..b"], input="abc", capture_output=True, text=True)
+
+    [call] = runner.calls()
+    assert call.argv == ["git", "diff", "--numstat", "a..b"]
+    assert (call.status, call.bytes_in, call.bytes_out, call.interactive) == (0, 3, 10, False)
+    assert call.duration >= 0
+
+
+def test_run_records_failures_and_reraises(monkeypatch):
+    monkeypatch.setattr(runner, "_calls", [])
+
+    def fail(cmd, **_kwargs):
+        raise subprocess.CalledProcessError(128, cmd, output="", stderr="fatal: bad revision")
+
+    monkeypatch.setattr("lib.runner.subprocess.run", fail)
+
+    with pytest.raises(subprocess.CalledProcessError):
+        runner.run(["git", "rev-parse", "nope"], check=True)
+    assert [(c.status, c.bytes_out) for c in runner.calls()] == [(128, 19)]
+
+
+def test_session_round_trips_through_acre_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(runner, "_calls", [])
+    monkeypatch.setattr("lib.runner.subprocess.run", lambda cmd, **_kwargs: SimpleNamespace(returncode=0))
+    runner.run(["gh", "pr", "view", "--json", "title"])
+    runner.run_interactive(["less"])
+
+    runner.save_session(str(tmp_path))
+    session = runner.load_session(str(tmp_path))
+
+    assert session is not None
+    assert [(c.argv[0], c.interactive) for c in session.calls] == [("gh", False), ("less", True)]
+
+
+def _record_then_replay(monkeypatch, tmp_path, calls):
+    recording = str(tmp_path / "calls.jsonl")
+    monkeypatch.setattr(runner, "_calls", [])
+    monkeypatch.setattr(runner, "RECORD", recording)
+    calls()
+    monkeypatch.setattr(runner, "RECORD", None)
+    monkeypatch.setattr(runner, "REPLAY", recording)
+    monkeypatch.setattr(runner, "_recordings", {})
+
+    def spawn(cmd, **_kwargs):
+        raise AssertionError(f"started {cmd} while replaying")
+
+    monkeypatch.setattr("lib.runner.subprocess.run", spawn)
+
+
+def test_replay_serves_recorded_output_in_order_without_running(monkeypatch, tmp_path):
+    outputs = iter(["abc123\n", "def456\n"])
+    monkeypatch.setattr(
+        "lib.runner.subprocess.run",
+        lambda cmd, **_kwargs: subprocess.CompletedProcess(cmd, 0, next(outputs).encode(), b""),
+    )
+
+    def calls():
+        for _ in range(2):
+            runner.run(["git", "rev-parse", "HEAD"], capture_output=True)
+
+    _record_then_replay(monkeypatch, tmp_path, calls)
+
+    run = lambda: runner.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout
+    assert [run(), run(), run()] == ["abc123\n", "def456\n", "def456\n"]
+    assert runner.run(["git", "rev-parse", "HEAD"], capture_output=True).stdout == b"def456\n"
+
+
+def test_replay_reproduces_failures_and_reports_misses(monkeypatch, tmp_path):
+    def fail(cmd, **_kwargs):
+        if cmd[0] == "gh":
+            raise FileNotFoundError(2, "No such file or directory", "gh")
+        raise subprocess.CalledProcessError(128, cmd, output="", stderr="fatal: bad revision")
+
+    monkeypatch.setattr("lib.runner.subprocess.run", fail)
+
+    def calls():
+        with pytest.raises(subprocess.CalledProcessError):
+            runner.run(["git", "rev-parse", "nope"], check=True, capture_output=True, text=True)
+        with pytest.raises(FileNotFoundError):
+            runner.run(["gh", "pr", "view"])
+
+    _record_then_replay(monkeypatch, tmp_path, calls)
+
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        runner.run(["git", "rev-parse", "nope"], check=True, capture_output=True, text=True)
+    assert (e.value.returncode, e.value.stderr) == (128, "fatal: bad revision")
+    assert runner.run(["git", "rev-parse", "nope"], capture_output=True).returncode == 128
+    with pytest.raises(FileNotFoundError):
+        runner.run(["gh", "pr", "view"])
+    with pytest.raises(runner.ReplayMissError):
+        runner.run(["git", "status"])
+
+
+def test_stats_groups_calls_by_subcommand():
+    assert _kind(["git", "diff", "--raw", "a...b"]) == "git diff"
+    assert _kind(["gh", "pr", "view", "--json", "title"]) == "gh pr view"
+    assert _kind(["gh", "api", "repos/a/b/pulls/1"]) == "gh api"
+    assert _kind(["less", "-FRX"]) == "less"
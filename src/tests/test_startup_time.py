@@ -0,0 +1,114 @@
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from cli.parser import COMMAND_MODULES
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY = os.path.join(SRC, "codereview.py")
+# Budget for acre's own startup cost, on top of an interpreter that has already imported the
+# stdlib modules every command needs (so the check tracks acre, not the machine's speed).
+BUDGET_MS = float(os.environ.get("ACRE_STARTUP_BUDGET_MS", "50"))
+# Wall-clock checks are noisy on shared machines: opt in with `just test-timing`.
+TIMING = os.environ.get("ACRE_TIMING_TESTS", "") not in ("", "0")
+BASELINE = "import argparse, dataclasses, json, subprocess, typing"
+RUNS = 7
+
+# Nothing on the cheap paths should need these.
+HEAVY_MODULES = {
+    "readline",
+    "webbrowser",
+    "tomllib",
+    "hashlib",
+    "concurrent.futures",
+    "lib.commands_v0",
+    "lib.commands.review",
+    "lib.commands.interactive",
+    "lib.diff.service",
+    "lib.diff.engine",
+    "lib.sources.github",
+    "lib.sources.blobs",
+}
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A minimal repository layout that the file-based resolver can read without git."""
+    git_dir = tmp_path / "repo" / ".git"
+    (git_dir / "refs" / "heads").mkdir(parents=True)
+    (git_dir / "HEAD").write_text("ref: refs/heads/feature\n")
+    (git_dir / "refs" / "heads" / "feature").write_text("a" * 40 + "\n")
+    return tmp_path
+
+
+def _env(tmp_path) -> dict:
+    env = {k: v for k, v in os.environ.items() if not k.startswith("GIT_")}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env["HOME"] = str(tmp_path / "home")
+    env["PYTHONPYCACHEPREFIX"] = str(tmp_path / "pyc")
+    return env
+
+
+def _run(args: list[str], cwd, env) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], cwd=cwd, env=env, capture_output=True, text=True)
+
+
+def _imported_modules(args: list[str], cwd, env) -> set[str]:
+    result = _run(["-X", "importtime", ENTRY, *args], cwd, env)
+    return {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "|" in line
+    }
+
+
+def _best_ms(args: list[str], cwd, env) -> float:
+    _run(args, cwd, env)  # Warm the bytecode cache.
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        _run(args, cwd, env)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+@pytest.mark.parametrize("args", [["--help"], ["metadata"]])
+def test_cheap_commands_skip_heavy_imports(repo, args):
+    modules = _imported_modules(args, repo / "repo", _env(repo))
+
+    assert "cli.parser" in modules
+    assert modules & HEAVY_MODULES == set()
+
+
+def test_help_does_not_load_state_layer(repo):
+    modules = _imported_modules(["--help"], repo / "repo", _env(repo))
+
+    assert "lib.state" not in modules
+    assert "lib.sources.git" not in modules
+
+
+@pytest.mark.skipif(not TIMING, reason="set ACRE_TIMING_TESTS=1 to run wall-clock checks")
+@pytest.mark.parametrize("args", [["--help"], ["metadata"], ["status"]])
+def test_startup_overhead_within_budget(repo, args):
+    env = _env(repo)
+    cwd = repo / "repo"
+    baseline = _best_ms(["-c", BASELINE], cwd, env)
+
+    overhead = _best_ms([ENTRY, *args], cwd, env) - baseline
+
+    assert overhead < BUDGET_MS, f"`acre {' '.join(args)}` took {overhead:.1f}ms over the stdlib baseline"
+
+
+def test_command_table_matches_registered_commands():
+    for name, (module_name, help_text) in COMMAND_MODULES.items():
+        sub = argparse.ArgumentParser().add_subparsers(dest="cmd")
+        importlib.import_module(module_name).register(sub)
+
+        assert name in sub.choices, f"{module_name} does not register `{name}`"
+        help_by_name = {action.dest: action.help for action in sub._choices_actions}
+        assert help_by_name[name] == help_text
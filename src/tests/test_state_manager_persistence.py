@@ -1,3 +1,8 @@
+import json
+import os
+import threading
+import time
+
 from lib.models import FileState, PreApprovalBlock, ReviewState
 from lib.sources.git import GitData
 from lib.state import StateManager
@@ -109,3 +114,201 @@ def test_state_manager_mark_file_reviewed_and_reset(tmp_path):
     assert state.files["a.py"].preapproved_sha is None
     assert state.files["a.py"].preapproved_blocks == []
     assert state.files["a.py"].notes is None
+
+
+def _journaled_review(repo_root: str) -> tuple[StateManager, ReviewState]:
+    state_manager = StateManager(repo_root=repo_root, current_sha="head1")
+    state_manager.save_state(
+        ReviewState(
+            review_id="r1",
+            init_commit_sha="initsha",
+            files={"a.py": FileState(lines=1), "b.py": FileState(lines=2)},
+        )
+    )
+    state = state_manager.load_state("r1")
+    assert state is not None
+    return state_manager, state
+
+
+def test_state_manager_appends_mutations_to_journal(repo_root):
+    state_manager, state = _journaled_review(repo_root)
+    with open(state_manager.state_file_path("r1")) as f:
+        snapshot = f.read()
+
+    state_manager.mark_file_reviewed(state, "a.py")
+    state_manager.save_state(state)
+    state_manager.set_notes(state, "looks good", path="b.py")
+    state_manager.set_metadata(state, "pr_url", "https://example.test/pull/1")
+    state_manager.save_state(state)
+
+    with open(state_manager.state_file_path("r1")) as f:
+        assert f.read() == snapshot
+    with open(state_manager.journal_file_path("r1")) as f:
+        assert len(f.readlines()) == 3
+
+    loaded = StateManager(repo_root=repo_root, current_sha="other").load_state("r1")
+    assert loaded is not None
+    assert loaded.files["a.py"].approved_sha == "head1"
+    assert loaded.files["b.py"].approved_sha is None
+    assert loaded.files["b.py"].notes == "looks good"
+    assert loaded.metadata["pr_url"] == "https://example.test/pull/1"
+
+
+def test_state_manager_drops_torn_journal_entry(repo_root):
+    state_manager, state = _journaled_review(repo_root)
+    state_manager.mark_file_reviewed(state, "a.py")
+    state_manager.save_state(state)
+    with open(state_manager.journal_file_path("r1"), "a") as f:
+        f.write('{"op":"approve","path":"b.py"')
+
+    other = StateManager(repo_root=repo_root, current_sha="head2")
+    loaded = other.load_state("r1")
+    assert loaded is not None
+    assert loaded.files["a.py"].approved_sha == "head1"
+    assert loaded.files["b.py"].approved_sha is None
+
+    other.mark_file_reviewed(loaded, "b.py")
+    other.save_state(loaded)
+    reloaded = StateManager(repo_root=repo_root, current_sha="x").load_state("r1")
+    assert reloaded is not None
+    assert reloaded.files["b.py"].approved_sha == "head2"
+
+
+def test_state_manager_compacts_journal_into_snapshot(repo_root, monkeypatch):
+    monkeypatch.setattr("lib.state.JOURNAL_COMPACT_OPS", 2)
+    state_manager, state = _journaled_review(repo_root)
+
+    state_manager.mark_file_reviewed(state, "a.py")
+    state_manager.save_state(state)
+    state_manager.mark_file_reviewed(state, "b.py")
+    state_manager.save_state(state)
+    state_manager.do_reset(state)
+    state_manager.save_state(state)
+
+    assert not os.path.exists(state_manager.journal_file_path("r1"))
+    with open(state_manager.state_file_path("r1")) as f:
+        assert json.load(f)["files"]["a.py"]["approved_sha"] is None
+
+
+def test_state_manager_snapshots_changes_made_outside_the_journal(repo_root):
+    state_manager, state = _journaled_review(repo_root)
+    state.files["a.py"].lines = 42
+
+    state_manager.save_state(state)
+
+    loaded = StateManager(repo_root=repo_root, current_sha="x").load_state("r1")
+    assert loaded is not None
+    assert loaded.files["a.py"].lines == 42
+
+
+def test_state_managers_merge_independent_approvals(repo_root):
+    left, left_state = _journaled_review(repo_root)
+    right = StateManager(repo_root=repo_root, current_sha="head2")
+    right_state = right.load_state("r1")
+    assert right_state is not None
+
+    left.mark_file_reviewed(left_state, "a.py")
+    left.save_state(left_state)
+    right.mark_file_reviewed(right_state, "b.py")
+    right.save_state(right_state)
+
+    assert right_state.files["a.py"].approved_sha == "head1"
+    loaded = StateManager(repo_root=repo_root, current_sha="x").load_state("r1")
+    assert loaded is not None
+    assert (loaded.files["a.py"].approved_sha, loaded.files["b.py"].approved_sha) == ("head1", "head2")
+
+
+def test_state_managers_merge_approvals_across_compaction(repo_root):
+    left, left_state = _journaled_review(repo_root)
+    right = StateManager(repo_root=repo_root, current_sha="head2")
+    right_state = right.load_state("r1")
+    assert right_state is not None
+
+    left.mark_file_reviewed(left_state, "a.py")
+    left_state.notes = "rewritten outside the journal"
+    left.save_state(left_state)
+    right.mark_file_reviewed(right_state, "b.py")
+    right.save_state(right_state)
+
+    loaded = StateManager(repo_root=repo_root, current_sha="x").load_state("r1")
+    assert loaded is not None
+    assert (loaded.files["a.py"].approved_sha, loaded.files["b.py"].approved_sha) == ("head1", "head2")
+
+
+def test_state_manager_interrupted_snapshot_keeps_previous_state(repo_root, monkeypatch):
+    state_manager, state = _journaled_review(repo_root)
+    state.notes = "new notes"
+
+    def fail(*_args, **_kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr("lib.state.json.dump", fail)
+    try:
+        state_manager.save_state(state)
+    except KeyboardInterrupt:
+        pass
+    monkeypatch.undo()
+
+    loaded = StateManager(repo_root=repo_root, current_sha="x").load_state("r1")
+    assert loaded is not None
+    assert set(loaded.files) == {"a.py", "b.py"}
+    assert not [name for name in os.listdir(state_manager.acre_dir) if name.endswith(".tmp")]
+
+
+def test_state_manager_unit_of_work_coalesces_saves(repo_root, monkeypatch):
+    state_manager, state = _journaled_review(repo_root)
+    writes = []
+    save = state_manager._save
+    monkeypatch.setattr(state_manager, "_save", lambda s: (writes.append(s.review_id), save(s)))
+
+    with state_manager.unit_of_work(state, flush_interval=None):
+        for path in ("a.py", "b.py"):
+            state_manager.mark_file_reviewed(state, path)
+            state_manager.save_state(state)
+        with state_manager.unit_of_work(state):
+            state_manager.save_state(state)
+        assert writes == []
+
+    assert writes == ["r1"]
+    with open(state_manager.journal_file_path("r1")) as f:
+        assert len(f.readlines()) == 2
+
+
+def test_state_manager_unit_of_work_flushes_on_error_and_once_the_interval_passed(tmp_path, repo_root, monkeypatch):
+    state_manager, state = _journaled_review(repo_root)
+
+    try:
+        with state_manager.unit_of_work(state, flush_interval=None):
+            state_manager.mark_file_reviewed(state, "a.py")
+            state_manager.save_state(state)
+            raise KeyboardInterrupt
+    except KeyboardInterrupt:
+        pass
+    assert os.path.exists(state_manager.journal_file_path("r1"))
+
+    writes = []
+    save = state_manager._save
+    monkeypatch.setattr(state_manager, "_save", lambda s: (writes.append(threading.current_thread()), save(s)))
+    with state_manager.unit_of_work(state, flush_interval=0.05):
+        state_manager.mark_file_reviewed(state, "b.py")
+        state_manager.save_state(state)
+        assert writes == []
+        time.sleep(0.06)
+        state_manager.save_state(state)
+        assert writes == [threading.current_thread()]
+
+    loaded = StateManager(repo_root=str(tmp_path), current_sha="x").load_state("r1")
+    assert loaded is not None
+    assert loaded.files["b.py"].approved_sha == "head1"
+
+
+def test_state_manager_flush_writes_inside_unit_of_work(repo_root):
+    state_manager, state = _journaled_review(repo_root)
+
+    with state_manager.unit_of_work(state, flush_interval=None):
+        state_manager.mark_file_reviewed(state, "a.py")
+        state_manager.flush(state)
+        assert os.path.exists(state_manager.journal_file_path("r1"))
+        loaded = StateManager(repo_root=repo_root, current_sha="x").load_state("r1")
+        assert loaded is not None
+        assert loaded.files["a.py"].approved_sha == "head1"
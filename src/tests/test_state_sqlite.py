@@ -0,0 +1,103 @@
+import pytest
+
+from cli.context import Context
+from lib.commands.state import impl_migrate
+from lib.models import FileState, PreApprovalBlock, ReviewState
+from lib.state import StateManager, create_state_manager
+from lib.state_sqlite import SqliteStateManager
+
+
+def _state() -> ReviewState:
+    return ReviewState(
+        review_id="r1",
+        init_commit_sha="initsha",
+        files={
+            "a.py": FileState(
+                approved_sha="approved1",
+                preapproved_blocks=[PreApprovalBlock(start_line=1, end_line=3, notes="n1")],
+                notes="file-notes",
+                lines=10,
+                base_blob="old",
+                head_blob="new",
+                base_mode="100644",
+                head_mode="100755",
+            ),
+            "b.py": FileState(lines=5),
+        },
+        notes="review-notes",
+        metadata={"pr_url": "https://github.com/acme/repo/pull/1"},
+    )
+
+
+def test_sqlite_state_manager_roundtrip(repo_root):
+    state_manager = SqliteStateManager(repo_root=repo_root, current_sha="head")
+
+    state_manager.save_state(_state())
+    loaded = state_manager.load_state("r1")
+
+    assert loaded == _state()
+    assert state_manager.load_state("missing") is None
+
+
+def test_sqlite_state_manager_merges_mutations_from_two_sessions(repo_root):
+    left = SqliteStateManager(repo_root=repo_root, current_sha="head1")
+    left.save_state(_state())
+    right = SqliteStateManager(repo_root=repo_root, current_sha="head2")
+    left_state, right_state = left.load_state("r1"), right.load_state("r1")
+    assert left_state is not None and right_state is not None
+
+    left.do_reset(left_state)
+    left.mark_file_reviewed(left_state, "a.py")
+    left.save_state(left_state)
+    right.mark_file_reviewed(right_state, "b.py")
+    right.set_metadata(right_state, "head_commit", "cafe")
+    right.save_state(right_state)
+
+    loaded = SqliteStateManager(repo_root=repo_root, current_sha="x").load_state("r1")
+    assert loaded is not None
+    assert loaded.files["a.py"].approved_sha == "head1"
+    assert loaded.files["a.py"].notes is None
+    assert loaded.files["a.py"].preapproved_blocks == []
+    assert loaded.files["b.py"].approved_sha == "head2"
+    assert loaded.metadata == {"pr_url": "https://github.com/acme/repo/pull/1", "head_commit": "cafe"}
+
+
+def test_sqlite_state_manager_migrates_json_reviews(repo_root):
+    json_manager = StateManager(repo_root=repo_root, current_sha="head")
+    json_manager.save_state(_state())
+    json_manager.save_state(ReviewState(review_id="r2", init_commit_sha="i2", files={"c.py": FileState(lines=7)}))
+
+    state_manager = create_state_manager(repo_root, "head", {"state": {"backend": "sqlite"}})
+    assert isinstance(state_manager, SqliteStateManager)
+
+    assert state_manager.migrate_json() == ["r1", "r2"]
+    assert state_manager.migrate_json() == []
+    assert state_manager.load_state("r1") == _state()
+    progress = {p.review_id: p for p in state_manager.review_progress()}
+    assert (progress["r1"].files, progress["r1"].reviewed_files) == (2, 1)
+    assert (progress["r1"].lines, progress["r1"].reviewed_lines) == (15, 10)
+    assert progress["r1"].pr_url == "https://github.com/acme/repo/pull/1"
+    assert (progress["r2"].lines, progress["r2"].reviewed_lines) == (7, 0)
+    assert [p.review_id for p in json_manager.review_progress()] == ["r1", "r2"]
+
+
+def test_state_migrate_command_needs_the_sqlite_backend(repo_root, capsys):
+    json_manager = StateManager(repo_root=repo_root, current_sha="head")
+    json_manager.save_state(_state())
+    with pytest.raises(SystemExit):
+        impl_migrate(Context(key="r1", state_manager=json_manager))
+
+    sqlite_manager = create_state_manager(repo_root, "head", {"state": {"backend": "sqlite"}})
+    impl_migrate(Context(key="r1", state_manager=sqlite_manager))
+    assert "> Migrated 1 reviews to " in capsys.readouterr().out
+
+
+def test_sqlite_state_manager_imports_json_review_on_load_and_deletes_both(repo_root):
+    StateManager(repo_root=repo_root, current_sha="head").save_state(_state())
+    state_manager = SqliteStateManager(repo_root=repo_root, current_sha="head")
+
+    assert state_manager.load_state("r1") == _state()
+    assert state_manager.review_ids() == ["r1"]
+
+    state_manager.delete_state("r1")
+    assert state_manager.load_state("r1") is None
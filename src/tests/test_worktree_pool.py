@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from lib.worktrees import WorktreePool, pool_review_id
+
+
+def _commit(git, repo, name: str, content: str) -> str:
+    (repo / name).write_text(content)
+    git(repo, "add", name)
+    git(repo, "commit", "-qm", name)
+    return git(repo, "rev-parse", "HEAD")
+
+
+def test_pool_reuses_slots_and_recycles_the_least_recently_used(tmp_path, git):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q")
+    first = _commit(git, repo, "a.txt", "one")
+    second = _commit(git, repo, "b.txt", "two")
+    pool = WorktreePool(str(repo / ".git" / "acre"), str(repo), size=2)
+
+    path_a = pool.open("review-a", first)
+    path_b = pool.open("review-b", second)
+    assert path_a != path_b
+    assert os.path.exists(os.path.join(path_b, "b.txt"))
+    assert not os.path.exists(os.path.join(path_a, "b.txt"))
+
+    assert pool.open("review-a", first) == path_a
+
+    # Pool is full: review-b's slot is the least recently used one.
+    path_c = pool.open("review-c", first)
+    assert path_c == path_b
+    assert git(path_c, "rev-parse", "HEAD") == first
+    assert [(s.name, s.review_id) for s in pool.slots()] == [("wt-1", "review-a"), ("wt-2", "review-c")]
+    assert pool_review_id(os.path.join(path_c)) == "review-c"
+    assert pool_review_id(str(repo)) is None
+    # The main clone's checkout is untouched.
+    assert git(repo, "rev-parse", "HEAD") == second
+
+    assert pool.remove_all() == 2
+    assert not os.path.exists(path_a)
+    assert git(repo, "worktree", "list").count("\n") == 0
+
+
+def test_pool_never_checks_out_over_uncommitted_changes(tmp_path, git, capsys):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q")
+    first = _commit(git, repo, "a.txt", "one")
+    second = _commit(git, repo, "b.txt", "two")
+    pool = WorktreePool(str(repo / ".git" / "acre"), str(repo), size=2)
+    path_a = pool.open("review-a", first)
+    path_b = pool.open("review-b", second)
+
+    # review-a's slot is the least recently used, but holds work in progress.
+    with open(os.path.join(path_a, "a.txt"), "w") as fh:
+        fh.write("edited")
+    assert pool.open("review-c", first) == path_b
+    assert "uncommitted changes" in capsys.readouterr().err
+    with open(os.path.join(path_a, "a.txt")) as fh:
+        assert fh.read() == "edited"
+
+    with open(os.path.join(path_b, "scratch.txt"), "w") as fh:
+        fh.write("left over")
+    with pytest.raises(ValueError):
+        pool.open("review-d", second)
+    with pytest.raises(ValueError):
+        pool.open("review-c", second)
+    assert os.path.exists(os.path.join(path_b, "scratch.txt"))
+    assert [(s.name, s.review_id) for s in pool.slots()] == [("wt-1", "review-a"), ("wt-2", "review-c")]